@@ -0,0 +1 @@
+"""API performance benchmarks, run with `make bench-back`."""
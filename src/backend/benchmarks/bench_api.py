@@ -0,0 +1,51 @@
+"""
+Benchmarks of the hot endpoints of the client and resource server APIs.
+"""
+
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+
+def bench_teams_list(benchmark):
+    """Teams of the user."""
+    benchmark("teams", "/api/v1.0/teams/")
+
+
+def bench_team_accesses_list(benchmark, dataset):
+    """Accesses of a team of the user."""
+    benchmark("team-accesses", f"/api/v1.0/teams/{dataset['team'].pk}/accesses/")
+
+
+def bench_users_search(benchmark):
+    """Search of the users to add to a team."""
+    benchmark("users-search", "/api/v1.0/users/?q=user1")
+
+
+def bench_contacts_search(benchmark):
+    """Search of the contacts of the user."""
+    benchmark("contacts-search", "/api/v1.0/contacts/?q=an")
+
+
+def bench_mail_domains_list(benchmark):
+    """Mail domains of the user."""
+    benchmark("mail-domains", "/api/v1.0/mail-domains/")
+
+
+def bench_mailboxes_list(benchmark, dataset):
+    """Mailboxes of a mail domain of the user."""
+    benchmark(
+        "mailboxes", f"/api/v1.0/mail-domains/{dataset['domain'].slug}/mailboxes/"
+    )
+
+
+def bench_resource_server_teams_list(benchmark):
+    """Teams of the user visible to a service provider."""
+    benchmark(
+        "resource-server-teams", "/resource-server/v1.0/teams/", resource_server=True
+    )
+
+
+def bench_scim_me(benchmark):
+    """SCIM profile of the user, with their teams."""
+    benchmark("scim-me", "/resource-server/v1.0/scim/Me/", resource_server=True)
@@ -0,0 +1,58 @@
+"""Dataset sizes and per-endpoint budgets of the API benchmarks."""
+
+from demo.defaults import SIZE_PROFILES
+
+# Sizes of the random datasets the endpoints are benchmarked against, the
+# `BENCHMARK_SIZES` environment variable selects them (small and medium by default)
+DATASET_SIZES = {
+    "small": {
+        "users": 1_000,
+        "teams": 200,
+        "max_users_per_team": 20,
+        "max_team_depth": 3,
+        "domains": 20,
+        "mailboxes_per_domain": 20,
+        "aliases_per_domain": 5,
+    },
+    "medium": {
+        "users": 20_000,
+        "teams": 2_000,
+        "max_users_per_team": 50,
+        "max_team_depth": 5,
+        "domains": 200,
+        "mailboxes_per_domain": 100,
+        "aliases_per_domain": 10,
+    },
+    "large": SIZE_PROFILES["M"],
+}
+DEFAULT_DATASET_SIZES = "small,medium"
+
+# Number of objects given to the benchmark user in each dataset
+NB_USER_TEAMS = 50
+NB_USER_DOMAINS = 20
+NB_CONTACTS = 500
+
+# Maximum number of SQL queries and 95th percentile latency (in milliseconds) of
+# each endpoint. The number of queries must not depend on the dataset size, the
+# latencies are scaled by the `BENCHMARK_LATENCY_FACTOR` environment variable
+# to account for slower machines.
+BUDGETS = {
+    # get user, get user teams, get teams with counts, prefetch service providers
+    "teams": {"queries": 4, "p95": 150},
+    # get user, count accesses, get accesses with the user role, get the team and
+    # count its owners for the abilities of the user access
+    "team-accesses": {"queries": 5, "p95": 150},
+    # get user, count users, get users
+    "users-search": {"queries": 3, "p95": 300},
+    # get user, get contacts
+    "contacts-search": {"queries": 2, "p95": 300},
+    # get user, count domains, get domains with their mailboxes count and user role
+    "mail-domains": {"queries": 3, "p95": 150},
+    # get user, get domain, get user role, count mailboxes, get mailboxes
+    "mailboxes": {"queries": 5, "p95": 150},
+    # get user teams path, count teams, get teams (the audiences of the service
+    # providers are cached by the warm-up request)
+    "resource-server-teams": {"queries": 3, "p95": 150},
+    # get user, get user team accesses with their teams
+    "scim-me": {"queries": 2, "p95": 100},
+}
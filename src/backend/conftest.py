@@ -28,3 +28,15 @@ def no_http_requests(monkeypatch):
     monkeypatch.setattr(
         "urllib3.connectionpool.HTTPConnectionPool.urlopen", urlopen_mock
     )
+
+
+@pytest.fixture(autouse=True)
+def clear_service_providers_audiences():
+    """
+    Forget the cached audiences of the service providers, which are rolled back
+    at the end of each test without any signal.
+    """
+    # pylint: disable=import-outside-toplevel
+    from core.models import ServiceProvider  # noqa: PLC0415
+
+    ServiceProvider.objects.clear_audiences_cache()
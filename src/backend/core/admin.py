@@ -226,8 +226,7 @@ class OrganizationServiceProviderInline(admin.TabularInline):
 @admin.action(description=_("Run post creation plugins"), permissions=["change"])
 def run_post_creation_plugins(modeladmin, request, queryset):  # pylint: disable=unused-argument
     """Run the post creation plugins for the selected organizations."""
-    for organization in queryset:
-        plugin_hooks_registry.execute_hook("organization_created", organization)
+    plugin_hooks_registry.execute_hook_batch("organization_created", queryset)
 
     messages.success(
         request,
@@ -1,13 +1,59 @@
 """Client serializers for the People core app."""
 
+from django.db import transaction
+from django.db.models.functions import Upper
+
 from rest_framework import exceptions, serializers
 from timezone_field.rest_framework import TimeZoneSerializerField
 
 from core import models
+from core.enums import WebhookStatusChoices
 from core.models import ServiceProvider
+from core.tasks import add_users_to_team_webhooks_task, email_team_invitations_task
+
+# Maximum number of team accesses created in one bulk request
+TEAM_ACCESSES_BULK_MAX_SIZE = 1000
+
+# Maximum number of team invitations created in one bulk request
+INVITATIONS_BULK_MAX_SIZE = 1000
+
 
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    A ModelSerializer that takes additional `fields` and `omit` arguments that
+    control which fields should be displayed.
+
+    Fields which are dropped are not computed at all, which spares the cost of
+    `SerializerMethodField` like abilities.
+    """
 
-class ContactSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, **kwargs):
+        """
+        Pass arguments to superclass except 'fields' and 'omit', then drop fields
+        not listed in 'fields' and fields listed in 'omit'.
+        """
+
+        # Don't pass the 'fields' and 'omit' args up to the superclass
+        fields = kwargs.pop("fields", None)
+        omit = kwargs.pop("omit", None)
+
+        # Instantiate the superclass normally
+        super().__init__(*args, **kwargs)
+
+        existing = set(self.fields)
+        dropped = set()
+        if fields is not None:
+            # Drop any fields that are not specified in the `fields` argument.
+            dropped |= existing - set(fields)
+        if omit is not None:
+            # Drop any fields that are specified in the `omit` argument.
+            dropped |= existing & set(omit)
+
+        for field_name in dropped:
+            self.fields.pop(field_name)
+
+
+class ContactSerializer(DynamicFieldsModelSerializer):
     """Serialize contacts."""
 
     abilities = serializers.SerializerMethodField()
@@ -42,29 +88,6 @@ class ContactSerializer(serializers.ModelSerializer):
         return {}
 
 
-class DynamicFieldsModelSerializer(serializers.ModelSerializer):
-    """
-    A ModelSerializer that takes an additional `fields` argument that
-    controls which fields should be displayed.
-    """
-
-    def __init__(self, *args, **kwargs):
-        """Pass arguments to superclass except 'fields', then drop fields not listed therein."""
-
-        # Don't pass the 'fields' arg up to the superclass
-        fields = kwargs.pop("fields", None)
-
-        # Instantiate the superclass normally
-        super().__init__(*args, **kwargs)
-
-        if fields is not None:
-            # Drop any fields that are not specified in the `fields` argument.
-            allowed = set(fields)
-            existing = set(self.fields)
-            for field_name in existing - allowed:
-                self.fields.pop(field_name)
-
-
 class OrganizationSerializer(serializers.ModelSerializer):
     """Serialize organizations."""
 
@@ -150,7 +173,7 @@ class UserMeSerializer(UserSerializer):
         return user.get_abilities()
 
 
-class TeamAccessSerializer(serializers.ModelSerializer):
+class TeamAccessSerializer(DynamicFieldsModelSerializer):
     """Serialize team accesses."""
 
     abilities = serializers.SerializerMethodField(read_only=True)
@@ -226,6 +249,123 @@ class TeamAccessSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class TeamAccessBulkItemSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Validate one of the team accesses to create in bulk."""
+
+    user = serializers.UUIDField()
+    role = serializers.ChoiceField(
+        choices=models.RoleChoices.choices, default=models.RoleChoices.MEMBER
+    )
+
+
+class TeamAccessBulkCreateSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Validate team accesses to create in bulk. The permissions of the logged-in user
+    are checked once for all the accesses.
+    """
+
+    accesses = TeamAccessBulkItemSerializer(
+        many=True, allow_empty=False, max_length=TEAM_ACCESSES_BULK_MAX_SIZE
+    )
+
+    def validate(self, attrs):
+        """Check the logged-in user can give the requested roles in the team."""
+        user = self.context["request"].user
+        user_role = (
+            models.TeamAccess.objects.filter(team=self.context["team_id"], user=user)
+            .values_list("role", flat=True)
+            .first()
+        )
+
+        if user_role not in [models.RoleChoices.OWNER, models.RoleChoices.ADMIN]:
+            raise exceptions.PermissionDenied(
+                "You are not allowed to manage accesses for this team."
+            )
+
+        if user_role != models.RoleChoices.OWNER and any(
+            access["role"] == models.RoleChoices.OWNER for access in attrs["accesses"]
+        ):
+            raise exceptions.PermissionDenied(
+                "Only owners of a team can assign other users as owners."
+            )
+
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Create the team accesses of the users which are not yet in the team,
+        with one insert, then synchronize the team webhooks once for all of them
+        in a Celery task.
+
+        Return the result for each requested user, in the requested order.
+        """
+        team_id = self.context["team_id"]
+
+        # When a user is listed several times, the first role is kept
+        roles = {}
+        for access in validated_data["accesses"]:
+            roles.setdefault(access["user"], access["role"])
+
+        users = {user.pk: user for user in models.User.objects.filter(pk__in=roles)}
+        existing_accesses = dict(
+            models.TeamAccess.objects.filter(
+                team_id=team_id, user_id__in=users
+            ).values_list("user_id", "id")
+        )
+        new_accesses = {
+            user_id: models.TeamAccess(team_id=team_id, user_id=user_id, role=role)
+            for user_id, role in roles.items()
+            if user_id in users and user_id not in existing_accesses
+        }
+
+        with transaction.atomic():
+            # Accesses created concurrently are ignored, by the `unique_team_user`
+            # constraint, so check which ones were actually inserted
+            models.TeamAccess.objects.bulk_create(
+                new_accesses.values(), ignore_conflicts=True
+            )
+            created_ids = set(
+                models.TeamAccess.objects.filter(
+                    pk__in=[access.pk for access in new_accesses.values()]
+                ).values_list("pk", flat=True)
+            )
+
+        created_users = [
+            users[user_id]
+            for user_id, access in new_accesses.items()
+            if access.pk in created_ids
+        ]
+        models.User.clear_abilities_cache([user.pk for user in created_users])
+        if created_users and (
+            webhooks := models.TeamWebhook.objects.filter(team_id=team_id)
+        ):
+            webhooks.update(status=WebhookStatusChoices.PENDING)
+            # synchronize all webhooks once for all the new members, out of the
+            # request and once the accesses are committed
+            user_ids = [str(user.pk) for user in created_users]
+            transaction.on_commit(
+                lambda: add_users_to_team_webhooks_task.delay(str(team_id), user_ids),
+                # A broker failure must not fail the request
+                robust=True,
+            )
+
+        results = []
+        for user_id, role in roles.items():
+            result = {"user": str(user_id), "role": role}
+            if user_id not in users:
+                result["status"] = "user_not_found"
+            elif (access := new_accesses.get(user_id)) and access.pk in created_ids:
+                result |= {"status": "created", "id": str(access.pk)}
+            else:
+                access_id = existing_accesses.get(user_id)
+                result |= {
+                    "status": "already_exists",
+                    "id": str(access_id) if access_id else None,
+                }
+            results.append(result)
+        return results
+
+
 class TeamAccessReadOnlySerializer(TeamAccessSerializer):
     """Serialize team accesses for list and retrieve actions."""
 
@@ -247,11 +387,17 @@ class TeamAccessReadOnlySerializer(TeamAccessSerializer):
         ]
 
 
-class TeamSerializer(serializers.ModelSerializer):
-    """Serialize teams."""
+class TeamSerializer(DynamicFieldsModelSerializer):
+    """
+    Serialize teams.
+
+    Team accesses are not embedded, only their number: they are available
+    from the `/teams/<team_id>/accesses/` endpoint.
+    """
 
     abilities = serializers.SerializerMethodField(read_only=True)
     is_visible_all_services = serializers.BooleanField(required=False, default=True)
+    members_count = serializers.SerializerMethodField(read_only=True)
     service_providers = serializers.PrimaryKeyRelatedField(
         queryset=ServiceProvider.objects.all(), many=True, required=False
     )
@@ -261,10 +407,10 @@ class TeamSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "abilities",
-            "accesses",
             "created_at",
             "depth",
             "is_visible_all_services",
+            "members_count",
             "name",
             "numchild",
             "path",
@@ -274,9 +420,9 @@ class TeamSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "id",
             "abilities",
-            "accesses",
             "created_at",
             "depth",
+            "members_count",
             "numchild",
             "path",
             "updated_at",
@@ -286,10 +432,11 @@ class TeamSerializer(serializers.ModelSerializer):
         """Create a new team with organization enforcement."""
         # When called as a resource server, we enforce the team service provider
         if sp_audience := self.context.get("from_service_provider_audience", None):
-            service_provider, _created = models.ServiceProvider.objects.get_or_create(
-                audience_id=sp_audience
-            )
-            validated_data["service_providers"] = [service_provider]
+            validated_data["service_providers"] = [
+                models.ServiceProvider.objects.get_id_for_audience(
+                    sp_audience, create=True
+                )
+            ]
 
         # Note: this is not the purpose of this API to check the user has an organization
         return super().create(
@@ -304,6 +451,13 @@ class TeamSerializer(serializers.ModelSerializer):
             return team.get_abilities(request.user)
         return {}
 
+    def get_members_count(self, team) -> int:
+        """Return the number of members of the team, annotated by the viewset."""
+        try:
+            return team.members_count
+        except AttributeError:
+            return team.accesses.count()
+
 
 class InvitationSerializer(serializers.ModelSerializer):
     """Serialize invitations."""
@@ -340,6 +494,119 @@ class InvitationSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class InvitationBulkItemSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Validate one of the team invitations to create in bulk."""
+
+    email = serializers.EmailField()
+    role = serializers.ChoiceField(
+        choices=models.RoleChoices.choices, default=models.RoleChoices.MEMBER
+    )
+
+
+class InvitationBulkCreateSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Validate team invitations to create in bulk. The permissions of the logged-in
+    user are checked once for all the invitations.
+    """
+
+    invitations = InvitationBulkItemSerializer(
+        many=True, allow_empty=False, max_length=INVITATIONS_BULK_MAX_SIZE
+    )
+
+    def validate(self, attrs):
+        """Check the logged-in user can manage invitations of the team."""
+        if not models.TeamAccess.objects.filter(
+            team=self.context["team_id"],
+            user=self.context["request"].user,
+            role__in=[models.RoleChoices.OWNER, models.RoleChoices.ADMIN],
+        ).exists():
+            raise exceptions.PermissionDenied(
+                "You are not allowed to manage invitation for this team."
+            )
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Create the invitations of the emails which are neither known users nor
+        already invited to the team, with one insert, then email them from a Celery
+        task. Known users and existing invitations are found with one query each,
+        through the case-insensitive email indexes.
+
+        Return the result for each requested email, in the requested order.
+        """
+        team = models.Team.objects.get(pk=self.context["team_id"])
+        issuer = self.context["request"].user
+
+        # When an email is listed several times, the first role is kept
+        roles = {}
+        for invitation in validated_data["invitations"]:
+            roles.setdefault(invitation["email"].upper(), invitation)
+
+        known_emails = set(
+            models.User.objects.annotate(upper_email=Upper("email"))
+            .filter(upper_email__in=roles)
+            .values_list("upper_email", flat=True)
+        )
+        existing_invitations = dict(
+            models.Invitation.objects.filter(team=team)
+            .annotate(upper_email=Upper("email"))
+            .filter(upper_email__in=roles)
+            .values_list("upper_email", "id")
+        )
+        new_invitations = {
+            upper_email: models.Invitation(
+                team=team, issuer=issuer, email=item["email"], role=item["role"]
+            )
+            for upper_email, item in roles.items()
+            if upper_email not in known_emails
+            and upper_email not in existing_invitations
+        }
+
+        with transaction.atomic():
+            # Invitations created concurrently are ignored, by the
+            # `email_and_team_unique_together` constraint, so check which ones
+            # were actually inserted
+            models.Invitation.objects.bulk_create(
+                new_invitations.values(), ignore_conflicts=True
+            )
+            created_ids = set(
+                models.Invitation.objects.filter(
+                    pk__in=[invitation.pk for invitation in new_invitations.values()]
+                ).values_list("pk", flat=True)
+            )
+
+        # Email the invitations out of the request, once they are committed
+        invitation_ids = [
+            str(invitation.pk)
+            for invitation in new_invitations.values()
+            if invitation.pk in created_ids
+        ]
+        if invitation_ids:
+            transaction.on_commit(
+                lambda: email_team_invitations_task.delay(invitation_ids),
+                # A broker failure must not fail the request
+                robust=True,
+            )
+
+        results = []
+        for upper_email, item in roles.items():
+            result = {"email": item["email"], "role": item["role"]}
+            if upper_email in known_emails:
+                result["status"] = "user_already_exists"
+            elif (
+                invitation := new_invitations.get(upper_email)
+            ) and invitation.pk in created_ids:
+                result |= {"status": "created", "id": str(invitation.pk)}
+            else:
+                invitation_id = existing_invitations.get(upper_email)
+                result |= {
+                    "status": "already_invited",
+                    "id": str(invitation_id) if invitation_id else None,
+                }
+            results.append(result)
+        return results
+
+
 class ServiceProviderSerializer(serializers.ModelSerializer):
     """Serialize service providers."""
 
@@ -5,7 +5,7 @@ import operator
 from functools import reduce
 
 from django.conf import settings
-from django.db.models import OuterRef, Q, Subquery, Value
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Value
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.decorators import method_decorator
@@ -18,6 +18,7 @@ from rest_framework import (
     mixins,
     pagination,
     response,
+    status,
     throttling,
     views,
     viewsets,
@@ -27,12 +28,62 @@ from rest_framework.permissions import AllowAny
 from core import models
 from core.api import permissions
 from core.api.client import serializers
+from core.api.conditional import (
+    aggregate_subquery,
+    conditional_response,
+    make_etag,
+)
 from core.utils.raw_sql import gen_sql_filter_json_array
 
 from mailbox_manager import enums
 from mailbox_manager import models as domains_models
 
 
+class SparseFieldsetsMixin:
+    """
+    Allow clients to select the fields returned by the read actions with the
+    `fields` or `omit` query parameters, as comma separated field names, e.g.
+    `?fields=id,name` or `?omit=abilities`.
+
+    The serializer must inherit from `DynamicFieldsModelSerializer`. Viewsets
+    should check `is_field_requested` before adding prefetches and annotations
+    only needed to compute a field.
+    """
+
+    def _get_query_param_fields(self, param):
+        """Return the set of field names listed in a query parameter, or None."""
+        request = getattr(self, "request", None)
+        if request is None or request.method != "GET":
+            return None
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        return {field.strip() for field in value.split(",") if field.strip()}
+
+    def get_requested_fields(self):
+        """Return the fields requested with the `fields` query parameter, if any."""
+        return self._get_query_param_fields("fields")
+
+    def get_omitted_fields(self):
+        """Return the fields excluded with the `omit` query parameter, if any."""
+        return self._get_query_param_fields("omit")
+
+    def is_field_requested(self, field_name):
+        """Return True if the field will be serialized in the response."""
+        fields = self.get_requested_fields()
+        if fields is not None and field_name not in fields:
+            return False
+        return field_name not in (self.get_omitted_fields() or ())
+
+    def get_serializer(self, *args, **kwargs):
+        """Restrict the serialized fields to the requested ones."""
+        if (fields := self.get_requested_fields()) is not None:
+            kwargs.setdefault("fields", fields)
+        if (omit := self.get_omitted_fields()) is not None:
+            kwargs.setdefault("omit", omit)
+        return super().get_serializer(*args, **kwargs)
+
+
 class NestedGenericViewSet(viewsets.GenericViewSet):
     """
     A generic Viewset aims to be used in a nested route context.
@@ -119,6 +170,21 @@ class Pagination(pagination.PageNumberPagination):
     page_size_query_param = "page_size"
 
 
+class OptInPagination(Pagination):
+    """
+    Pagination only applied when a page or a page size is requested, for endpoints
+    returning all results at once by default.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate the queryset only if the client asked for it."""
+        if not {self.page_query_param, self.page_size_query_param} & set(
+            request.query_params
+        ):
+            return None
+        return super().paginate_queryset(queryset, request, view=view)
+
+
 class BurstRateThrottle(throttling.UserRateThrottle):
     """
     Throttle rate for minutes. See DRF section in settings for default value.
@@ -137,6 +203,7 @@ class SustainedRateThrottle(throttling.UserRateThrottle):
 
 # pylint: disable=too-many-ancestors
 class ContactViewSet(
+    SparseFieldsetsMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.RetrieveModelMixin,
@@ -291,12 +358,57 @@ class UserViewSet(
     def get_me(self, request):
         """
         Return information on currently logged user
+
+        Conditional requests are answered from the watermarks of the user, their
+        organization and their accesses, which abilities are computed from.
         """
         user = request.user
-        return response.Response(self.get_serializer(user).data)
+        team_accesses = models.TeamAccess.objects.filter(user=OuterRef("pk"))
+        domain_accesses = domains_models.MailDomainAccess.objects.filter(
+            user=OuterRef("pk")
+        )
+        watermark = (
+            models.User.objects.filter(pk=user.pk)
+            .annotate(
+                team_accesses_count=aggregate_subquery(
+                    team_accesses, "user", Count("pk")
+                ),
+                team_accesses_updated_at=aggregate_subquery(
+                    team_accesses, "user", Max("updated_at")
+                ),
+                domain_accesses_count=aggregate_subquery(
+                    domain_accesses, "user", Count("pk")
+                ),
+                domain_accesses_updated_at=aggregate_subquery(
+                    domain_accesses, "user", Max("updated_at")
+                ),
+            )
+            .values(
+                "updated_at",
+                "organization_id",
+                "organization__updated_at",
+                "team_accesses_count",
+                "team_accesses_updated_at",
+                "domain_accesses_count",
+                "domain_accesses_updated_at",
+            )
+            .get()
+        )
+
+        return conditional_response(
+            request,
+            make_etag(user.pk, watermark, settings.FEATURES),
+            lambda: response.Response(self.get_serializer(user).data),
+            last_modified=max(
+                timestamp
+                for key, timestamp in watermark.items()
+                if key.endswith("updated_at") and timestamp
+            ),
+        )
 
 
 class TeamViewSet(
+    SparseFieldsetsMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -304,7 +416,16 @@ class TeamViewSet(
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
 ):
-    """Team ViewSet"""
+    """
+    Team ViewSet
+
+    GET /api/v1.0/teams/
+        Return the teams the logged-in user has access to, and their parent teams.
+        Query parameters:
+        - page, page_size: paginate the results (not paginated by default)
+        - fields, omit: comma separated list of the fields to return or to omit,
+          e.g. `fields=id,name`
+    """
 
     permission_classes = [permissions.TeamPermission, permissions.AccessPermission]
     serializer_class = serializers.TeamSerializer
@@ -312,7 +433,7 @@ class TeamViewSet(
     ordering_fields = ["created_at", "name", "path"]
     ordering = ["-created_at"]
     queryset = models.Team.objects.all()
-    pagination_class = None
+    pagination_class = OptInPagination
 
     def get_queryset(self):
         """Custom queryset to get user related teams."""
@@ -324,40 +445,60 @@ class TeamViewSet(
         if not depth_path:
             return models.Team.objects.none()
 
-        user_role_query = models.TeamAccess.objects.filter(
-            user=self.request.user, team=OuterRef("pk")
-        ).values("role")[:1]
+        queryset = models.Team.objects.filter(
+            reduce(
+                operator.or_,
+                (
+                    Q(
+                        # The team the user has access to
+                        depth=d["depth"],
+                        path=d["path"],
+                    )
+                    | Q(
+                        # The parent team the user has access to
+                        depth__lt=d["depth"],
+                        path__startswith=d["path"][: models.Team.steplen],
+                        organization_id=self.request.user.organization_id,
+                    )
+                    for d in depth_path
+                ),
+            ),
+        )
 
-        return (
-            models.Team.objects.prefetch_related("accesses", "service_providers")
-            .filter(
-                reduce(
-                    operator.or_,
-                    (
-                        Q(
-                            # The team the user has access to
-                            depth=d["depth"],
-                            path=d["path"],
-                        )
-                        | Q(
-                            # The parent team the user has access to
-                            depth__lt=d["depth"],
-                            path__startswith=d["path"][: models.Team.steplen],
-                            organization_id=self.request.user.organization_id,
-                        )
-                        for d in depth_path
+        # Only compute what is needed by the requested fields
+        if self.is_field_requested("service_providers"):
+            queryset = queryset.prefetch_related("service_providers")
+
+        if self.is_field_requested("members_count"):
+            queryset = queryset.annotate(
+                members_count=Coalesce(
+                    Subquery(
+                        models.TeamAccess.objects.filter(team=OuterRef("pk"))
+                        .order_by()
+                        .values("team")
+                        .annotate(count=Count("pk"))
+                        .values("count")
                     ),
-                ),
+                    Value(0),
+                )
             )
+
+        # Abilities are also needed to check object permissions
+        if self.is_field_requested("abilities") or self.action != "list":
+            user_role_query = models.TeamAccess.objects.filter(
+                user=self.request.user, team=OuterRef("pk")
+            ).values("role")[:1]
+
             # Abilities are computed based on logged-in user's role for the team
             # and if the user does not have access, it's ok to consider them as a member
             # because it's a parent team.
-            .annotate(
+            queryset = queryset.annotate(
                 user_role=Coalesce(
                     Subquery(user_role_query), Value(models.RoleChoices.MEMBER.value)
                 )
             )
-        )
+
+        return queryset
 
     def perform_create(self, serializer):
         """Set the current user as owner of the newly created team."""
@@ -370,6 +511,7 @@ class TeamViewSet(
 
 
 class TeamAccessViewSet(
+    SparseFieldsetsMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -389,6 +531,11 @@ class TeamAccessViewSet(
         - role: str [owner|admin|member]
         Return newly created team access
 
+    POST /api/v1.0/teams/<team_id>/accesses/bulk/ with expected data:
+        - accesses: list of {user: str, role: str [owner|admin|member]}
+        Create the accesses of the users not yet in the team and return
+        the result for each user (created, already_exists or user_not_found)
+
     PUT /api/v1.0/teams/<team_id>/accesses/<team_access_id>/ with expected data:
         - role: str [owner|admin|member]
         Return updated team access
@@ -447,26 +594,42 @@ class TeamAccessViewSet(
                     | Q(user__name__unaccent__icontains=query)
                 )
 
-            # Determine which role the logged-in user has in the team
-            user_role_query = models.TeamAccess.objects.filter(
-                user=self.request.user, team=self.kwargs["team_id"]
-            ).values("role")[:1]
+            # The logged-in user should be part of a team to see its accesses
+            queryset = queryset.filter(
+                team__accesses__user=self.request.user,
+            ).distinct()
+
+            # Abilities are computed based on logged-in user's role and
+            # the user role on each team access (also needed for object permissions)
+            if self.is_field_requested("abilities") or self.action != "list":
+                # Determine which role the logged-in user has in the team
+                user_role_query = models.TeamAccess.objects.filter(
+                    user=self.request.user, team=self.kwargs["team_id"]
+                ).values("role")[:1]
+                queryset = queryset.annotate(user_role=Subquery(user_role_query))
+
+            if not self.is_field_requested("user"):
+                # Drop the join on users made by the base queryset
+                queryset = queryset.select_related(None)
 
-            queryset = (
-                # The logged-in user should be part of a team to see its accesses
-                queryset.filter(
-                    team__accesses__user=self.request.user,
-                )
-                # Abilities are computed based on logged-in user's role and
-                # the user role on each team access
-                .annotate(
-                    user_role=Subquery(user_role_query),
-                )
-                .select_related("user")
-                .distinct()
-            )
         return queryset
 
+    @decorators.action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request, *args, **kwargs):
+        """Create several team accesses at once."""
+        serializer = serializers.TeamAccessBulkCreateSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        return response.Response(
+            {"results": results},
+            status=status.HTTP_201_CREATED
+            if any(result["status"] == "created" for result in results)
+            else status.HTTP_200_OK,
+        )
+
     def destroy(self, request, *args, **kwargs):
         """Forbid deleting the last owner access"""
         instance = self.get_object()
@@ -522,6 +685,11 @@ class InvitationViewset(
         - team : Team, automatically added from requested URI
         Return newly created invitation
 
+    POST /api/v1.0/teams/<team_id>/invitations/bulk/ with expected data:
+        - invitations: list of {email: str, role: str [owner|admin|member]}
+        Return the result of each invitation: created, user_already_exists or
+        already_invited
+
     PUT / PATCH : Not permitted. Instead of updating your invitation,
         delete and create a new one.
 
@@ -552,6 +720,22 @@ class InvitationViewset(
         context["team_id"] = self.kwargs["team_id"]
         return context
 
+    @decorators.action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request, *args, **kwargs):
+        """Invite several people to the team at once."""
+        serializer = serializers.InvitationBulkCreateSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        return response.Response(
+            {"results": results},
+            status=status.HTTP_201_CREATED
+            if any(result["status"] == "created" for result in results)
+            else status.HTTP_200_OK,
+        )
+
     def get_queryset(self):
         """Return the queryset according to the action."""
         queryset = super().get_queryset()
@@ -597,7 +781,12 @@ class ConfigView(views.APIView):
         for setting in array_settings:
             dict_settings[setting] = getattr(settings, setting)
 
-        return response.Response(dict_settings)
+        # Settings are cheap to read, the body is not sent again when unchanged
+        return conditional_response(
+            request,
+            make_etag(dict_settings),
+            lambda: response.Response(dict_settings),
+        )
 
 
 class StatView(views.APIView):
@@ -0,0 +1,55 @@
+"""
+Conditional GET support for the read endpoints polled by clients.
+
+Views compute a cheap watermark of the resource (e.g. `updated_at` fields and
+counts of related objects, read with one query) and return a 304 Not Modified
+response when it matches the `If-None-Match` header of the request, before any
+serialization, abilities computation or prefetch.
+
+The `Last-Modified` header is informational: deletions of related objects do
+not move the `updated_at` watermarks, so only the ETag is used to answer
+conditional requests.
+"""
+
+import hashlib
+import json
+
+from django.db.models import Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Return a weak ETag from the parts which change with the representation."""
+    digest = hashlib.sha256(
+        json.dumps(parts, default=str, sort_keys=True).encode()
+    ).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def conditional_response(request, etag, get_response, last_modified=None):
+    """
+    Return a 304 Not Modified response if the client copy of the resource is
+    still fresh, otherwise the response built by `get_response`, with the
+    ETag and Last-Modified headers.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = get_response()
+
+    if response.status_code in (200, 304):
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def aggregate_subquery(queryset, group_by, aggregate):
+    """
+    Return a subquery of an aggregate (e.g. `Max("updated_at")`) over a queryset
+    filtered on a single value of `group_by`, so several watermarks are read with
+    one query.
+    """
+    return Subquery(
+        queryset.order_by().values(group_by).annotate(value=aggregate).values("value")
+    )
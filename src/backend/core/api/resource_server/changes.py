@@ -0,0 +1,193 @@
+"""
+Changes feed of the resource server API.
+
+Clients synchronize the teams visible to the service provider, their accesses
+and invitations incrementally: each page of changes comes with an opaque cursor
+to get the next changes from.
+
+Creations and updates are read from the `updated_at` field of the objects, and
+deletions from the tombstones. All changes are ordered by their timestamp, then
+by type and primary key, which makes the cursor.
+"""
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from rest_framework import exceptions, status
+
+from core import models
+from core.enums import ChangeObjectTypeChoices
+
+from . import serializers
+
+# Number of sources of changes returned by `get_sources`, the rank of a cursor
+# is one of them, or -1 once all the changes are read
+NB_SOURCES = 4
+
+
+class CursorExpired(exceptions.APIException):
+    """The cursor is older than the retention of the deletions."""
+
+    status_code = status.HTTP_410_GONE
+    default_detail = "This cursor has expired, synchronize again without cursor."
+    default_code = "cursor_expired"
+
+
+def encode_cursor(timestamp, rank, object_id):
+    """Return the opaque cursor of a change."""
+    value = json.dumps([timestamp.isoformat(), rank, object_id and str(object_id)])
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the timestamp, rank and object id of a cursor."""
+    try:
+        timestamp, rank, object_id = json.loads(base64.urlsafe_b64decode(cursor))
+        timestamp = datetime.fromisoformat(timestamp)
+        if timezone.is_naive(timestamp):
+            raise ValueError("The cursor timestamp has no timezone.")
+        if (
+            isinstance(rank, bool)
+            or not isinstance(rank, int)
+            or not -1 <= rank < NB_SOURCES
+        ):
+            raise ValueError(f"Invalid cursor rank: {rank!r}")
+        if rank == -1:
+            object_id = None
+        elif isinstance(object_id, str):
+            object_id = uuid.UUID(object_id)
+        else:
+            raise ValueError(f"Invalid cursor object id: {object_id!r}")
+    except (binascii.Error, TypeError, ValueError) as error:
+        raise exceptions.ValidationError({"cursor": "Invalid cursor."}) from error
+
+    if timestamp < timezone.now() - timedelta(seconds=settings.CHANGES_FEED_RETENTION):
+        raise CursorExpired()
+
+    return timestamp, rank, object_id
+
+
+def _after_cursor(field, rank, cursor):
+    """Filter the changes of a type (rank) which come after the cursor."""
+    timestamp, cursor_rank, object_id = cursor
+    if rank < cursor_rank:
+        return Q(**{f"{field}__gt": timestamp})
+    if rank > cursor_rank:
+        return Q(**{f"{field}__gte": timestamp})
+    return Q(**{f"{field}__gt": timestamp}) | Q(
+        **{field: timestamp, "pk__gt": object_id}
+    )
+
+
+def get_sources(user, service_provider_id):
+    """
+    Return the NB_SOURCES sources of changes, in rank order, as (type, queryset,
+    timestamp field, serializer class) tuples. Serializer classes are None for
+    deletions.
+    """
+    visible_team_ids = models.Team.objects.filter_visible(
+        user, service_provider_id
+    ).values("pk")
+
+    tombstones = models.Tombstone.objects.filter(
+        Q(team_id__in=visible_team_ids)
+        # The user lost their access, or the team was deleted
+        | Q(user_id=user.pk)
+        | Q(
+            Exists(
+                models.Tombstone.objects.filter(
+                    object_type=ChangeObjectTypeChoices.TEAM_ACCESS,
+                    team_id=OuterRef("team_id"),
+                    user_id=user.pk,
+                )
+            ),
+            object_type=ChangeObjectTypeChoices.TEAM,
+        )
+    )
+
+    return [
+        (
+            ChangeObjectTypeChoices.TEAM,
+            models.Team.objects.filter(pk__in=visible_team_ids),
+            "updated_at",
+            serializers.TeamSerializer,
+        ),
+        (
+            ChangeObjectTypeChoices.TEAM_ACCESS,
+            models.TeamAccess.objects.filter(team__in=visible_team_ids),
+            "updated_at",
+            serializers.TeamAccessChangeSerializer,
+        ),
+        (
+            ChangeObjectTypeChoices.INVITATION,
+            models.Invitation.objects.filter(team__in=visible_team_ids),
+            "updated_at",
+            serializers.InvitationSerializer,
+        ),
+        (None, tombstones, "created_at", None),
+    ]
+
+
+def get_changes(user, service_provider_id, cursor=None, limit=100):
+    """
+    Return a page of the changes since the cursor, with the cursor of the next
+    page and whether more changes are available.
+
+    Each type of changes is read with one indexed query of at most `limit + 1`
+    rows, and pages are merged in memory. The most recent changes are held back
+    for `CHANGES_FEED_SETTLE_DELAY`, to not miss changes of long transactions.
+    """
+    decoded_cursor = decode_cursor(cursor) if cursor else None
+    until = timezone.now() - timedelta(seconds=settings.CHANGES_FEED_SETTLE_DELAY)
+
+    rows = []
+    for rank, (object_type, source, field, serializer_class) in enumerate(
+        get_sources(user, service_provider_id)
+    ):
+        queryset = source.filter(**{f"{field}__lte": until})
+        if decoded_cursor:
+            queryset = queryset.filter(_after_cursor(field, rank, decoded_cursor))
+        rows += [
+            (getattr(obj, field), rank, obj.pk, object_type, obj, serializer_class)
+            for obj in queryset.order_by(field, "pk")[: limit + 1]
+        ]
+
+    rows.sort(key=lambda row: row[:3])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    changes = []
+    for _timestamp, _rank, pk, object_type, obj, serializer_class in rows:
+        if serializer_class is None:
+            changes.append(
+                {
+                    "type": obj.object_type,
+                    "action": "deleted",
+                    "id": str(obj.object_id),
+                    "data": None,
+                }
+            )
+        else:
+            changes.append(
+                {
+                    "type": object_type,
+                    "action": "upserted",
+                    "id": str(pk),
+                    "data": serializer_class(obj).data,
+                }
+            )
+
+    # Once all the changes are read, the cursor moves forward even when nothing
+    # changed, so it does not expire
+    next_cursor = (
+        encode_cursor(*rows[-1][:3]) if has_more else encode_cursor(until, -1, None)
+    )
+
+    return {"changes": changes, "cursor": next_cursor, "has_more": has_more}
@@ -1,16 +1,33 @@
 """Exceptions for SCIM API."""
 
 from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+
+from rest_framework import exceptions
 
 from core.api.resource_server.scim.response import ScimJsonResponse
 
 
+class SCIMInvalidFilter(exceptions.ValidationError):
+    """The filter query parameter is not supported."""
+
+    scim_type = "invalidFilter"
+
+
 def scim_exception_handler(exc, _context):
     """Handle SCIM exceptions and return them in the correct format."""
+    if isinstance(exc, Http404):
+        exc = exceptions.NotFound()
+    elif isinstance(exc, PermissionDenied):
+        exc = exceptions.PermissionDenied()
+
     data = {
         "schemas": ["urn:ietf:params:scim:api:messages:2.0:Error"],
         "status": str(exc.status_code),
         "detail": str(exc.detail) if settings.DEBUG else "",
     }
+    if scim_type := getattr(exc, "scim_type", None):
+        data["scimType"] = scim_type
 
     return ScimJsonResponse(data, status=exc.status_code)
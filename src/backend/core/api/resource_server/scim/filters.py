@@ -0,0 +1,48 @@
+"""
+SCIM filters for resource server API.
+
+Only the equality operator is supported, e.g. `displayName eq "My team"`, on
+the attributes declared by each endpoint, which are mapped to indexed lookups.
+"""
+
+import re
+
+from django.db.models import Q
+
+from .exceptions import SCIMInvalidFilter
+
+FILTER_REGEX = re.compile(
+    r'^\s*(?P<attribute>[a-z][\w.]*)\s+eq\s+"(?P<value>(?:[^"\\]|\\.)*)"\s*$',
+    re.IGNORECASE,
+)
+
+
+def parse_filter(filter_string, attributes):
+    """
+    Convert a SCIM filter to a Q object.
+
+    `attributes` maps the lowercased SCIM attributes names to a tuple of
+    the ORM lookup, or a function returning the condition for a value, and the
+    function converting the value (e.g. `uuid.UUID`). A value which can't be
+    converted matches nothing.
+    """
+    match = FILTER_REGEX.match(filter_string)
+    if match is None:
+        raise SCIMInvalidFilter(f"Unsupported filter: {filter_string}")
+
+    try:
+        lookup, converter = attributes[match["attribute"].lower()]
+    except KeyError as error:
+        raise SCIMInvalidFilter(
+            f"Unsupported filter attribute: {match['attribute']}"
+        ) from error
+
+    value = re.sub(r"\\(.)", r"\1", match["value"])
+    try:
+        value = converter(value)
+    except ValueError:
+        return Q(pk__in=[])
+
+    if callable(lookup):
+        return Q(lookup(value))
+    return Q(**{lookup: value})
@@ -5,10 +5,16 @@ from django.urls import reverse
 from rest_framework import serializers
 
 from core import models
+from core.api.client.serializers import DynamicFieldsModelSerializer
 
 
-class SCIMUserSerializer(serializers.ModelSerializer):
-    """Serialize users in SCIM format."""
+class SCIMUserSerializer(DynamicFieldsModelSerializer):
+    """
+    Serialize users in SCIM format.
+
+    The `location_url_name` context key allows to set the URL of the user
+    resource, which defaults to the `/Me` endpoint.
+    """
 
     schemas = serializers.SerializerMethodField()
     userName = serializers.CharField(source="sub")
@@ -76,10 +82,14 @@ class SCIMUserSerializer(serializers.ModelSerializer):
     def get_meta(self, obj):
         """Return metadata about the user."""
         request = self.context.get("request")
+        url_name = self.context.get("location_url_name")
+        path = (
+            reverse(url_name, kwargs={"pk": obj.pk})
+            if url_name
+            else reverse("scim-me-list")
+        )
         location = (
-            f"{request.build_absolute_uri('/').rstrip('/')}{reverse('scim-me-list')}"
-            if request
-            else None
+            f"{request.build_absolute_uri('/').rstrip('/')}{path}" if request else None
         )
 
         return {
@@ -88,3 +98,63 @@ class SCIMUserSerializer(serializers.ModelSerializer):
             "lastModified": obj.updated_at.isoformat(),
             "location": location,
         }
+
+
+class SCIMGroupSerializer(DynamicFieldsModelSerializer):
+    """
+    Serialize teams as groups in SCIM format.
+
+    The group `id` is the team `external_id`, as in the `groups` of the users.
+    """
+
+    schemas = serializers.SerializerMethodField()
+    id = serializers.UUIDField(source="external_id")
+    displayName = serializers.CharField(source="name")
+    members = serializers.SerializerMethodField()
+    meta = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Team
+        fields = [
+            "id",
+            "schemas",
+            "displayName",
+            "members",
+            "meta",
+        ]
+        read_only_fields = fields
+
+    def get_schemas(self, _obj):
+        """Return the SCIM schemas for the group."""
+        return ["urn:ietf:params:scim:schemas:core:2.0:Group"]
+
+    def get_members(self, obj):
+        """
+        Return the users members of the group.
+
+        WARNING: you need to prefetch the team accesses with their user in the
+        viewset to avoid N+1 queries.
+        """
+        return [
+            {
+                "value": str(team_access.user.pk),
+                "display": team_access.user.name,
+                "type": "User",
+            }
+            for team_access in obj.accesses.all()
+        ]
+
+    def get_meta(self, obj):
+        """Return metadata about the group."""
+        request = self.context.get("request")
+        path = reverse("scim-groups-detail", kwargs={"external_id": obj.external_id})
+        location = (
+            f"{request.build_absolute_uri('/').rstrip('/')}{path}" if request else None
+        )
+
+        return {
+            "resourceType": "Group",
+            "created": obj.created_at.isoformat(),
+            "lastModified": obj.updated_at.isoformat(),
+            "location": location,
+        }
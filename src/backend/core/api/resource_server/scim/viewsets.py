@@ -1,7 +1,10 @@
 """Resource server SCIM API endpoints"""
 
+import uuid
+
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch, Q
+from django.db.models import Count, Exists, Max, OuterRef, Prefetch, Q
+from django.utils.cache import get_conditional_response
 
 from lasuite.oidc_resource_server.mixins import ResourceServerMixin
 from rest_framework import (
@@ -9,14 +12,20 @@ from rest_framework import (
 )
 
 from core.api import permissions
-from core.models import TeamAccess
+from core.api.conditional import make_etag
+from core.models import ServiceProvider, Team, TeamAccess
 
 from . import serializers
 from .exceptions import scim_exception_handler
+from .filters import parse_filter
 from .response import ScimJsonResponse
 
 User = get_user_model()
 
+# Number of resources returned by page when the `count` parameter is not given
+SCIM_DEFAULT_COUNT = 100
+SCIM_MAX_COUNT = 1000
+
 
 class MeViewSet(ResourceServerMixin, viewsets.ViewSet):
     """
@@ -44,19 +53,279 @@ class MeViewSet(ResourceServerMixin, viewsets.ViewSet):
         """Override the default exception handler to use SCIM-specific handling."""
         return scim_exception_handler
 
+    @staticmethod
+    def _make_etag(user, accesses_count, accesses_updated_at, teams_updated_at):
+        """Return the ETag of the user details from their watermarks."""
+        return make_etag(
+            user.pk,
+            user.updated_at,
+            accesses_count,
+            accesses_updated_at,
+            teams_updated_at,
+        )
+
     def list(self, request, *args, **kwargs):
-        """Return the current user's details in SCIM format."""
-        service_provider_audience = self._get_service_provider_audience()
+        """
+        Return the current user's details in SCIM format.
 
-        user = User.objects.prefetch_related(
-            Prefetch(
-                "accesses",
-                queryset=TeamAccess.objects.select_related("team").filter(
-                    Q(team__service_providers__audience_id=service_provider_audience)
-                    | Q(team__is_visible_all_services=True)
-                ),
+        When the request is conditional, the watermarks of the user team accesses
+        are read with one query, and the details are only loaded if they changed.
+        """
+        service_provider_id = ServiceProvider.objects.get_id_for_audience(
+            self._get_service_provider_audience()
+        )
+        is_visible = Q(team__is_visible_all_services=True)
+        if service_provider_id is not None:
+            is_visible |= Q(team__service_providers=service_provider_id)
+        accesses = TeamAccess.objects.filter(is_visible)
+
+        if request.headers.get("If-None-Match"):
+            watermark = accesses.filter(user=request.user).aggregate(
+                count=Count("pk"),
+                accesses_updated_at=Max("updated_at"),
+                teams_updated_at=Max("team__updated_at"),
             )
+            etag = self._make_etag(
+                request.user,
+                watermark["count"],
+                watermark["accesses_updated_at"],
+                watermark["teams_updated_at"],
+            )
+            if not_modified := get_conditional_response(request, etag=etag):
+                not_modified.headers["ETag"] = etag
+                return not_modified
+
+        user = User.objects.prefetch_related(
+            Prefetch("accesses", queryset=accesses.select_related("team"))
         ).get(pk=request.user.pk)
 
+        user_accesses = user.accesses.all()
+        etag = self._make_etag(
+            user,
+            len(user_accesses),
+            max((access.updated_at for access in user_accesses), default=None),
+            max((access.team.updated_at for access in user_accesses), default=None),
+        )
         serializer = self.serializer_class(user, context={"request": request})
-        return ScimJsonResponse(serializer.data)
+        return ScimJsonResponse(serializer.data, headers={"ETag": etag})
+
+
+class SCIMResourceViewSet(ResourceServerMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Base ViewSet for the SCIM resources endpoints, restricted to the teams the
+    authenticated user is a member of and which are visible to the audience.
+
+    Query parameters of the list endpoint:
+    - filter: an equality filter on one of the `filter_attributes`,
+      e.g. `displayName eq "My team"`;
+    - startIndex, count: the 1-based index of the first resource of the page and
+      the number of resources of the page;
+    - attributes, excludedAttributes: the attributes to return or not, as comma
+      separated names (the `id` and `schemas` attributes are always returned).
+
+    Subclasses must implement `get_queryset` and declare `filter_attributes`, or
+    override `get_filter_attributes` for filters depending on the request.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_value_regex = "[0-9a-fA-F-]{36}"
+    location_url_name = None
+    # Lowercased SCIM attribute name -> (ORM lookup, value converter)
+    filter_attributes = {}
+
+    def get_exception_handler(self):
+        """Override the default exception handler to use SCIM-specific handling."""
+        return scim_exception_handler
+
+    def get_visible_teams(self):
+        """Return the teams visible to the authenticated user for the audience."""
+        return Team.objects.filter_visible(
+            self.request.user,
+            ServiceProvider.objects.get_id_for_audience(
+                self._get_service_provider_audience()
+            ),
+        )
+
+    def _get_attributes(self, param):
+        """Return the set of attributes listed in a query parameter, or None."""
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        # Sub-attributes (e.g. `members.value`) select their whole attribute
+        return {
+            attribute.strip().split(".")[0]
+            for attribute in value.split(",")
+            if attribute.strip()
+        }
+
+    def is_attribute_requested(self, name):
+        """Return True if the attribute will be returned in the response."""
+        attributes = self._get_attributes("attributes")
+        if attributes is not None and name not in attributes:
+            return False
+        return name not in (self._get_attributes("excludedAttributes") or ())
+
+    def get_serializer(self, *args, **kwargs):
+        """Restrict the serialized attributes to the requested ones."""
+        always_returned = {"id", "schemas"}
+        if (attributes := self._get_attributes("attributes")) is not None:
+            kwargs.setdefault("fields", attributes | always_returned)
+        if (excluded := self._get_attributes("excludedAttributes")) is not None:
+            kwargs.setdefault("omit", excluded - always_returned)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_serializer_context(self):
+        """Extra context provided to the serializer class."""
+        context = super().get_serializer_context()
+        context["location_url_name"] = self.location_url_name
+        return context
+
+    def get_filter_attributes(self):
+        """Return the attributes supported by the SCIM `filter` query parameter."""
+        return self.filter_attributes
+
+    def filter_queryset(self, queryset):
+        """Apply the SCIM `filter` query parameter on list."""
+        if self.action == "list" and (
+            filter_string := self.request.query_params.get("filter")
+        ):
+            queryset = queryset.filter(
+                parse_filter(filter_string, self.get_filter_attributes())
+            )
+        return queryset
+
+    def _get_int_param(self, name, default, minimum):
+        """Return an integer query parameter, at least `minimum`."""
+        try:
+            value = int(self.request.query_params[name])
+        except KeyError, ValueError:
+            return default
+        return max(value, minimum)
+
+    def list(self, request, *args, **kwargs):
+        """Return a page of resources in a SCIM list response."""
+        queryset = self.filter_queryset(self.get_queryset())
+        start_index = self._get_int_param("startIndex", 1, 1)
+        count = min(self._get_int_param("count", SCIM_DEFAULT_COUNT, 0), SCIM_MAX_COUNT)
+
+        total_results = queryset.count()
+        resources = (
+            self.get_serializer(
+                queryset[start_index - 1 : start_index - 1 + count], many=True
+            ).data
+            if count and start_index <= total_results
+            else []
+        )
+
+        return ScimJsonResponse(
+            {
+                "schemas": ["urn:ietf:params:scim:api:messages:2.0:ListResponse"],
+                "totalResults": total_results,
+                "startIndex": start_index,
+                "itemsPerPage": len(resources),
+                "Resources": resources,
+            }
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return a resource in SCIM format."""
+        return ScimJsonResponse(self.get_serializer(self.get_object()).data)
+
+
+class GroupViewSet(SCIMResourceViewSet):
+    """
+    SCIM-compliant ViewSet for the /Groups endpoint.
+
+    Endpoints:
+    GET /resource-server/v1.0/scim/Groups/
+        List the groups, supported filters are on `id`, `displayName` and
+        `members.value`.
+
+    GET /resource-server/v1.0/scim/Groups/{external_id}/
+        Retrieve a group.
+    """
+
+    serializer_class = serializers.SCIMGroupSerializer
+    lookup_field = "external_id"
+    filter_attributes = {
+        "id": ("external_id", uuid.UUID),
+        "displayname": ("name", str),
+        "members.value": ("accesses__user_id", uuid.UUID),
+    }
+
+    def get_queryset(self):
+        """Return the visible teams, with their members when returned."""
+        queryset = self.get_visible_teams().order_by("pk")
+
+        if self.is_attribute_requested("members"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "accesses",
+                    queryset=TeamAccess.objects.select_related("user").order_by(
+                        "created_at"
+                    ),
+                )
+            )
+
+        return queryset
+
+
+class UserViewSet(SCIMResourceViewSet):
+    """
+    SCIM-compliant ViewSet for the /Users endpoint: the members of the groups.
+
+    Endpoints:
+    GET /resource-server/v1.0/scim/Users/
+        List the users, supported filters are on `id`, `userName`,
+        `displayName` and `groups.value`.
+
+    GET /resource-server/v1.0/scim/Users/{user_id}/
+        Retrieve a user.
+    """
+
+    serializer_class = serializers.SCIMUserSerializer
+    location_url_name = "scim-users-detail"
+    filter_attributes = {
+        "id": ("pk", uuid.UUID),
+        "username": ("sub", str),
+        "displayname": ("name", str),
+    }
+
+    def get_filter_attributes(self):
+        """Filter on the groups visible to the audience only."""
+        visible_team_ids = self.get_visible_teams().values("pk")
+        return self.filter_attributes | {
+            "groups.value": (
+                lambda external_id: Exists(
+                    TeamAccess.objects.filter(
+                        user=OuterRef("pk"),
+                        team__in=visible_team_ids,
+                        team__external_id=external_id,
+                    )
+                ),
+                uuid.UUID,
+            ),
+        }
+
+    def get_queryset(self):
+        """Return the members of the visible teams, with their groups when returned."""
+        visible_teams = self.get_visible_teams()
+        queryset = User.objects.filter(
+            Exists(
+                TeamAccess.objects.filter(
+                    user=OuterRef("pk"), team__in=visible_teams.values("pk")
+                )
+            )
+        ).order_by("pk")
+
+        if self.is_attribute_requested("groups"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "accesses",
+                    queryset=TeamAccess.objects.select_related("team").filter(
+                        team__in=visible_teams.values("pk")
+                    ),
+                )
+            )
+
+        return queryset
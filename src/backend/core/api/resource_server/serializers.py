@@ -1,11 +1,19 @@
 """Client serializers for the People core app resource server API."""
 
-from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.db.models.functions import Length, Substr
+from django.utils import timezone
+
+from rest_framework import exceptions, serializers
 
 from core import models
+from core.api.client.serializers import DynamicFieldsModelSerializer
+
+TEAMS_IMPORT_MAX_SIZE = 5000
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(DynamicFieldsModelSerializer):
     """Serialize teams."""
 
     class Meta:
@@ -38,9 +46,8 @@ class TeamSerializer(serializers.ModelSerializer):
 
         When the service provider audience is unknown it is created on the fly.
         """
-        sp_audience = self.context["from_service_provider_audience"]
-        service_provider, _created = models.ServiceProvider.objects.get_or_create(
-            audience_id=sp_audience
+        service_provider_id = models.ServiceProvider.objects.get_id_for_audience(
+            self.context["from_service_provider_audience"], create=True
         )
 
         # Note: this is not the purpose of this API to check the user has an organization
@@ -48,12 +55,325 @@ class TeamSerializer(serializers.ModelSerializer):
             validated_data=validated_data
             | {
                 "organization_id": self.context["request"].user.organization_id,
-                "service_providers": [service_provider],
+                "service_providers": [service_provider_id],
             },
         )
 
 
-class InvitationSerializer(serializers.ModelSerializer):
+class TeamAccessChangeSerializer(serializers.ModelSerializer):
+    """Serialize team accesses in the changes feed."""
+
+    class Meta:
+        model = models.TeamAccess
+        fields = ["id", "created_at", "role", "team", "updated_at", "user"]
+        read_only_fields = fields
+
+
+class TeamTreeImportItemSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Validate a team to import, with its children teams."""
+
+    external_id = serializers.UUIDField()
+    name = serializers.CharField(max_length=100)
+    is_visible_all_services = serializers.BooleanField(required=False)
+
+    def get_fields(self):
+        """Children teams are validated with this same serializer."""
+        fields = super().get_fields()
+        fields["children"] = TeamTreeImportItemSerializer(many=True, required=False)
+        return fields
+
+
+class TeamTreeImportSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Validate trees of teams to import from a service provider. The top level teams
+    are root teams.
+
+    Teams are identified by their `external_id`: existing teams must be available
+    for the service provider and belong to the organization of the logged-in user.
+    Existing teams can only be updated, moved or given new children by owners and
+    administrators of the team or of one of its ancestors, as importing trees makes
+    the logged-in user owner of the new root teams only.
+    """
+
+    teams = TeamTreeImportItemSerializer(many=True, allow_empty=False)
+
+    @staticmethod
+    def _flatten(trees, parent=None, depth=1):
+        """Yield (team, parent external_id, depth) for all the teams, in pre-order."""
+        for tree in trees:
+            yield tree, parent, depth
+            yield from TeamTreeImportSerializer._flatten(
+                tree.get("children", []), tree["external_id"], depth + 1
+            )
+
+    def validate(self, attrs):
+        """
+        Check the size of the trees, the unicity of the external ids and load the
+        existing teams with one query.
+        """
+        nodes = list(self._flatten(attrs["teams"]))
+        if len(nodes) > TEAMS_IMPORT_MAX_SIZE:
+            raise serializers.ValidationError(
+                {
+                    "teams": f"Ensure there are no more than {TEAMS_IMPORT_MAX_SIZE} "
+                    "teams."
+                }
+            )
+
+        max_depth = (
+            models.Team._meta.get_field("path").max_length  # noqa: SLF001
+            // models.Team.steplen
+        )
+        if max(depth for _tree, _parent, depth in nodes) > max_depth:
+            raise serializers.ValidationError(
+                {"teams": f"Ensure trees are no deeper than {max_depth} levels."}
+            )
+
+        external_ids = [tree["external_id"] for tree, _parent, _depth in nodes]
+        if len(set(external_ids)) != len(external_ids):
+            raise serializers.ValidationError(
+                {"teams": "Teams external ids must be unique."}
+            )
+
+        user = self.context["request"].user
+        service_provider_id = models.ServiceProvider.objects.get_id_for_audience(
+            self.context["from_service_provider_audience"]
+        )
+        existing_teams = {
+            team.external_id: team
+            for team in models.Team.objects.filter(
+                external_id__in=external_ids
+            ).annotate(
+                is_importable=Exists(
+                    models.Team.service_providers.through.objects.filter(
+                        team_id=OuterRef("pk"),
+                        serviceprovider_id=service_provider_id,
+                    )
+                ),
+                # The user is owner or administrator of the team or of an ancestor,
+                # whose path is a prefix of the team path
+                is_manageable=Exists(
+                    models.TeamAccess.objects.filter(
+                        user=user,
+                        role__in=[models.RoleChoices.OWNER, models.RoleChoices.ADMIN],
+                    )
+                    .alias(
+                        team_path_prefix=Substr(
+                            OuterRef("path"), 1, Length("team__path")
+                        )
+                    )
+                    .filter(team__path=F("team_path_prefix"))
+                ),
+            )
+        }
+        organization_id = user.organization_id
+        if conflicts := [
+            str(external_id)
+            for external_id, team in existing_teams.items()
+            if not team.is_importable or team.organization_id != organization_id
+        ]:
+            raise serializers.ValidationError(
+                {"teams": f"Teams already exist: {', '.join(conflicts)}."}
+            )
+
+        self._check_changes_permissions(nodes, existing_teams)
+
+        attrs["nodes"] = nodes
+        attrs["existing_teams"] = existing_teams
+        return attrs
+
+    def _check_changes_permissions(self, nodes, existing_teams):
+        """
+        Check the logged-in user manages the existing teams which are updated,
+        moved, used as new parent or given new children.
+        """
+        new_subtrees, moves = self._get_changes(nodes, existing_teams, {})
+        changed = {parent for parent in new_subtrees if parent is not None}
+        for team, parent in moves:
+            changed.add(team.external_id)
+            if parent in existing_teams:
+                changed.add(parent)
+        changed |= {
+            tree["external_id"]
+            for tree, _parent, _depth in nodes
+            if tree["external_id"] in existing_teams
+            and self._is_updated(existing_teams[tree["external_id"]], tree)
+        }
+
+        if forbidden := sorted(
+            str(external_id)
+            for external_id in changed
+            if not existing_teams[external_id].is_manageable
+        ):
+            raise exceptions.PermissionDenied(
+                "You must be owner or administrator of the teams to change: "
+                f"{', '.join(forbidden)}."
+            )
+
+    @staticmethod
+    def _get_changes(nodes, existing_teams, new_team_data):
+        """
+        Return the subtrees of new teams, by external id of their closest existing
+        ancestor (None for root teams), and the existing teams which changed of
+        parent, with the external id of their new parent, in pre-order.
+        """
+        existing_paths = {team.path: team for team in existing_teams.values()}
+        new_subtrees = {}
+        new_trees = {}
+        moves = []
+
+        for tree, parent, _depth in nodes:
+            team = existing_teams.get(tree["external_id"])
+            if team is None:
+                new_tree = new_team_data | {
+                    "external_id": tree["external_id"],
+                    "name": tree["name"],
+                    "is_visible_all_services": tree.get(
+                        "is_visible_all_services", False
+                    ),
+                    "children": [],
+                }
+                new_trees[tree["external_id"]] = new_tree
+                if parent in new_trees:
+                    new_trees[parent]["children"].append(new_tree)
+                else:
+                    new_subtrees.setdefault(parent, []).append(new_tree)
+                continue
+
+            if team.depth == 1:
+                is_moved = parent is not None
+            else:
+                # Teams whose current parent is not imported are moved as well
+                current_parent = existing_paths.get(team.path[: -models.Team.steplen])
+                is_moved = (
+                    current_parent is None or current_parent.external_id != parent
+                )
+            if is_moved:
+                moves.append((team, parent))
+
+        return new_subtrees, moves
+
+    @staticmethod
+    def _move_teams(moves, teams):
+        """
+        Move the teams to their new parent. Moves update the paths of the whole
+        moved subtrees, so teams are reloaded before each move.
+        """
+        for moved_team, parent in moves:
+            team = models.Team.objects.get(pk=moved_team.pk)
+            if parent is None:
+                team.move(models.Team.get_last_root_node(), "last-sibling")
+            else:
+                team.move(models.Team.objects.get(pk=teams[parent].pk), "last-child")
+
+    @staticmethod
+    def _is_updated(team, tree):
+        """Return True if the imported tree changes the name or visibility of a team."""
+        return team.name != tree["name"] or team.is_visible_all_services != tree.get(
+            "is_visible_all_services", team.is_visible_all_services
+        )
+
+    @classmethod
+    def _update_teams(cls, nodes, existing_teams):
+        """Update the existing teams which changed, with one query."""
+        updated_teams = []
+        now = timezone.now()
+
+        for tree, _parent, _depth in nodes:
+            team = existing_teams.get(tree["external_id"])
+            if team is None:
+                continue
+            if cls._is_updated(team, tree):
+                team.name = tree["name"]
+                team.is_visible_all_services = tree.get(
+                    "is_visible_all_services", team.is_visible_all_services
+                )
+                team.updated_at = now
+                updated_teams.append(team)
+
+        if updated_teams:
+            models.Team.objects.bulk_update(
+                updated_teams, ["name", "is_visible_all_services", "updated_at"]
+            )
+        return updated_teams
+
+    def create(self, validated_data):
+        """
+        Create the new teams, with their descendants, with one insert per existing
+        parent, move the existing teams which changed of parent and update the
+        existing teams which changed, with one query.
+
+        Teams which are not in the trees are left untouched. The order of sibling
+        teams is not synchronized.
+
+        Return the result for each team, in pre-order.
+        """
+        nodes = validated_data["nodes"]
+        existing_teams = validated_data["existing_teams"]
+        user = self.context["request"].user
+
+        service_provider_id = models.ServiceProvider.objects.get_id_for_audience(
+            self.context["from_service_provider_audience"], create=True
+        )
+        new_subtrees, moves = self._get_changes(
+            nodes,
+            existing_teams,
+            {
+                "organization_id": user.organization_id,
+                "service_providers": [service_provider_id],
+            },
+        )
+
+        with transaction.atomic():
+            created_teams = {}
+            for parent, subtrees in new_subtrees.items():
+                created_teams |= {
+                    team.external_id: team
+                    for team in models.Team.objects.create_subtrees(
+                        subtrees,
+                        parent_id=existing_teams[parent].pk if parent else None,
+                    )
+                }
+
+            # The logged-in user owns the new root teams, so the whole new trees
+            models.TeamAccess.objects.bulk_create(
+                [
+                    models.TeamAccess(
+                        team=created_teams[tree["external_id"]],
+                        user=user,
+                        role=models.RoleChoices.OWNER,
+                    )
+                    for tree in new_subtrees.get(None, [])
+                ],
+                ignore_conflicts=True,
+            )
+            if None in new_subtrees:
+                models.User.clear_abilities_cache([user.pk])
+
+            self._move_teams(moves, existing_teams | created_teams)
+            updated_teams = self._update_teams(nodes, existing_teams)
+
+        updated_ids = {team.pk for team, _parent in moves} | {
+            team.pk for team in updated_teams
+        }
+        results = []
+        for tree, _parent, _depth in nodes:
+            if team := created_teams.get(tree["external_id"]):
+                status = "created"
+            else:
+                team = existing_teams[tree["external_id"]]
+                status = "updated" if team.pk in updated_ids else "unchanged"
+            results.append(
+                {
+                    "external_id": str(tree["external_id"]),
+                    "id": str(team.pk),
+                    "status": status,
+                }
+            )
+        return results
+
+
+class InvitationSerializer(DynamicFieldsModelSerializer):
     """Serialize invitations."""
 
     class Meta:
@@ -63,12 +383,15 @@ class InvitationSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         """Fill team and issuer from request."""
-        is_team_available_for_service_provider = models.Team.objects.filter(
-            id=self.context["team_id"],
-            service_providers__audience_id=self.context[
-                "from_service_provider_audience"
-            ],
-        ).exists()
+        service_provider_id = models.ServiceProvider.objects.get_id_for_audience(
+            self.context["from_service_provider_audience"]
+        )
+        is_team_available_for_service_provider = (
+            service_provider_id is not None
+            and models.Team.objects.filter(
+                id=self.context["team_id"], service_providers=service_provider_id
+            ).exists()
+        )
         if not is_team_available_for_service_provider:
             raise serializers.ValidationError({"team": "Team not found."})
 
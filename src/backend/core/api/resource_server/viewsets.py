@@ -3,25 +3,34 @@
 import operator
 from functools import reduce
 
-from django.db.models import OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models import OuterRef, Q, Subquery, Value
 from django.db.models.functions import Coalesce
 
 from lasuite.oidc_resource_server.mixins import ResourceServerMixin
 from rest_framework import (
+    decorators,
     filters,
     mixins,
+    response,
+    status,
     viewsets,
 )
 
 from core import models
 from core.api import permissions
-from core.api.client.viewsets import Pagination
+from core.api.client.viewsets import Pagination, SparseFieldsetsMixin
+from core.api.conditional import conditional_response, make_etag
 
-from . import serializers
+from . import changes, serializers
+
+# Number of changes returned by page when the `limit` parameter is not given
+CHANGES_DEFAULT_LIMIT = 100
+CHANGES_MAX_LIMIT = 1000
 
 
 class TeamViewSet(  # pylint: disable=too-many-ancestors
     ResourceServerMixin,
+    SparseFieldsetsMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -48,6 +57,12 @@ class TeamViewSet(  # pylint: disable=too-many-ancestors
     PUT /resource-server/v1.0/teams/{team_id}/
         Update the Team details (only name for now).
 
+    POST /resource-server/v1.0/teams/import/
+        Create or update trees of Teams identified by their `external_id`,
+        for the audience.
+
+    The `fields` and `omit` query parameters allow to select the returned fields,
+    e.g. `?fields=id,name`.
     """
 
     permission_classes = [permissions.AccessPermission]
@@ -68,52 +83,70 @@ class TeamViewSet(  # pylint: disable=too-many-ancestors
         if not depth_path:
             return models.Team.objects.none()
 
-        user_role_query = models.TeamAccess.objects.filter(
-            user=self.request.user, team=OuterRef("pk")
-        ).values("role")[:1]
+        service_provider_id = models.ServiceProvider.objects.get_id_for_audience(
+            self._get_service_provider_audience()
+        )
 
-        service_provider_audience = self._get_service_provider_audience()
-        service_provider_prefetch = Prefetch(
-            "service_providers",
-            queryset=models.ServiceProvider.objects.filter(
-                audience_id=service_provider_audience
+        is_visible = Q(is_visible_all_services=True)
+        if service_provider_id is not None:
+            is_visible |= Q(service_providers=service_provider_id)
+
+        # The serializer embeds neither the accesses nor the service providers
+        queryset = models.Team.objects.filter(
+            reduce(
+                operator.or_,
+                (
+                    Q(
+                        # The team the user has access to
+                        depth=d["depth"],
+                        path=d["path"],
+                    )
+                    | Q(
+                        # The parent team the user has access to
+                        depth__lt=d["depth"],
+                        path__startswith=d["path"][: models.Team.steplen],
+                        organization_id=self.request.user.organization_id,
+                    )
+                    for d in depth_path
+                ),
             ),
+            is_visible,
         )
 
-        return (
-            models.Team.objects.prefetch_related(
-                "accesses",
-                service_provider_prefetch,
-            )
-            .filter(
-                reduce(
-                    operator.or_,
-                    (
-                        Q(
-                            # The team the user has access to
-                            depth=d["depth"],
-                            path=d["path"],
-                        )
-                        | Q(
-                            # The parent team the user has access to
-                            depth__lt=d["depth"],
-                            path__startswith=d["path"][: models.Team.steplen],
-                            organization_id=self.request.user.organization_id,
-                        )
-                        for d in depth_path
-                    ),
-                ),
-                Q(service_providers__audience_id=service_provider_audience)
-                | Q(is_visible_all_services=True),
-            )
+        # Abilities are only needed to check object permissions
+        if self.action != "list":
+            user_role_query = models.TeamAccess.objects.filter(
+                user=self.request.user, team=OuterRef("pk")
+            ).values("role")[:1]
+
             # Abilities are computed based on logged-in user's role for the team
             # and if the user does not have access, it's ok to consider them as a member
             # because it's a parent team.
-            .annotate(
+            queryset = queryset.annotate(
                 user_role=Coalesce(
                     Subquery(user_role_query), Value(models.RoleChoices.MEMBER.value)
                 )
             )
+
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the team, or a 304 Not Modified response when the client copy is
+        still fresh: tree fields are updated without moving `updated_at`.
+        """
+        team = self.get_object()
+        return conditional_response(
+            request,
+            make_etag(
+                team.pk,
+                team.updated_at,
+                team.path,
+                team.numchild,
+                sorted(request.query_params.lists()),
+            ),
+            lambda: response.Response(self.get_serializer(team).data),
+            last_modified=team.updated_at,
         )
 
     def perform_create(self, serializer):
@@ -125,9 +158,29 @@ class TeamViewSet(  # pylint: disable=too-many-ancestors
             role=models.RoleChoices.OWNER,
         )
 
+    @decorators.action(detail=False, methods=["post"], url_path="import")
+    def import_trees(self, request, *args, **kwargs):
+        """
+        Create or update trees of teams at once, e.g. to mirror the organization
+        chart of the service provider. Importing the same trees again is a no-op.
+        """
+        serializer = serializers.TeamTreeImportSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        return response.Response(
+            {"results": results},
+            status=status.HTTP_201_CREATED
+            if any(result["status"] == "created" for result in results)
+            else status.HTTP_200_OK,
+        )
+
 
 class InvitationViewset(  # pylint: disable=too-many-ancestors
     ResourceServerMixin,
+    SparseFieldsetsMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -178,7 +231,11 @@ class InvitationViewset(  # pylint: disable=too-many-ancestors
 
     def get_queryset(self):
         """Return the queryset according to the action."""
-        service_provider_audience = self._get_service_provider_audience()
+        service_provider_id = models.ServiceProvider.objects.get_id_for_audience(
+            self._get_service_provider_audience()
+        )
+        if service_provider_id is None:
+            return models.Invitation.objects.none()
 
         # Determine which role the logged-in user has in the team
         user_role_query = models.TeamAccess.objects.filter(
@@ -192,7 +249,7 @@ class InvitationViewset(  # pylint: disable=too-many-ancestors
                 # The logged-in user should be part of a team to see its accesses
                 team__accesses__user=self.request.user,
                 # The team should be accessible by the service provider audience
-                team__service_providers__audience_id=service_provider_audience,
+                team__service_providers=service_provider_id,
             )
             .annotate(user_role=Subquery(user_role_query))
             .order_by("-created_at")
@@ -200,3 +257,48 @@ class InvitationViewset(  # pylint: disable=too-many-ancestors
         )
 
         return queryset
+
+
+class ChangesViewSet(ResourceServerMixin, viewsets.ViewSet):
+    """
+    Changes feed of the teams visible to the audience, their accesses and their
+    invitations, for incremental synchronizations.
+
+    GET /resource-server/v1.0/changes/?cursor=<cursor>&limit=<limit>
+        Return the changes since the cursor (everything when no cursor is given),
+        oldest first, with the cursor to use for the next call:
+        {
+            "changes": [
+                {
+                    "type": "team" | "team_access" | "invitation",
+                    "action": "upserted" | "deleted",
+                    "id": <object id>,
+                    "data": <object> | null,
+                },
+            ],
+            "cursor": <cursor>,
+            "has_more": <whether to call again right away>,
+        }
+        Cursors expire after `CHANGES_FEED_RETENTION` (410 Gone): clients must
+        synchronize again without cursor.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        """Return a page of changes since the cursor."""
+        try:
+            limit = int(request.query_params.get("limit", CHANGES_DEFAULT_LIMIT))
+        except ValueError:
+            limit = CHANGES_DEFAULT_LIMIT
+
+        return response.Response(
+            changes.get_changes(
+                request.user,
+                models.ServiceProvider.objects.get_id_for_audience(
+                    self._get_service_provider_audience()
+                ),
+                cursor=request.query_params.get("cursor"),
+                limit=min(max(limit, 1), CHANGES_MAX_LIMIT),
+            )
+        )
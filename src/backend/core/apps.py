@@ -67,3 +67,6 @@ class CoreConfig(AppConfig):
     def ready(self):
         """Run when the application is ready."""
         _register_management_commands_as_task()
+
+        # pylint: disable=import-outside-toplevel, unused-import
+        import core.signals  # noqa: PLC0415
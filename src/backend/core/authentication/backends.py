@@ -1,14 +1,21 @@
 """Authentication Backends for the People core app."""
 
+import hashlib
 import logging
+import time
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import SuspiciousOperation
 from django.utils.translation import gettext_lazy as _
 
 from lasuite.oidc_login.backends import (
     OIDCAuthenticationBackend as LaSuiteOIDCAuthenticationBackend,
 )
+from lasuite.oidc_resource_server.backend import (
+    JWTResourceServerBackend,
+    ResourceServerBackend,
+)
 from lasuite.tools.email import get_domain_from_email
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
@@ -144,6 +151,99 @@ class OIDCAuthenticationBackend(LaSuiteOIDCAuthenticationBackend):
         return user
 
 
+class IntrospectionCacheMixin:
+    """
+    Cache the token introspection results of a resource server backend.
+
+    Service providers usually call the resource server several times with the
+    same access token, each call costing a request to the authorization server.
+    The verified introspection response of a token is stored in the shared cache
+    under a hash of the token, until the token `exp` claim and for at most
+    `OIDC_RS_INTROSPECTION_CACHE_TIMEOUT` seconds. The user is still loaded from
+    the database on each call.
+
+    Tokens the authorization server considers invalid are also cached for
+    `OIDC_RS_INTROSPECTION_NEGATIVE_CACHE_TIMEOUT` seconds. Errors raised before
+    the authorization server answered (network errors...) are never cached.
+    """
+
+    cache_key_prefix = "rs_introspection"
+    invalid_token_marker = "invalid"  # noqa: S105
+
+    _introspection_response = None
+
+    def _get_introspection_cache_key(self, access_token):
+        """Generate a cache key which does not leak the access token."""
+        token_hash = hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+        return f"{self.cache_key_prefix}_{token_hash}"
+
+    def _get_introspection_cache_timeout(self, user_info):
+        """Return the cache timeout, bounded by the token expiration time."""
+        timeout = settings.OIDC_RS_INTROSPECTION_CACHE_TIMEOUT
+        if expiration := user_info.get("exp"):
+            timeout = min(timeout, int(expiration - time.time()))
+        return timeout
+
+    def _verify_user_info(self, introspection_response):
+        """Keep track of the introspection response of the current token."""
+        self._introspection_response = introspection_response
+        return super()._verify_user_info(introspection_response)
+
+    def get_user_info_with_introspection(self, access_token):
+        """
+        Return the cached introspection response of already known tokens, and
+        restore the audience of the token, instead of introspecting them again.
+
+        Invalid tokens fail the authentication.
+        """
+        if not settings.OIDC_RS_INTROSPECTION_CACHE_TIMEOUT:
+            return super().get_user_info_with_introspection(access_token)
+
+        cache_key = self._get_introspection_cache_key(access_token)
+        cached_user_info = cache.get(cache_key)
+
+        if cached_user_info == self.invalid_token_marker:
+            logger.info("Login failed: introspected token is not active (cached)")
+            raise AuthenticationFailed("Login failed")
+
+        if cached_user_info is not None:
+            self.token_origin_audience = str(
+                cached_user_info[settings.OIDC_RS_AUDIENCE_CLAIM]
+            )
+            return cached_user_info
+
+        self._introspection_response = None
+        try:
+            user_info = super().get_user_info_with_introspection(access_token)
+        except SuspiciousOperation as exc:
+            # Only cache the failure when the authorization server answered
+            if (
+                self._introspection_response is not None
+                and settings.OIDC_RS_INTROSPECTION_NEGATIVE_CACHE_TIMEOUT
+            ):
+                cache.set(
+                    cache_key,
+                    self.invalid_token_marker,
+                    settings.OIDC_RS_INTROSPECTION_NEGATIVE_CACHE_TIMEOUT,
+                )
+            logger.info("Login failed: %s", exc)
+            raise AuthenticationFailed("Login failed") from exc
+
+        timeout = self._get_introspection_cache_timeout(user_info)
+        if timeout > 0:
+            cache.set(cache_key, user_info, timeout)
+
+        return user_info
+
+
+class CachedResourceServerBackend(IntrospectionCacheMixin, ResourceServerBackend):
+    """Resource server backend with a shared introspection cache."""
+
+
+class CachedJWTResourceServerBackend(IntrospectionCacheMixin, JWTResourceServerBackend):
+    """JWT resource server backend with a shared introspection cache."""
+
+
 class AccountServiceAuthentication(BaseAuthentication):
     """Authentication backend for account services using Authorization header.
     The Authorization header is used to authenticate the request.
@@ -31,3 +31,11 @@ class WebhookProtocolChoices(models.TextChoices):
 
     SCIM = "scim"
     MATRIX = "matrix"
+
+
+class ChangeObjectTypeChoices(models.TextChoices):
+    """Defines the types of objects of the changes feed."""
+
+    TEAM = "team", _("Team")
+    TEAM_ACCESS = "team_access", _("Team access")
+    INVITATION = "invitation", _("Team invitation")
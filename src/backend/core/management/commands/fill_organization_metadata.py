@@ -5,7 +5,12 @@ Management command for filling organization metadata with default values.
 from django.core.management.base import BaseCommand
 
 from core import models
-from core.utils.json_schema import generate_default_from_schema
+from core.utils.json_schema import (
+    compile_schema_validator,
+    format_validation_error,
+    generate_default_from_schema,
+    iter_validation_errors,
+)
 
 
 class Command(BaseCommand):
@@ -23,9 +28,30 @@ class Command(BaseCommand):
             return
 
         default_metadata = generate_default_from_schema(organization_metadata_schema)
+        organizations = []
         for organization in models.Organization.objects.all():
-            organization.metadata = {**default_metadata, **organization.metadata}
-
+            metadata = {**default_metadata, **organization.metadata}
+            if metadata != organization.metadata:
+                organization.metadata = metadata
+                organizations.append(organization)
+
+        # Validate all the filled metadata at once with a compiled validator,
+        # invalid organizations are reported and left untouched
+        validator = compile_schema_validator(organization_metadata_schema)
+        invalid_indexes = set()
+        for index, error in iter_validation_errors(
+            validator, (organization.metadata for organization in organizations)
+        ):
+            invalid_indexes.add(index)
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{organizations[index]}: {format_validation_error(error)}"
+                )
+            )
+
+        for index, organization in enumerate(organizations):
+            if index in invalid_indexes:
+                continue
             # Save the organization with the updated metadata
             # We don't use bulk update because we want to trigger the clean method
             organization.save(update_fields=["metadata", "updated_at"])
@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-19 09:00
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_teamwebhook_protocol'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='primary key for the record as UUID', primary_key=True, serialize=False, verbose_name='id')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='date and time at which a record was created', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='date and time at which a record was last updated', verbose_name='updated at')),
+                ('object_type', models.CharField(choices=[('team', 'Team'), ('team_access', 'Team access'), ('invitation', 'Team invitation')], max_length=20)),
+                ('object_id', models.UUIDField()),
+                ('team_id', models.UUIDField()),
+                ('user_id', models.UUIDField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+                'db_table': 'people_tombstone',
+                'indexes': [
+                    models.Index(fields=['team_id', 'created_at'], name='tombstone_team_created_idx'),
+                    models.Index(fields=['user_id', 'created_at'], name='tombstone_user_created_idx'),
+                    models.Index(fields=['created_at'], name='tombstone_created_idx'),
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='teamaccess',
+            index=models.Index(fields=['team', 'updated_at'], name='team_access_team_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['team', 'updated_at'], name='invitation_team_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_tombstone_and_changes_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['email', 'created_at'], name='invitation_email_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-19 13:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_invitation_email_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='user_email_upper_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='invitation',
+            name='invitation_email_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(django.db.models.functions.text.Upper('email'), models.F('created_at'), name='invitation_email_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_user_email_upper_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['updated_at'], name='invitation_updated_idx'),
+        ),
+    ]
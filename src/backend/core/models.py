@@ -7,11 +7,13 @@ import json
 import os
 import secrets
 import smtplib
+import time
 import uuid
 from contextlib import suppress
 from datetime import timedelta
-from functools import lru_cache
+from functools import lru_cache, reduce
 from logging import getLogger
+from operator import or_
 from typing import Optional, Tuple
 
 from django.conf import settings
@@ -20,20 +22,32 @@ from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.sites.models import Site
 from django.core import exceptions, mail, validators
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Upper
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.translation import gettext, override
 from django.utils.translation import gettext_lazy as _
 
-import jsonschema
 from timezone_field import TimeZoneField
+from treebeard.exceptions import PathOverflow
 from treebeard.mp_tree import MP_Node, MP_NodeManager
 
-from core.enums import WebhookProtocolChoices, WebhookStatusChoices
+from core.enums import (
+    ChangeObjectTypeChoices,
+    WebhookProtocolChoices,
+    WebhookStatusChoices,
+)
 from core.exceptions import EmailAlreadyKnownException
 from core.plugins.registry import registry as plugin_hooks_registry
+from core.utils.json_schema import (
+    compile_schema_validator,
+    format_validation_error,
+    get_schema_validator,
+    get_validation_error,
+)
 from core.utils.webhooks import webhooks_synchronizer
 from core.validators import get_field_validators_from_setting
 
@@ -44,20 +58,26 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 contact_schema_path = os.path.join(current_dir, "jsonschema", "contact_data.json")
 with open(contact_schema_path, "r", encoding="utf-8") as contact_schema_file:
     contact_schema = json.load(contact_schema_file)
+contact_schema_validator = compile_schema_validator(contact_schema)
+
+
+def get_organization_metadata_schema_path() -> Optional[str]:
+    """Return the path of the organization metadata schema set in the settings."""
+    if not settings.ORGANIZATION_METADATA_SCHEMA:
+        return None
+    return os.path.join(
+        current_dir, "jsonschema", settings.ORGANIZATION_METADATA_SCHEMA
+    )
 
 
 @lru_cache(maxsize=None)
 def get_organization_metadata_schema() -> Optional[dict]:
     """Load the organization metadata schema from the settings."""
-    if not settings.ORGANIZATION_METADATA_SCHEMA:
+    organization_metadata_schema_path = get_organization_metadata_schema_path()
+    if not organization_metadata_schema_path:
         logger.info("No organization metadata schema specified")
         return None
 
-    organization_metadata_schema_path = os.path.join(
-        current_dir,
-        "jsonschema",
-        settings.ORGANIZATION_METADATA_SCHEMA,
-    )
     with open(
         organization_metadata_schema_path,
         "r",
@@ -71,6 +91,17 @@ def get_organization_metadata_schema() -> Optional[dict]:
     return organization_metadata_schema
 
 
+def get_organization_metadata_validator():
+    """
+    Return the compiled validator of the organization metadata schema, or None
+    when no schema is specified. It follows changes of the schema setting.
+    """
+    organization_metadata_schema_path = get_organization_metadata_schema_path()
+    if not organization_metadata_schema_path:
+        return None
+    return get_schema_validator(organization_metadata_schema_path)
+
+
 class RoleChoices(models.TextChoices):  # pylint: disable=too-many-ancestors
     """Defines the possible roles a user can have in a team."""
 
@@ -126,6 +157,186 @@ class BaseModel(models.Model):
         self.full_clean()
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def get_bulk_unique_checks(cls, fields=None):
+        """
+        Return the sets of fields which must be unique together, as tuples of
+        (field names, constraint): unique fields, `unique_together` and unique
+        constraints on fields without condition. Other constraints are enforced
+        by the database when writing.
+
+        Only the sets including one of `fields` are returned, when given.
+        """
+        meta = cls._meta
+        checks = [
+            ((field.name,), None)
+            for field in meta.concrete_fields
+            if field.unique and not field.primary_key
+        ]
+        checks += [(tuple(names), None) for names in meta.unique_together]
+        checks += [
+            (tuple(constraint.fields), constraint)
+            for constraint in meta.total_unique_constraints
+        ]
+        if fields is not None:
+            checks = [check for check in checks if set(check[0]) & set(fields)]
+        return checks
+
+    @classmethod
+    def bulk_validate_unique(cls, instances, fields=None):
+        """
+        Check the uniqueness of instances against the database and between
+        themselves, with one query per set of unique fields for the whole batch,
+        instead of one query per set and per instance in `validate_unique`.
+
+        Return a dictionary of the errors by field name of each invalid instance.
+        """
+        errors = {}
+        pks = [
+            instance.pk
+            for instance in instances
+            if not instance._state.adding  # noqa: SLF001
+        ]
+
+        for names, constraint in cls.get_bulk_unique_checks(fields):
+            attnames = [cls._meta.get_field(name).attname for name in names]
+            instances_by_values = {}
+            duplicates = []
+            for instance in instances:
+                values = tuple(getattr(instance, attname) for attname in attnames)
+                if None in values:
+                    continue
+                if values in instances_by_values:
+                    duplicates.append(instance)
+                else:
+                    instances_by_values[values] = instance
+            if not instances_by_values:
+                continue
+
+            existing_values = set(
+                cls._default_manager.filter(
+                    reduce(
+                        or_,
+                        (
+                            models.Q(**dict(zip(attnames, values, strict=True)))
+                            for values in instances_by_values
+                        ),
+                    )
+                )
+                .exclude(pk__in=pks)
+                .values_list(*attnames)
+            )
+            invalid_instances = duplicates + [
+                instances_by_values[values]
+                for values in existing_values
+                if values in instances_by_values
+            ]
+
+            key = names[0] if len(names) == 1 else exceptions.NON_FIELD_ERRORS
+            for instance in invalid_instances:
+                if constraint is not None and (
+                    constraint.violation_error_message
+                    != constraint.default_violation_error_message
+                ):
+                    error = ValidationError(constraint.get_violation_error_message())
+                else:
+                    error = instance.unique_error_message(cls, names)
+                errors.setdefault(instance, {}).setdefault(key, []).append(error)
+
+        return errors
+
+    @classmethod
+    def bulk_clean(cls, instances, fields=None):
+        """
+        Validate instances for a bulk write, with the same checks as `full_clean`
+        except that:
+            - uniqueness is checked with one query per batch (`bulk_validate_unique`);
+            - related objects existence and the other constraints are left to the
+              database, which enforces them when writing.
+
+        Only `fields` (and the `clean` method) are validated, when given.
+        Return a dictionary of the `ValidationError` of each invalid instance.
+        """
+        meta = cls._meta
+        exclude = {
+            field.name
+            for field in meta.concrete_fields
+            if field.is_relation or (fields is not None and field.name not in fields)
+        }
+
+        errors = {}
+        for instance in instances:
+            try:
+                instance.full_clean(
+                    exclude=exclude, validate_unique=False, validate_constraints=False
+                )
+            except ValidationError as exc:
+                errors[instance] = exc.update_error_dict({})
+
+        for instance, unique_errors in cls.bulk_validate_unique(
+            [instance for instance in instances if instance not in errors], fields
+        ).items():
+            errors[instance] = unique_errors
+
+        return {
+            instance: ValidationError(error_dict)
+            for instance, error_dict in errors.items()
+        }
+
+    @classmethod
+    def _filter_bulk_invalid(cls, instances, errors, skip_invalid):
+        """Raise the errors of a bulk validation, or log them and skip the instances."""
+        if not errors:
+            return instances
+        if not skip_invalid:
+            raise ValidationError(
+                {str(instance): error.messages for instance, error in errors.items()}
+            )
+        for instance, error in errors.items():
+            logger.warning("%s %s not written: %s", cls.__name__, instance, error)
+        return [instance for instance in instances if instance not in errors]
+
+    @classmethod
+    def bulk_create_validated(cls, instances, skip_invalid=False, batch_size=None):
+        """
+        Validate instances with `bulk_clean` and insert them with `bulk_create`,
+        by batches of `batch_size`. No signal is sent, as with `bulk_create`.
+
+        Invalid instances raise a `ValidationError` listing the errors of each one,
+        or are logged and not inserted when `skip_invalid` is set.
+        Return the created instances.
+        """
+        instances = list(instances)
+        instances = cls._filter_bulk_invalid(
+            instances, cls.bulk_clean(instances), skip_invalid
+        )
+        return cls._default_manager.bulk_create(instances, batch_size=batch_size)
+
+    @classmethod
+    def bulk_update_validated(
+        cls, instances, fields, skip_invalid=False, batch_size=None
+    ):
+        """
+        Validate `fields` of instances with `bulk_clean` and update them with
+        `bulk_update`, by batches of `batch_size`, setting their `updated_at`
+        which `bulk_update` leaves untouched. No signal is sent.
+
+        Invalid instances raise a `ValidationError` listing the errors of each one,
+        or are logged and not updated when `skip_invalid` is set.
+        Return the updated instances.
+        """
+        instances = list(instances)
+        fields = [*fields, *(["updated_at"] if "updated_at" not in fields else [])]
+        instances = cls._filter_bulk_invalid(
+            instances, cls.bulk_clean(instances, fields), skip_invalid
+        )
+
+        updated_at = timezone.now()
+        for instance in instances:
+            instance.updated_at = updated_at
+        cls._default_manager.bulk_update(instances, fields, batch_size=batch_size)
+        return instances
+
 
 class Contact(BaseModel):
     """User contacts"""
@@ -210,13 +421,10 @@ class Contact(BaseModel):
             )
 
         # Validate the content of the "data" field against our jsonschema definition
-        try:
-            jsonschema.validate(self.data, contact_schema)
-        except jsonschema.ValidationError as e:
+        error = get_validation_error(contact_schema_validator, self.data)
+        if error is not None:
             # Specify the property in the data in which the error occurred
-            field_path = ".".join(map(str, e.path))
-            error_message = f"Validation error in '{field_path:s}': {e.message}"
-            raise exceptions.ValidationError({"data": [error_message]}) from e
+            raise exceptions.ValidationError({"data": [format_validation_error(error)]})
 
     def get_abilities(self, user):
         """
@@ -240,6 +448,83 @@ class Contact(BaseModel):
         }
 
 
+# Process-local copy of the mapping of audience ids to service provider ids
+_audiences_local_cache = {"audiences": None, "expires_at": 0}
+
+
+class ServiceProviderManager(models.Manager):
+    """
+    Custom manager for the ServiceProvider model, to resolve audiences.
+
+    Resource server calls identify their service provider by its audience. The
+    mapping of all audience ids to service provider ids is loaded at once, then
+    kept in the process (for SERVICE_PROVIDERS_LOCAL_CACHE_TIMEOUT) and in the
+    shared cache (for SERVICE_PROVIDERS_CACHE_TIMEOUT), and cleared when a
+    service provider is saved or deleted.
+    """
+
+    audiences_cache_key = "service-providers-audiences"
+
+    def get_audiences(self):
+        """Return the mapping of audience ids to service provider ids."""
+        now = time.monotonic()
+        if (
+            _audiences_local_cache["audiences"] is not None
+            and _audiences_local_cache["expires_at"] > now
+        ):
+            return _audiences_local_cache["audiences"]
+
+        audiences = None
+        if settings.SERVICE_PROVIDERS_CACHE_TIMEOUT:
+            audiences = cache.get(self.audiences_cache_key)
+        if audiences is None:
+            audiences = dict(self.values_list("audience_id", "pk"))
+            if settings.SERVICE_PROVIDERS_CACHE_TIMEOUT:
+                cache.set(
+                    self.audiences_cache_key,
+                    audiences,
+                    settings.SERVICE_PROVIDERS_CACHE_TIMEOUT,
+                )
+
+        if settings.SERVICE_PROVIDERS_LOCAL_CACHE_TIMEOUT:
+            _audiences_local_cache.update(
+                audiences=audiences,
+                expires_at=now + settings.SERVICE_PROVIDERS_LOCAL_CACHE_TIMEOUT,
+            )
+        return audiences
+
+    def get_id_for_audience(self, audience_id, create=False):
+        """
+        Return the id of the service provider of an audience, or None when the
+        audience is unknown. With `create`, unknown audiences are created on the fly.
+        """
+        if (service_provider_id := self.get_audiences().get(audience_id)) is not None:
+            return service_provider_id
+
+        # The service provider may have been created since the mapping was cached
+        if create:
+            service_provider, _created = self.get_or_create(audience_id=audience_id)
+            service_provider_id = service_provider.pk
+        else:
+            service_provider_id = (
+                self.filter(audience_id=audience_id)
+                .values_list("pk", flat=True)
+                .first()
+            )
+        if service_provider_id is not None:
+            self.clear_audiences_cache()
+        return service_provider_id
+
+    def clear_audiences_cache(self):
+        """
+        Clear the cached audiences of the current process and the shared cache,
+        again once the current transaction is committed.
+        """
+        _audiences_local_cache.update(audiences=None, expires_at=0)
+        cache.delete(self.audiences_cache_key)
+        transaction.on_commit(lambda: cache.delete(self.audiences_cache_key))
+
+
 class ServiceProvider(BaseModel):
     """
     Represents a service provider that will consume our information.
@@ -253,6 +538,8 @@ class ServiceProvider(BaseModel):
         _("audience id"), max_length=256, unique=True, db_index=True
     )
 
+    objects = ServiceProviderManager()
+
     class Meta:
         db_table = "people_service_provider"
         verbose_name = _("service provider")
@@ -425,17 +712,16 @@ class Organization(BaseModel):
         """Validate fields."""
         super().clean()
 
-        organization_metadata_schema = get_organization_metadata_schema()
-        if not organization_metadata_schema:
+        organization_metadata_validator = get_organization_metadata_validator()
+        if not organization_metadata_validator:
             return
 
-        try:
-            jsonschema.validate(self.metadata, organization_metadata_schema)
-        except jsonschema.ValidationError as e:
+        error = get_validation_error(organization_metadata_validator, self.metadata)
+        if error is not None:
             # Specify the property in the data in which the error occurred
-            field_path = ".".join(map(str, e.path))
-            error_message = f"Validation error in '{field_path:s}': {e.message}"
-            raise exceptions.ValidationError({"metadata": [error_message]}) from e
+            raise exceptions.ValidationError(
+                {"metadata": [format_validation_error(error)]}
+            )
 
     def validate_unique(self, exclude=None):
         """
@@ -472,6 +758,56 @@ class Organization(BaseModel):
                 "domain_list value must be unique across all instances."
             )
 
+    @classmethod
+    def bulk_validate_unique(cls, instances, fields=None):
+        """
+        Also validate Registration/Domain values are unique across all instances,
+        with one query per array field for the whole batch.
+        """
+        errors = super().bulk_validate_unique(instances, fields)
+        pks = [
+            instance.pk
+            for instance in instances
+            if not instance._state.adding  # noqa: SLF001
+        ]
+
+        for field_name in ["registration_id_list", "domain_list"]:
+            if fields is not None and field_name not in fields:
+                continue
+
+            instances_by_value = {}
+            invalid_instances = []
+            for instance in instances:
+                for value in getattr(instance, field_name) or []:
+                    if instances_by_value.setdefault(value, instance) is not instance:
+                        invalid_instances.append(instance)
+            if not instances_by_value:
+                continue
+
+            for existing_values in (
+                cls.objects.filter(
+                    **{f"{field_name}__overlap": list(instances_by_value)}
+                )
+                .exclude(pk__in=pks)
+                .values_list(field_name, flat=True)
+            ):
+                invalid_instances += [
+                    instances_by_value[value]
+                    for value in existing_values
+                    if value in instances_by_value
+                ]
+
+            for instance in dict.fromkeys(invalid_instances):
+                errors.setdefault(instance, {}).setdefault(
+                    exceptions.NON_FIELD_ERRORS, []
+                ).append(
+                    ValidationError(
+                        f"{field_name} value must be unique across all instances."
+                    )
+                )
+
+        return errors
+
     def get_abilities(self, user):
         """
         Compute and return abilities for a given user on the organization.
@@ -557,53 +893,20 @@ class User(AbstractBaseUser, BaseModel, auth_models.PermissionsMixin):
         db_table = "people_user"
         verbose_name = _("user")
         verbose_name_plural = _("users")
+        indexes = [
+            # Case-insensitive lookups (`email__iexact` compares `UPPER(email)`)
+            models.Index(Upper("email"), name="user_email_upper_idx"),
+        ]
 
     def __str__(self):
         return self.name if self.name else self.email or f"User {self.sub}"
 
-    def save(self, *args, **kwargs):
-        """
-        If it's a new user, give them access to the relevant teams.
-        """
-
-        if self._state.adding:
-            self._convert_valid_team_invitations()
-            # a post_save signal to convert domain invitations to domain accesses
-            # is triggered by the mailbox_manager app
-
-        super().save(*args, **kwargs)
-
     def clean(self):
         """Validate fields."""
         super().clean()
         if self.email:
             self.email = User.objects.normalize_email(self.email)
 
-    def _convert_valid_team_invitations(self):
-        """
-        Convert valid invitations to team accesses.
-        Expired invitations are ignored.
-        """
-
-        valid_invitations = Invitation.objects.filter(
-            email=self.email,
-            created_at__gte=(
-                timezone.now()
-                - timedelta(seconds=settings.INVITATION_VALIDITY_DURATION)
-            ),
-        ).select_related("team")
-
-        if not valid_invitations.exists():
-            return
-
-        TeamAccess.objects.bulk_create(
-            [
-                TeamAccess(user=self, team=invitation.team, role=invitation.role)
-                for invitation in valid_invitations
-            ]
-        )
-        valid_invitations.delete()
-
     def email_user(self, subject, message, from_email=None, **kwargs):
         """Email this user."""
         if not self.email:
@@ -626,27 +929,11 @@ class User(AbstractBaseUser, BaseModel, auth_models.PermissionsMixin):
         this feature.
         - Mailboxes creation is globally available (or not) for now.
         """
-        user_info = (
-            self._meta.model.objects.filter(pk=self.pk)
-            .annotate(
-                teams_can_view=models.Exists(
-                    self.accesses.model.objects.filter(  # pylint: disable=no-member
-                        user=models.OuterRef("pk"),
-                        role__in=[RoleChoices.OWNER, RoleChoices.ADMIN],
-                    )
-                ),
-                mailboxes_can_view=models.Exists(
-                    self.mail_domain_accesses.model.objects.filter(  # pylint: disable=no-member
-                        user=models.OuterRef("pk")
-                    )
-                ),
-            )
-            .only("id")
-            .get()
+        access_abilities = self.get_access_abilities()
+        teams_can_view = (
+            access_abilities["teams_can_view"] or settings.FEATURES["TEAMS_DISPLAY"]
         )
-
-        teams_can_view = user_info.teams_can_view or settings.FEATURES["TEAMS_DISPLAY"]
-        mailboxes_can_view = user_info.mailboxes_can_view
+        mailboxes_can_view = access_abilities["mailboxes_can_view"]
 
         return {
             "contacts": {
@@ -667,6 +954,62 @@ class User(AbstractBaseUser, BaseModel, auth_models.PermissionsMixin):
             },
         }
 
+    @staticmethod
+    def get_abilities_cache_key(user_id):
+        """Return the cache key of the abilities of a user."""
+        return f"user-abilities:{user_id!s}"
+
+    @classmethod
+    def clear_abilities_cache(cls, user_ids):
+        """
+        Invalidate the cached abilities of the given users.
+
+        The cache is cleared right away and again once the current transaction is
+        committed, so abilities computed concurrently from the former accesses are
+        not kept.
+        """
+        keys = [cls.get_abilities_cache_key(user_id) for user_id in user_ids]
+        if not keys:
+            return
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    def get_access_abilities(self):
+        """
+        Return the abilities granted by the user team and domain accesses, from the
+        cache when available. Features enabled in the settings are not included so
+        they are always up to date.
+        """
+        cache_key = self.get_abilities_cache_key(self.pk)
+        if settings.USER_ABILITIES_CACHE_TIMEOUT and (
+            access_abilities := cache.get(cache_key)
+        ):
+            return access_abilities
+
+        access_abilities = (
+            self._meta.model.objects.filter(pk=self.pk)
+            .annotate(
+                teams_can_view=models.Exists(
+                    self.accesses.model.objects.filter(  # pylint: disable=no-member
+                        user=models.OuterRef("pk"),
+                        role__in=[RoleChoices.OWNER, RoleChoices.ADMIN],
+                    )
+                ),
+                mailboxes_can_view=models.Exists(
+                    self.mail_domain_accesses.model.objects.filter(  # pylint: disable=no-member
+                        user=models.OuterRef("pk")
+                    )
+                ),
+            )
+            .values("teams_can_view", "mailboxes_can_view")
+            .get()
+        )
+        if settings.USER_ABILITIES_CACHE_TIMEOUT:
+            cache.set(
+                cache_key, access_abilities, settings.USER_ABILITIES_CACHE_TIMEOUT
+            )
+        return access_abilities
+
 
 class OrganizationAccess(BaseModel):
     """
@@ -713,6 +1056,27 @@ class TeamManager(MP_NodeManager):
     Custom manager for the Team model, to manage complexity/automation.
     """
 
+    def filter_visible(self, user, service_provider_id):
+        """
+        Return the teams the user is a member of and which are visible to the
+        service provider (only teams visible to all services when it is None).
+        """
+        is_visible = models.Q(is_visible_all_services=True)
+        if service_provider_id is not None:
+            is_visible |= models.Exists(
+                self.model.service_providers.through.objects.filter(
+                    team_id=models.OuterRef("pk"),
+                    serviceprovider_id=service_provider_id,
+                )
+            )
+
+        return self.filter(
+            models.Exists(
+                TeamAccess.objects.filter(team=models.OuterRef("pk"), user=user)
+            ),
+            is_visible,
+        )
+
     def create(self, parent_id=None, **kwargs):
         """
         Replace the default create method to ease the Team creation process.
@@ -726,13 +1090,124 @@ class TeamManager(MP_NodeManager):
         if parent_id is None:
             return self.model.add_root(**kwargs)
 
-        # Retrieve parent object, because django-treebeard uses raw queries for most
-        # write operations, and raw queries don't update the django objects of the db
-        # entries they modify. See caveats in the django-treebeard documentation.
-        # This might be changed later if we never do any operation on the parent object
-        # before creating the child.
-        # Beware the N+1 here.
-        return self.get(pk=parent_id).add_child(**kwargs)
+        # django-treebeard `add_child` fetches the parent, locks it, fetches its last
+        # child and validates the uniqueness of the new path: the path is computed
+        # here with a single locked query instead.
+        return self.create_subtrees([kwargs], parent_id=parent_id)[0]
+
+    def _get_children_paths_start(self, parent_id):
+        """
+        Return the path and depth of the parent team and the last step used by its
+        children, locking the parent team row until the end of the transaction so
+        concurrent creations of children are serialized.
+        """
+        if parent_id is None:
+            # Root teams: there is no row to lock, as in django-treebeard
+            last_root = self.model.get_last_root_node()
+            last_step = (
+                self.model._str2int(last_root.path[-self.model.steplen :])  # noqa: SLF001
+                if last_root
+                else 0
+            )
+            return "", 0, last_step
+
+        parent = (
+            self.select_for_update()
+            .filter(pk=parent_id)
+            .annotate(
+                last_child_path=models.Subquery(
+                    self.model.objects.filter(
+                        path__startswith=models.OuterRef("path"),
+                        depth=models.OuterRef("depth") + 1,
+                    )
+                    .order_by("-path")
+                    .values("path")[:1]
+                )
+            )
+            .values("path", "depth", "last_child_path")
+            .get()
+        )
+        last_step = (
+            self.model._str2int(parent["last_child_path"][-self.model.steplen :])  # noqa: SLF001
+            if parent["last_child_path"]
+            else 0
+        )
+        return parent["path"], parent["depth"], last_step
+
+    def _build_subtrees(self, trees, parent_path, depth, last_step):
+        """
+        Instantiate the teams of the given trees, with their materialized path,
+        depth and number of children. Yield each team, before its descendants,
+        with the links to its service providers.
+        """
+        meta = self.model._meta  # noqa: SLF001
+        steplen = self.model.steplen
+        max_length = meta.get_field("path").max_length
+        # Related objects existence is checked by the database constraints
+        exclude = [field.name for field in meta.concrete_fields if field.is_relation]
+
+        for step, tree in enumerate(trees, start=last_step + 1):
+            data = dict(tree)
+            children = data.pop("children", None) or []
+            service_providers = data.pop("service_providers", None) or []
+
+            key = self.model._int2str(step)  # noqa: SLF001
+            path = f"{parent_path}{self.model.alphabet[0] * (steplen - len(key))}{key}"
+            if len(key) > steplen or len(path) > max_length:
+                raise PathOverflow(f"Path Overflow from: '{parent_path}'")
+
+            team = self.model(**data, path=path, depth=depth, numchild=len(children))
+            # Uniqueness is guaranteed by the lock on the parent and the database
+            team.full_clean(
+                exclude=exclude, validate_unique=False, validate_constraints=False
+            )
+            yield (
+                team,
+                [
+                    self.model.service_providers.through(
+                        team_id=team.pk,
+                        serviceprovider_id=getattr(
+                            service_provider, "pk", service_provider
+                        ),
+                    )
+                    for service_provider in service_providers
+                ],
+            )
+
+            yield from self._build_subtrees(children, path, depth + 1, 0)
+
+    @transaction.atomic
+    def create_subtrees(self, trees, parent_id=None):
+        """
+        Create teams, with all their descendants, under a parent team (or as root
+        teams) in one transaction, with one insert for all the teams.
+
+        Each tree is a dictionary of the team fields, with optional keys:
+            - children: the list of children trees, in the same format;
+            - service_providers: the service providers (or their ids) to link
+              the team to.
+
+        Return the list of the created teams, each one before its descendants.
+        """
+        if not trees:
+            return []
+
+        parent_path, parent_depth, last_step = self._get_children_paths_start(parent_id)
+
+        teams, links = [], []
+        for team, team_links in self._build_subtrees(
+            trees, parent_path, parent_depth + 1, last_step
+        ):
+            teams.append(team)
+            links.extend(team_links)
+
+        self.bulk_create(teams)
+        if links:
+            self.model.service_providers.through.objects.bulk_create(links)
+        if parent_id is not None:
+            self.filter(pk=parent_id).update(numchild=models.F("numchild") + len(trees))
+
+        return teams
 
 
 class Team(MP_Node, BaseModel):
@@ -849,6 +1324,12 @@ class TeamAccess(BaseModel):
         db_table = "people_team_access"
         verbose_name = _("Team/user relation")
         verbose_name_plural = _("Team/user relations")
+        indexes = [
+            # Changes feed
+            models.Index(
+                fields=["team", "updated_at"], name="team_access_team_updated_idx"
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user", "team"],
@@ -1024,8 +1505,11 @@ class BaseInvitation(BaseModel):
             "site": Site.objects.get_current(),
         }
 
-    def email_invitation(self):
-        """Email invitation to the user."""
+    def email_invitation(self, connection=None):
+        """
+        Email invitation to the user, through the given connection to the email
+        server if any, so it can be reused for several invitations.
+        """
         try:
             with override(self.issuer.language):
                 subject = self._get_mail_subject()
@@ -1039,6 +1523,7 @@ class BaseInvitation(BaseModel):
                     [self.email],
                     html_message=msg_html,
                     fail_silently=False,
+                    connection=connection,
                 )
 
         except smtplib.SMTPException as exception:
@@ -1064,6 +1549,21 @@ class Invitation(BaseInvitation):
         db_table = "people_invitation"
         verbose_name = _("Team invitation")
         verbose_name_plural = _("Team invitations")
+        indexes = [
+            # Changes feed
+            models.Index(
+                fields=["team", "updated_at"], name="invitation_team_updated_idx"
+            ),
+            # Case-insensitive conversion to accesses of the valid invitations
+            # of new users
+            models.Index(
+                Upper("email"),
+                models.F("created_at"),
+                name="invitation_email_created_idx",
+            ),
+            # Purge of the expired invitations
+            models.Index(fields=["updated_at"], name="invitation_updated_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["email", "team"], name="email_and_team_unique_together"
@@ -1113,6 +1613,40 @@ class Invitation(BaseInvitation):
         }
 
 
+class Tombstone(BaseModel):
+    """
+    Change log of the deletions of teams, team accesses and team invitations,
+    for the changes feed: creations and updates are read from the `updated_at`
+    field of the objects themselves.
+
+    The team and user identifiers are kept as is, as they may be deleted too.
+    """
+
+    object_type = models.CharField(
+        max_length=20, choices=ChangeObjectTypeChoices.choices
+    )
+    object_id = models.UUIDField()
+    team_id = models.UUIDField()
+    user_id = models.UUIDField(null=True, blank=True)
+
+    class Meta:
+        db_table = "people_tombstone"
+        verbose_name = _("Tombstone")
+        verbose_name_plural = _("Tombstones")
+        indexes = [
+            models.Index(
+                fields=["team_id", "created_at"], name="tombstone_team_created_idx"
+            ),
+            models.Index(
+                fields=["user_id", "created_at"], name="tombstone_user_created_idx"
+            ),
+            models.Index(fields=["created_at"], name="tombstone_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.object_type:s} {self.object_id!s} deleted"
+
+
 def validate_account_service_scope(scope):
     """Validate the scope of the account service."""
     if scope not in settings.ACCOUNT_SERVICE_SCOPES:
@@ -1,5 +1,7 @@
 """Base Django Application Configuration for plugins."""
 
+from django.conf import settings
+
 
 class BasePluginAppConfigMixIn:
     """
@@ -15,9 +17,16 @@ class BasePluginAppConfigMixIn:
 
     def ready(self):
         """
-        Initialize the hooks registry when the application is ready.
+        Enable the plugin when the application is ready, if it is listed in the
+        `INSTALLED_PLUGINS` setting: plugins may also be installed for their
+        models only (e.g. in the tests).
         This is called by Django when the application is loaded.
         """
+        if self.name in settings.INSTALLED_PLUGINS:  # pylint: disable=no-member
+            self.enable()
+
+    def enable(self):
+        """Register the hooks of the plugin in the hooks registry."""
         # pylint: disable=import-outside-toplevel
         from .registry import registry  # noqa: PLC0415
 
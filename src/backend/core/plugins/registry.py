@@ -1,10 +1,56 @@
 """Registry for hooks."""
 
+import hashlib
+import importlib
+import json
 import logging
+import sys
+import uuid
 from typing import Callable, Dict, List, Set
 
+from django.core.cache import cache
+from django.db import models, transaction
+
 logger = logging.getLogger(__name__)
 
+# Hooks are run in the calling process (sync) or by a Celery worker (async),
+# once the current transaction is committed
+HOOK_MODE_SYNC = "sync"
+HOOK_MODE_ASYNC = "async"
+
+# Lifetime of the lock preventing the same async hook to be queued twice
+ASYNC_HOOK_DEDUPLICATION_TIMEOUT = 60 * 10
+
+# Number of objects given to each task running an async batch callback
+ASYNC_HOOK_BATCH_SIZE = 1000
+
+DEFAULT_HOOK_OPTIONS = {
+    "mode": HOOK_MODE_SYNC,
+    "max_retries": 3,
+    "retry_delay": 10,
+    "batch_callback": None,
+}
+
+
+def get_callback_name(callback: Callable) -> str:
+    """Return the dotted path of a hook callback, to find it back in workers."""
+    return f"{callback.__module__}.{callback.__qualname__}"
+
+
+def serialize_hook_argument(value):
+    """
+    Serialize a model instance passed to an async hook as its label and pk, and
+    a list of model instances as their label and pks.
+    """
+    if isinstance(value, models.Model):
+        return {"model": value._meta.label, "pk": str(value.pk)}  # noqa: SLF001
+    if isinstance(value, list) and value and isinstance(value[0], models.Model):
+        return {
+            "model": value[0]._meta.label,  # noqa: SLF001
+            "pks": [str(instance.pk) for instance in value],
+        }
+    return value
+
 
 class HooksRegistry:
     """Registry for hooks."""
@@ -20,22 +66,58 @@ class HooksRegistry:
             hook_name: [] for hook_name in self._available_hooks
         }
         self._registered_apps: Set[str] = set()
+        self._options: Dict[Callable, dict] = {}
 
-    def register_hook(self, hook_name: str, callback: Callable) -> None:
+    def register_hook(self, hook_name: str, callback: Callable, **options) -> None:
         """
         Register a hook callback.
 
         Args:
             hook_name: The name of the hook.
             callback: The callback function to register.
+            **options:
+                mode: HOOK_MODE_SYNC (default) to run the callback when the hook is
+                    executed, or HOOK_MODE_ASYNC to run it in a Celery task.
+                    Arguments of async callbacks must be model instances or JSON
+                    serializable values.
+                max_retries: The number of retries of failed async callbacks.
+                retry_delay: The delay in seconds before the first retry of failed
+                    async callbacks, doubled on each retry.
+                batch_callback: A function doing the same as the callback for a
+                    list of objects at once, used by `execute_hook_batch`.
         """
+        if unknown_options := options.keys() - DEFAULT_HOOK_OPTIONS.keys():
+            raise ValueError(
+                f"Invalid hook options: {', '.join(sorted(unknown_options))}"
+            )
+        options = DEFAULT_HOOK_OPTIONS | options
+        if options["mode"] not in (HOOK_MODE_SYNC, HOOK_MODE_ASYNC):
+            raise ValueError(f"Invalid hook mode: {options['mode']}")
+
         try:
             self._hooks[hook_name].append(callback)
         except KeyError as exc:
             logger.exception(
                 "Failed to register hook '%s' is not a valid hook: %s", hook_name, exc
             )
-        logger.info("Registered hook %s: %s", hook_name, callback)
+        self._options[callback] = options
+        logger.info("Registered %s hook %s: %s", options["mode"], hook_name, callback)
+
+    def get_options(self, callback: Callable) -> dict:
+        """Get the options a hook callback was registered with."""
+        return self._options.get(callback, DEFAULT_HOOK_OPTIONS)
+
+    def get_callback(self, hook_name: str, callback_name: str) -> Callable:
+        """
+        Get a callback of a hook from its dotted path.
+
+        Raises:
+            LookupError: if no such callback is registered for the hook.
+        """
+        for callback in self.get_callbacks(hook_name):
+            if get_callback_name(callback) == callback_name:
+                return callback
+        raise LookupError(f"No callback {callback_name} for hook {hook_name}")
 
     def get_registered_hooks(self):
         """Get all registered hooks."""
@@ -52,9 +134,15 @@ class HooksRegistry:
             return
 
         self._registered_apps.add(app_name)
+        module_name = f"{app_name}.hooks"
         try:
-            # Try to import the hooks module from the app
-            __import__(f"{app_name}.hooks")
+            if module_name in sys.modules:
+                # The registry was reset (e.g. in the tests): run the hooks
+                # registration of the module again
+                importlib.reload(sys.modules[module_name])
+            else:
+                # Try to import the hooks module from the app
+                importlib.import_module(module_name)
             logger.info("Registered hooks from app: %s", app_name)
         except ImportError:
             # It's okay if the app doesn't have a hooks module
@@ -90,40 +178,145 @@ class HooksRegistry:
             **kwargs: Keyword arguments to pass to the callbacks.
 
         Returns:
-            A list of results from the callbacks.
+            A list of results from the sync callbacks, and of Celery task ids for
+            the async callbacks (None when the same call is already queued).
         """
         results = []
         for callback in self.get_callbacks(hook_name):
             try:
-                result = callback(*args, **kwargs)
+                if self.get_options(callback)["mode"] == HOOK_MODE_ASYNC:
+                    result = self.schedule_callback(hook_name, callback, args, kwargs)
+                else:
+                    result = callback(*args, **kwargs)
                 results.append(result)
             except Exception as e:  # pylint: disable=broad-except
                 logger.exception("Error executing hook %s: %s", hook_name, e)
         return results
 
+    def execute_hook_batch(self, hook_name: str, instances):
+        """
+        Execute all callbacks of a hook for each of the given objects, e.g. to run
+        the hooks again for existing objects.
+
+        Callbacks registered with a `batch_callback` are given all the objects at
+        once (by chunks of ASYNC_HOOK_BATCH_SIZE for async callbacks), the others
+        are executed for each object.
+
+        Returns:
+            A list of results, as `execute_hook` does.
+        """
+        instances = list(instances)
+        results = []
+        for callback in self.get_callbacks(hook_name):
+            options = self.get_options(callback)
+            try:
+                if options["batch_callback"] is None:
+                    for instance in instances:
+                        if options["mode"] == HOOK_MODE_ASYNC:
+                            result = self.schedule_callback(
+                                hook_name, callback, [instance], {}
+                            )
+                        else:
+                            result = callback(instance)
+                        results.append(result)
+                elif options["mode"] == HOOK_MODE_ASYNC:
+                    for start in range(0, len(instances), ASYNC_HOOK_BATCH_SIZE):
+                        chunk = instances[start : start + ASYNC_HOOK_BATCH_SIZE]
+                        results.append(
+                            self.schedule_callback(
+                                hook_name, callback, [chunk], {}, batch=True
+                            )
+                        )
+                else:
+                    results.append(options["batch_callback"](instances))
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception("Error executing hook %s: %s", hook_name, e)
+        return results
+
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    def schedule_callback(
+        self, hook_name: str, callback: Callable, args, kwargs, batch=False
+    ):
+        """
+        Queue a Celery task running an async callback, once the current transaction
+        is committed so the task sees the objects it is given.
+
+        A lock is taken in the cache on commit and kept until the task is done, so
+        the same callback is not queued twice for the same arguments (e.g.
+        concurrent logins of the first users of an organization).
+
+        With `batch`, the task runs the `batch_callback` of the callback.
+
+        Returns:
+            The id of the Celery task, or None if the same call is already queued.
+        """
+        # pylint: disable=import-outside-toplevel
+        from core.tasks import execute_hook_callback_task  # noqa: PLC0415
+
+        callback_name = get_callback_name(callback)
+        arguments = {
+            "args": [serialize_hook_argument(arg) for arg in args],
+            "kwargs": {
+                key: serialize_hook_argument(value) for key, value in kwargs.items()
+            },
+            "batch": batch,
+        }
+        digest = hashlib.sha256(
+            json.dumps([hook_name, callback_name, arguments], sort_keys=True).encode()
+        ).hexdigest()
+        lock_key = f"plugin-hook:{digest}"
+        if cache.get(lock_key):
+            logger.info("Hook %s: %s already queued", hook_name, callback_name)
+            return None
+
+        task_id = str(uuid.uuid4())
+
+        def queue_task():
+            # The lock is only taken on commit, so a rolled back transaction
+            # does not prevent the call from being queued again.
+            if not cache.add(lock_key, True, ASYNC_HOOK_DEDUPLICATION_TIMEOUT):
+                logger.info("Hook %s: %s already queued", hook_name, callback_name)
+                return
+            try:
+                execute_hook_callback_task.apply_async(
+                    args=[hook_name, callback_name, arguments, lock_key],
+                    task_id=task_id,
+                )
+            except Exception:
+                cache.delete(lock_key)
+                raise
+
+        # A broker failure must not fail the request which ran the hook
+        transaction.on_commit(queue_task, robust=True)
+        return task_id
+
     def reset(self):
         """Function to reset the registry, to be used in test only."""
         self._hooks = {hook_name: [] for hook_name in self._available_hooks}
         self._registered_apps = set()
+        self._options = {}
 
 
 # Create a singleton instance of the registry
 registry = HooksRegistry()
 
 
-def register_hook(hook_name: str):
+def register_hook(hook_name: str, **options):
     """
     Decorator to register a function as a hook callback.
 
     Args:
         hook_name: The name of the hook.
+        **options: The `mode`, `max_retries` and `retry_delay` options of
+            `HooksRegistry.register_hook`.
 
     Returns:
         A decorator function.
     """
 
     def decorator(func):
-        registry.register_hook(hook_name, func)
+        registry.register_hook(hook_name, func, **options)
         return func
 
     return decorator
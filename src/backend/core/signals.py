@@ -0,0 +1,126 @@
+"""
+Signals module for the core app.
+"""
+
+from django.core.signals import setting_changed
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.enums import ChangeObjectTypeChoices
+from core.models import (
+    Invitation,
+    ServiceProvider,
+    Team,
+    TeamAccess,
+    Tombstone,
+    User,
+    get_organization_metadata_schema,
+)
+from core.utils.invitations import convert_valid_invitations
+
+
+@receiver(post_save, sender=User)
+def convert_new_user_invitations(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    """Give new users the accesses they were invited to, on teams and domains."""
+    if created:
+        convert_valid_invitations(instance)
+
+
+def _cascades_from_teams(origin):
+    """Whether a deletion cascades from teams, which log the tombstones of it."""
+    return isinstance(origin, Team) or (
+        isinstance(origin, QuerySet) and origin.model is Team
+    )
+
+
+@receiver(pre_delete, sender=Team)
+def log_team_deletion(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Keep the tombstones of a deleted team, its accesses and its invitations for
+    the changes feed, with one insert instead of one per cascaded row.
+    """
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(
+                object_type=ChangeObjectTypeChoices.TEAM,
+                object_id=instance.pk,
+                team_id=instance.pk,
+            ),
+            *(
+                Tombstone(
+                    object_type=ChangeObjectTypeChoices.TEAM_ACCESS,
+                    object_id=access_id,
+                    team_id=instance.pk,
+                    user_id=user_id,
+                )
+                for access_id, user_id in TeamAccess.objects.filter(
+                    team=instance
+                ).values_list("pk", "user_id")
+            ),
+            *(
+                Tombstone(
+                    object_type=ChangeObjectTypeChoices.INVITATION,
+                    object_id=invitation_id,
+                    team_id=instance.pk,
+                )
+                for invitation_id in Invitation.objects.filter(
+                    team=instance
+                ).values_list("pk", flat=True)
+            ),
+        ]
+    )
+
+
+@receiver(post_delete, sender=TeamAccess)
+def log_team_access_deletion(sender, instance, origin=None, **kwargs):  # pylint: disable=unused-argument
+    """Keep a tombstone of deleted team accesses for the changes feed."""
+    if _cascades_from_teams(origin):
+        return
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(
+                object_type=ChangeObjectTypeChoices.TEAM_ACCESS,
+                object_id=instance.pk,
+                team_id=instance.team_id,
+                user_id=instance.user_id,
+            )
+        ]
+    )
+
+
+@receiver(post_delete, sender=Invitation)
+def log_invitation_deletion(sender, instance, origin=None, **kwargs):  # pylint: disable=unused-argument
+    """Keep a tombstone of deleted team invitations for the changes feed."""
+    if _cascades_from_teams(origin):
+        return
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(
+                object_type=ChangeObjectTypeChoices.INVITATION,
+                object_id=instance.pk,
+                team_id=instance.team_id,
+            )
+        ]
+    )
+
+
+@receiver(post_save, sender=TeamAccess)
+@receiver(post_delete, sender=TeamAccess)
+def clear_team_access_user_abilities(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Team accesses grant abilities to their user, which must be computed again."""
+    User.clear_abilities_cache([instance.user_id])
+
+
+@receiver(post_save, sender=ServiceProvider)
+@receiver(post_delete, sender=ServiceProvider)
+def clear_service_providers_audiences(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Audiences are resolved from a cached mapping, which must be loaded again."""
+    ServiceProvider.objects.clear_audiences_cache()
+
+
+@receiver(setting_changed)
+def clear_organization_metadata_schema(sender, setting, **kwargs):  # pylint: disable=unused-argument
+    """The organization metadata schema must be loaded again when its setting changes."""
+    if setting == "ORGANIZATION_METADATA_SCHEMA":
+        get_organization_metadata_schema.cache_clear()
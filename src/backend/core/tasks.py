@@ -0,0 +1,136 @@
+"""Core tasks."""
+
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+
+from celery import Celery
+from celery.schedules import crontab
+from celery.utils.log import get_task_logger
+
+from core.models import Invitation, Team, Tombstone, User
+from core.plugins.registry import registry as plugin_hooks_registry
+from core.utils.invitations import purge_expired_invitations
+from core.utils.webhooks import webhooks_synchronizer
+
+from people.celery_app import app as celery_app
+
+logger = get_task_logger(__name__)
+
+
+@celery_app.on_after_finalize.connect
+def setup_periodic_tasks(sender: Celery, **kwargs):
+    """Setup periodic tasks."""
+    sender.add_periodic_task(
+        crontab(hour="2", minute="30"),
+        purge_tombstones_task.s(),
+        name="purge_tombstones_every_day_at_2_30",
+        serializer="json",
+    )
+    sender.add_periodic_task(
+        crontab(hour="2", minute="15"),
+        purge_expired_invitations_task.s(),
+        name="purge_expired_invitations_every_day_at_2_15",
+        serializer="json",
+    )
+
+
+@celery_app.task
+def purge_tombstones_task():
+    """
+    Celery task to delete the tombstones older than the changes feed retention:
+    cursors older than the retention are expired anyway.
+    """
+    deleted, _per_model = Tombstone.objects.filter(
+        created_at__lt=timezone.now()
+        - timedelta(seconds=settings.CHANGES_FEED_RETENTION)
+    ).delete()
+    logger.info("%s tombstones deleted", deleted)
+    return deleted
+
+
+@celery_app.task
+def purge_expired_invitations_task():
+    """Celery task to delete expired team and domain invitations, by batches."""
+    return purge_expired_invitations()
+
+
+@celery_app.task
+def add_users_to_team_webhooks_task(team_id, user_ids):
+    """
+    Celery task to synchronize the webhooks of a team once for all its new members.
+    Users deleted meanwhile are left out.
+    """
+    users = {str(user.pk): user for user in User.objects.filter(pk__in=user_ids)}
+    webhooks_synchronizer.add_users_to_group(
+        Team.objects.get(pk=team_id),
+        [users[user_id] for user_id in user_ids if user_id in users],
+    )
+
+
+@celery_app.task
+def email_team_invitations_task(invitation_ids):
+    """
+    Celery task to email team invitations created in bulk, through one connection
+    to the email server. Invitations deleted meanwhile are left out.
+    """
+    invitations = Invitation.objects.filter(pk__in=invitation_ids).select_related(
+        "issuer", "team"
+    )
+    with mail.get_connection() as connection:
+        for invitation in invitations:
+            invitation.email_invitation(connection=connection)
+
+
+def _deserialize_hook_argument(value):
+    """
+    Load back the model instances serialized for async hooks. Deleted instances
+    of lists are left out.
+    """
+    if isinstance(value, dict) and value.keys() == {"model", "pk"}:
+        return apps.get_model(value["model"]).objects.get(pk=value["pk"])
+    if isinstance(value, dict) and value.keys() == {"model", "pks"}:
+        return list(apps.get_model(value["model"]).objects.filter(pk__in=value["pks"]))
+    return value
+
+
+@celery_app.task(bind=True)
+def execute_hook_callback_task(self, hook_name, callback_name, arguments, lock_key):
+    """
+    Celery task to run an async plugin hook callback, retried with an exponential
+    backoff when it fails. The result is recorded by the Celery result backend.
+    """
+    callback = plugin_hooks_registry.get_callback(hook_name, callback_name)
+    options = plugin_hooks_registry.get_options(callback)
+    if arguments.get("batch"):
+        callback = options["batch_callback"]
+
+    try:
+        args = [_deserialize_hook_argument(arg) for arg in arguments["args"]]
+        kwargs = {
+            key: _deserialize_hook_argument(value)
+            for key, value in arguments["kwargs"].items()
+        }
+    except ObjectDoesNotExist:
+        logger.warning("Hook %s: %s objects were deleted", hook_name, callback_name)
+        cache.delete(lock_key)
+        return None
+
+    try:
+        result = callback(*args, **kwargs)
+    except Exception as exc:
+        if self.request.retries < options["max_retries"]:
+            raise self.retry(
+                exc=exc, countdown=options["retry_delay"] * 2**self.request.retries
+            ) from exc
+        cache.delete(lock_key)
+        raise
+
+    cache.delete(lock_key)
+    logger.info("Hook %s: %s done", hook_name, callback_name)
+    return result
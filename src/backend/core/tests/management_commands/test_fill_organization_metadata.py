@@ -92,3 +92,41 @@ def test_metadata_merging_scenarios(existing_metadata, expected_result):
     # Check that the metadata has been merged correctly
     for key, value in expected_result.items():
         assert organization.metadata[key] == value
+
+
+@pytest.mark.django_db
+def test_fill_organization_metadata_invalid_metadata(command_output):
+    """Organizations with invalid metadata should be reported and left untouched."""
+    schema = {
+        "type": "object",
+        "properties": {
+            "field1": {"type": "string", "default": "default_value"},
+            "field2": {"type": "boolean"},
+        },
+    }
+    valid_organization = factories.OrganizationFactory(
+        name="Valid organization",
+        metadata={},
+        with_registration_id=True,
+    )
+    invalid_organization = factories.OrganizationFactory(
+        name="Invalid organization",
+        metadata={"field2": "not a boolean"},
+        with_registration_id=True,
+    )
+
+    with patch("core.models.get_organization_metadata_schema") as mock_get_schema:
+        mock_get_schema.return_value = schema
+
+        call_command("fill_organization_metadata", stdout=command_output)
+
+    assert (
+        f"{invalid_organization}: Validation error in 'field2': "
+        "'not a boolean' is not of type 'boolean'"
+    ) in command_output.getvalue()
+
+    valid_organization.refresh_from_db()
+    assert valid_organization.metadata == {"field1": "default_value", "field2": False}
+
+    invalid_organization.refresh_from_db()
+    assert invalid_organization.metadata == {"field2": "not a boolean"}
@@ -2,11 +2,15 @@
 
 import base64
 import json
+import time
+
+from django.core.cache import cache
 
 import pytest
 import responses
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
+from freezegun import freeze_time
 from joserfc import jwe as jose_jwe
 from joserfc import jwt as jose_jwt
 from joserfc.jwk import RSAKey
@@ -24,6 +28,14 @@ from core.models import ServiceProvider
 pytestmark = pytest.mark.django_db
 
 
+@pytest.fixture(autouse=True)
+def clear_introspection_cache():
+    """Introspection results are cached, don't share them between tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture(name="jwt_resource_server_backend")
 def jwt_resource_server_backend_fixture(settings):
     """Fixture to switch the backend to the JWTResourceServerBackend."""
@@ -71,7 +83,7 @@ def test_resource_server_authentication_class(client, settings):
     """
     assert (
         settings.OIDC_RS_BACKEND_CLASS
-        == "lasuite.oidc_resource_server.backend.ResourceServerBackend"
+        == "core.authentication.backends.CachedResourceServerBackend"
     )
 
     settings.OIDC_RS_CLIENT_ID = "some_client_id"
@@ -278,3 +290,152 @@ def test_jwt_resource_server_authentication_class(  # pylint: disable=unused-arg
 
     # Check that no service provider is created here
     assert ServiceProvider.objects.count() == 0
+
+
+def _configure_resource_server(settings):
+    """Set the resource server settings used by the introspection cache tests."""
+    settings.OIDC_RS_CLIENT_ID = "some_client_id"
+    settings.OIDC_RS_CLIENT_SECRET = "some_client_secret"
+
+    settings.OIDC_OP_URL = "https://oidc.example.com"
+    settings.OIDC_VERIFY_SSL = False
+    settings.OIDC_TIMEOUT = 5
+    settings.OIDC_PROXY = None
+    settings.OIDC_OP_JWKS_ENDPOINT = "https://oidc.example.com/jwks"
+    settings.OIDC_OP_INTROSPECTION_ENDPOINT = "https://oidc.example.com/introspect"
+
+
+def _introspection_response(**kwargs):
+    """Build an introspection response for the "very-specific-sub" user."""
+    return {
+        "iss": "https://oidc.example.com",
+        "aud": "some_client_id",
+        "sub": "very-specific-sub",
+        "client_id": "some_service_provider",
+        "scope": "openid groups",
+        "active": True,
+        **kwargs,
+    }
+
+
+@responses.activate
+def test_resource_server_authentication_introspection_cached(client, settings):
+    """The introspection result of a token should be reused for the next calls."""
+    _configure_resource_server(settings)
+    UserFactory(sub="very-specific-sub")
+
+    responses.add(
+        responses.POST,
+        "https://oidc.example.com/introspect",
+        json=_introspection_response(),
+    )
+
+    for _ in range(3):
+        response = client.get(
+            "/resource-server/v1.0/teams/",
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {build_authorization_bearer('some_token')}",
+        )
+        assert response.status_code == HTTP_200_OK
+
+        response_request = response.renderer_context.get("request")
+        assert response_request.user.sub == "very-specific-sub"
+        assert (
+            response_request.resource_server_token_audience == "some_service_provider"
+        )
+
+    assert len(responses.calls) == 1
+
+    # Another token is introspected
+    response = client.get(
+        "/resource-server/v1.0/teams/",
+        format="json",
+        HTTP_AUTHORIZATION=f"Bearer {build_authorization_bearer('other_token')}",
+    )
+    assert response.status_code == HTTP_200_OK
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_resource_server_authentication_introspection_cache_bound_to_expiration(
+    client, settings
+):
+    """The introspection result should not be used after the token expiration."""
+    _configure_resource_server(settings)
+    settings.OIDC_RS_INTROSPECTION_CACHE_TIMEOUT = 600
+    UserFactory(sub="very-specific-sub")
+
+    with freeze_time() as frozen_time:
+        responses.add(
+            responses.POST,
+            "https://oidc.example.com/introspect",
+            json=_introspection_response(exp=int(time.time()) + 30),
+        )
+
+        for _ in range(2):
+            response = client.get(
+                "/resource-server/v1.0/teams/",
+                format="json",
+                HTTP_AUTHORIZATION=f"Bearer {build_authorization_bearer('some_token')}",
+            )
+            assert response.status_code == HTTP_200_OK
+        assert len(responses.calls) == 1
+
+        frozen_time.tick(31)
+
+        response = client.get(
+            "/resource-server/v1.0/teams/",
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {build_authorization_bearer('some_token')}",
+        )
+        assert response.status_code == HTTP_200_OK
+        assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_resource_server_authentication_introspection_cache_invalid_token(
+    client, settings
+):
+    """Tokens rejected by the authorization server should be cached as invalid."""
+    _configure_resource_server(settings)
+    UserFactory(sub="very-specific-sub")
+
+    responses.add(
+        responses.POST,
+        "https://oidc.example.com/introspect",
+        json=_introspection_response(active=False),
+    )
+
+    for _ in range(2):
+        response = client.get(
+            "/resource-server/v1.0/teams/",
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {build_authorization_bearer('some_token')}",
+        )
+        assert response.status_code == HTTP_401_UNAUTHORIZED
+
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_resource_server_authentication_introspection_cache_disabled(client, settings):
+    """Setting the cache timeout to 0 should introspect the token on each call."""
+    _configure_resource_server(settings)
+    settings.OIDC_RS_INTROSPECTION_CACHE_TIMEOUT = 0
+    UserFactory(sub="very-specific-sub")
+
+    responses.add(
+        responses.POST,
+        "https://oidc.example.com/introspect",
+        json=_introspection_response(),
+    )
+
+    for _ in range(2):
+        response = client.get(
+            "/resource-server/v1.0/teams/",
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {build_authorization_bearer('some_token')}",
+        )
+        assert response.status_code == HTTP_200_OK
+
+    assert len(responses.calls) == 2
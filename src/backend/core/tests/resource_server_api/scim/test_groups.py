@@ -0,0 +1,263 @@
+"""
+Tests for the SCIM Groups API endpoint in People's core app
+"""
+
+import pytest
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_404_NOT_FOUND,
+)
+
+from core import factories, models
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="scim_teams")
+def scim_teams_fixture():
+    """
+    Create a user member of teams visible or not to a service provider,
+    and a team the user is not a member of.
+    """
+    user = factories.UserFactory(name="Test User")
+    service_provider = factories.ServiceProviderFactory()
+
+    team_visible = factories.TeamFactory(
+        name="Visible Team", users=[user], service_providers=[service_provider]
+    )
+    team_all_services = factories.TeamFactory(
+        name="All Services Team", users=[user], is_visible_all_services=True
+    )
+    factories.TeamFactory(name="Not Visible Team", users=[user])
+    factories.TeamFactory(name="Other Team", service_providers=[service_provider])
+
+    return user, service_provider, team_visible, team_all_services
+
+
+def test_api_scim_groups_list_anonymous(client):
+    """Anonymous users should not be allowed to list groups."""
+    response = client.get("/resource-server/v1.0/scim/Groups/")
+
+    assert response.status_code == HTTP_401_UNAUTHORIZED
+    assert response.headers["Content-Type"] == "application/json+scim"
+
+
+def test_api_scim_groups_list(
+    client, force_login_via_resource_server, django_assert_num_queries, scim_teams
+):
+    """
+    Authenticated users should list the teams they are a member of and which are
+    visible to the service provider, with their members, in a constant number
+    of queries.
+    """
+    user, service_provider, team_visible, team_all_services = scim_teams
+    other_user = factories.UserFactory()
+    factories.TeamAccessFactory(team=team_visible, user=other_user)
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        # The audiences were cached by previous calls
+        models.ServiceProvider.objects.get_audiences()
+        # count, page, team accesses with their user
+        with django_assert_num_queries(3):
+            response = client.get("/resource-server/v1.0/scim/Groups/")
+
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["Content-Type"] == "application/json+scim"
+
+    content = response.json()
+    assert content["schemas"] == ["urn:ietf:params:scim:api:messages:2.0:ListResponse"]
+    assert content["totalResults"] == 2
+    assert content["startIndex"] == 1
+    assert content["itemsPerPage"] == 2
+    groups = {group["id"]: group for group in content["Resources"]}
+    assert set(groups) == {
+        str(team_visible.external_id),
+        str(team_all_services.external_id),
+    }
+    assert groups[str(team_visible.external_id)] == {
+        "schemas": ["urn:ietf:params:scim:schemas:core:2.0:Group"],
+        "id": str(team_visible.external_id),
+        "displayName": "Visible Team",
+        "members": [
+            {"value": str(user.pk), "display": user.name, "type": "User"},
+            {"value": str(other_user.pk), "display": other_user.name, "type": "User"},
+        ],
+        "meta": {
+            "resourceType": "Group",
+            "created": team_visible.created_at.isoformat(),
+            "lastModified": team_visible.updated_at.isoformat(),
+            "location": "http://testserver/resource-server/v1.0/scim/Groups/"
+            f"{team_visible.external_id}/",
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "filter_string",
+    [
+        'displayName eq "Visible Team"',
+        'DISPLAYNAME EQ "Visible Team"',
+        'id eq "{external_id}"',
+        'members.value eq "{member_id}"',
+    ],
+)
+def test_api_scim_groups_list_filter(
+    client, force_login_via_resource_server, scim_teams, filter_string
+):
+    """Groups should be filtered with the supported attributes."""
+    user, service_provider, team_visible, _team_all_services = scim_teams
+    member = factories.UserFactory()
+    factories.TeamAccessFactory(team=team_visible, user=member)
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get(
+            "/resource-server/v1.0/scim/Groups/",
+            {
+                "filter": filter_string.format(
+                    external_id=team_visible.external_id, member_id=member.pk
+                )
+            },
+        )
+
+    assert response.status_code == HTTP_200_OK
+    assert [group["id"] for group in response.json()["Resources"]] == [
+        str(team_visible.external_id)
+    ]
+
+
+@pytest.mark.parametrize(
+    "filter_string",
+    [
+        'displayName eq "Not Visible Team"',
+        'displayName eq "Other Team"',
+        'id eq "not-a-uuid"',
+    ],
+)
+def test_api_scim_groups_list_filter_no_match(
+    client, force_login_via_resource_server, scim_teams, filter_string
+):
+    """Filters should only match the visible groups."""
+    user, service_provider, _team_visible, _team_all_services = scim_teams
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get(
+            "/resource-server/v1.0/scim/Groups/", {"filter": filter_string}
+        )
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["totalResults"] == 0
+    assert response.json()["Resources"] == []
+
+
+@pytest.mark.parametrize(
+    "filter_string",
+    ['displayName co "Team"', 'meta.created eq "2024-01-01"', "displayName eq"],
+)
+def test_api_scim_groups_list_filter_invalid(
+    client, force_login_via_resource_server, scim_teams, filter_string
+):
+    """Unsupported filters should be rejected."""
+    user, service_provider, _team_visible, _team_all_services = scim_teams
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get(
+            "/resource-server/v1.0/scim/Groups/", {"filter": filter_string}
+        )
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json() == {
+        "schemas": ["urn:ietf:params:scim:api:messages:2.0:Error"],
+        "status": "400",
+        "detail": "",
+        "scimType": "invalidFilter",
+    }
+
+
+def test_api_scim_groups_list_pagination(
+    client, force_login_via_resource_server, django_assert_num_queries
+):
+    """Groups should be paginated with the startIndex and count parameters."""
+    user = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    # Groups are ordered by primary key
+    teams = sorted(
+        factories.TeamFactory.create_batch(
+            5, users=[user], service_providers=[service_provider]
+        ),
+        key=lambda team: team.pk,
+    )
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        # The audiences were cached by previous calls
+        models.ServiceProvider.objects.get_audiences()
+        with django_assert_num_queries(3):
+            response = client.get(
+                "/resource-server/v1.0/scim/Groups/", {"startIndex": 2, "count": 2}
+            )
+        out_of_range_response = client.get(
+            "/resource-server/v1.0/scim/Groups/", {"startIndex": 6}
+        )
+
+    content = response.json()
+    assert content["totalResults"] == 5
+    assert content["startIndex"] == 2
+    assert content["itemsPerPage"] == 2
+    assert [group["id"] for group in content["Resources"]] == [
+        str(team.external_id) for team in teams[1:3]
+    ]
+
+    assert out_of_range_response.json()["totalResults"] == 5
+    assert out_of_range_response.json()["Resources"] == []
+
+
+def test_api_scim_groups_list_attributes(
+    client, force_login_via_resource_server, django_assert_num_queries, scim_teams
+):
+    """
+    The attributes and excludedAttributes parameters should select the returned
+    attributes, and members should not be fetched when not returned.
+    """
+    user, service_provider, _team_visible, _team_all_services = scim_teams
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        # The audiences were cached by previous calls
+        models.ServiceProvider.objects.get_audiences()
+        with django_assert_num_queries(2):
+            response = client.get(
+                "/resource-server/v1.0/scim/Groups/", {"attributes": "displayName"}
+            )
+        with django_assert_num_queries(2):
+            excluded_response = client.get(
+                "/resource-server/v1.0/scim/Groups/",
+                {"excludedAttributes": "members,meta"},
+            )
+
+    for group in response.json()["Resources"]:
+        assert set(group) == {"id", "schemas", "displayName"}
+    for group in excluded_response.json()["Resources"]:
+        assert set(group) == {"id", "schemas", "displayName"}
+
+
+def test_api_scim_groups_retrieve(client, force_login_via_resource_server, scim_teams):
+    """Authenticated users should retrieve the visible groups only."""
+    user, service_provider, team_visible, _team_all_services = scim_teams
+    other_team = factories.TeamFactory(service_providers=[service_provider])
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get(
+            f"/resource-server/v1.0/scim/Groups/{team_visible.external_id}/"
+        )
+        other_response = client.get(
+            f"/resource-server/v1.0/scim/Groups/{other_team.external_id}/"
+        )
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["displayName"] == "Visible Team"
+    assert response.json()["members"] == [
+        {"value": str(user.pk), "display": user.name, "type": "User"}
+    ]
+
+    assert other_response.status_code == HTTP_404_NOT_FOUND
+    assert other_response.json()["status"] == "404"
@@ -10,7 +10,7 @@ from rest_framework.status import (
 )
 
 from core import factories
-from core.models import RoleChoices
+from core.models import RoleChoices, ServiceProvider
 
 pytestmark = pytest.mark.django_db
 
@@ -42,6 +42,8 @@ def test_api_me_authenticated(
 
     # Authenticate using the resource server, ie via the Authorization header
     with force_login_via_resource_server(client, user, service_provider.audience_id):
+        # The audiences were cached by previous calls
+        ServiceProvider.objects.get_audiences()
         with django_assert_num_queries(2):
             response = client.get(
                 "/resource-server/v1.0/scim/Me/",
@@ -108,6 +110,8 @@ def test_api_me_authenticated_with_team_access(
 
     # Authenticate using the resource server, ie via the Authorization header
     with force_login_via_resource_server(client, user, service_provider.audience_id):
+        # The audiences were cached by previous calls
+        ServiceProvider.objects.get_audiences()
         with django_assert_num_queries(
             2
         ):  # User + TeamAccess (with select_related teams)
@@ -184,3 +188,44 @@ def test_api_me_method_not_allowed(
         "status": str(HTTP_405_METHOD_NOT_ALLOWED),
         "detail": "",
     }
+
+
+def test_api_me_authenticated_conditional(
+    client, force_login_via_resource_server, django_assert_num_queries
+):
+    """
+    The user details should only be loaded and sent again when the user or their
+    team accesses visible to the service provider change.
+    """
+    user = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    team = factories.TeamFactory(users=[user], service_providers=[service_provider])
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get("/resource-server/v1.0/scim/Me/")
+        etag = response["ETag"]
+
+        with django_assert_num_queries(1):  # watermarks of the team accesses
+            response = client.get(
+                "/resource-server/v1.0/scim/Me/", HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        # Teams not visible to the service provider do not change the details
+        factories.TeamFactory(users=[user])
+        response = client.get("/resource-server/v1.0/scim/Me/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        team.name = "Renamed team"
+        team.save()
+        response = client.get("/resource-server/v1.0/scim/Me/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_200_OK
+        assert response["ETag"] != etag
+        assert response.json()["groups"][0]["display"] == "Renamed team"
+        etag = response["ETag"]
+
+        team.accesses.get().delete()
+        response = client.get("/resource-server/v1.0/scim/Me/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTP_200_OK
+        assert response.json()["groups"] == []
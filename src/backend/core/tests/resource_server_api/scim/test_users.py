@@ -0,0 +1,155 @@
+"""
+Tests for the SCIM Users API endpoint in People's core app
+"""
+
+import pytest
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_404_NOT_FOUND,
+)
+
+from core import factories, models
+
+pytestmark = pytest.mark.django_db
+
+
+def test_api_scim_users_list_anonymous(client):
+    """Anonymous users should not be allowed to list users."""
+    response = client.get("/resource-server/v1.0/scim/Users/")
+
+    assert response.status_code == HTTP_401_UNAUTHORIZED
+    assert response.headers["Content-Type"] == "application/json+scim"
+
+
+def test_api_scim_users_list(
+    client, force_login_via_resource_server, django_assert_num_queries
+):
+    """
+    Authenticated users should list the members of their teams visible to the
+    service provider, with these teams only, in a constant number of queries.
+    """
+    user = factories.UserFactory()
+    member = factories.UserFactory(name="Member", email="member@example.com")
+    service_provider = factories.ServiceProviderFactory()
+    team_visible = factories.TeamFactory(
+        users=[user, member], service_providers=[service_provider]
+    )
+    # Members of a team not visible to the service provider are not listed
+    factories.TeamFactory(users=[member, factories.UserFactory()])
+    factories.UserFactory()
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        # The audiences were cached by previous calls
+        models.ServiceProvider.objects.get_audiences()
+        # count, page, team accesses with their team
+        with django_assert_num_queries(3):
+            response = client.get("/resource-server/v1.0/scim/Users/")
+
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["Content-Type"] == "application/json+scim"
+
+    content = response.json()
+    assert content["totalResults"] == 2
+    users = {user["id"]: user for user in content["Resources"]}
+    assert set(users) == {str(user.pk), str(member.pk)}
+    assert users[str(member.pk)] == {
+        "schemas": ["urn:ietf:params:scim:schemas:core:2.0:User"],
+        "id": str(member.pk),
+        "active": True,
+        "userName": member.sub,
+        "displayName": "Member",
+        "emails": [{"value": "member@example.com", "primary": True, "type": "work"}],
+        "groups": [
+            {
+                "value": str(team_visible.external_id),
+                "display": team_visible.name,
+                "type": "direct",
+            }
+        ],
+        "meta": {
+            "resourceType": "User",
+            "created": member.created_at.isoformat(),
+            "lastModified": member.updated_at.isoformat(),
+            "location": f"http://testserver/resource-server/v1.0/scim/Users/{member.pk}/",
+        },
+    }
+
+
+def test_api_scim_users_list_filter(client, force_login_via_resource_server):
+    """Users should be filtered with the supported attributes."""
+    user = factories.UserFactory()
+    member = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    team = factories.TeamFactory(users=[user], service_providers=[service_provider])
+    other_team = factories.TeamFactory(
+        users=[user, member], service_providers=[service_provider]
+    )
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        for filter_string, expected in [
+            (f'userName eq "{member.sub}"', [member]),
+            (f'id eq "{member.pk}"', [member]),
+            (f'groups.value eq "{team.external_id}"', [user]),
+            (
+                f'groups.value eq "{other_team.external_id}"',
+                sorted([user, member], key=lambda u: u.pk),
+            ),
+        ]:
+            response = client.get(
+                "/resource-server/v1.0/scim/Users/",
+                {"filter": filter_string, "attributes": "userName"},
+            )
+
+            assert response.status_code == HTTP_200_OK
+            assert response.json()["Resources"] == [
+                {
+                    "schemas": ["urn:ietf:params:scim:schemas:core:2.0:User"],
+                    "id": str(expected_user.pk),
+                    "userName": expected_user.sub,
+                }
+                for expected_user in expected
+            ]
+
+
+def test_api_scim_users_list_filter_invisible_group(
+    client, force_login_via_resource_server
+):
+    """
+    Filtering on a group not visible to the service provider should match no
+    user, even for members of both a visible and an invisible team.
+    """
+    user = factories.UserFactory()
+    member = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    factories.TeamFactory(users=[user, member], service_providers=[service_provider])
+    invisible_team = factories.TeamFactory(users=[member])
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get(
+            "/resource-server/v1.0/scim/Users/",
+            {"filter": f'groups.value eq "{invisible_team.external_id}"'},
+        )
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["totalResults"] == 0
+    assert response.json()["Resources"] == []
+
+
+def test_api_scim_users_retrieve(client, force_login_via_resource_server):
+    """Authenticated users should only retrieve the members of their visible teams."""
+    user = factories.UserFactory()
+    member = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    factories.TeamFactory(users=[user, member], service_providers=[service_provider])
+    other_user = factories.UserFactory()
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get(f"/resource-server/v1.0/scim/Users/{member.pk}/")
+        other_response = client.get(
+            f"/resource-server/v1.0/scim/Users/{other_user.pk}/"
+        )
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["id"] == str(member.pk)
+    assert other_response.status_code == HTTP_404_NOT_FOUND
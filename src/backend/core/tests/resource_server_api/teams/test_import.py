@@ -0,0 +1,339 @@
+"""
+Tests for Teams API endpoint in People's core app: import trees
+"""
+
+import uuid
+
+import pytest
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_403_FORBIDDEN,
+)
+from rest_framework.test import APIClient
+
+from core import factories, models
+
+pytestmark = pytest.mark.django_db
+
+
+def _tree(name, *children, external_id=None):
+    """Return a team tree to import."""
+    return {
+        "external_id": str(external_id or uuid.uuid4()),
+        "name": name,
+        "children": list(children),
+    }
+
+
+def test_api_teams_import_anonymous():
+    """Anonymous users should not be allowed to import teams."""
+    response = APIClient().post(
+        "/resource-server/v1.0/teams/import/",
+        {"teams": [_tree("my team")]},
+        format="json",
+    )
+
+    assert response.status_code == HTTP_401_UNAUTHORIZED
+    assert not models.Team.objects.exists()
+
+
+def test_api_teams_import_create_trees(client, force_login_via_resource_server):
+    """
+    Authenticated users should be able to import trees of teams: they own the new
+    root teams, which are linked to the service provider as their descendants.
+    """
+    user = factories.UserFactory(with_organization=True)
+    service_provider = factories.ServiceProviderFactory()
+    trees = [
+        _tree("Direction", _tree("Department A", _tree("Unit A1")), _tree("Dep B")),
+        _tree("Other direction"),
+    ]
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.post(
+            "/resource-server/v1.0/teams/import/",
+            {"teams": trees},
+            format="json",
+        )
+
+    assert response.status_code == HTTP_201_CREATED
+    teams = {team.external_id: team for team in models.Team.objects.all()}
+    assert response.json() == {
+        "results": [
+            {
+                "external_id": external_id,
+                "id": str(teams[uuid.UUID(external_id)].pk),
+                "status": "created",
+            }
+            for external_id in [
+                trees[0]["external_id"],
+                trees[0]["children"][0]["external_id"],
+                trees[0]["children"][0]["children"][0]["external_id"],
+                trees[0]["children"][1]["external_id"],
+                trees[1]["external_id"],
+            ]
+        ]
+    }
+    assert models.Team.find_problems() == ([], [], [], [], [])
+
+    direction = models.Team.objects.get(name="Direction")
+    assert direction.is_root()
+    assert [team.name for team in direction.get_descendants().order_by("path")] == [
+        "Department A",
+        "Unit A1",
+        "Dep B",
+    ]
+    assert models.Team.objects.get(name="Unit A1").depth == 3
+
+    assert set(models.TeamAccess.objects.values_list("team__name", "user", "role")) == {
+        ("Direction", user.pk, "owner"),
+        ("Other direction", user.pk, "owner"),
+    }
+    assert service_provider.teams.count() == 5
+    assert not models.Team.objects.exclude(organization=user.organization).exists()
+
+
+def test_api_teams_import_same_trees(client, force_login_via_resource_server):
+    """Importing the same trees again should not change anything."""
+    user = factories.UserFactory(with_organization=True)
+    service_provider = factories.ServiceProviderFactory()
+    trees = [_tree("Direction", _tree("Department A", _tree("Unit A1")))]
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        client.post(
+            "/resource-server/v1.0/teams/import/", {"teams": trees}, format="json"
+        )
+        teams_before = list(models.Team.objects.order_by("path").values())
+
+        response = client.post(
+            "/resource-server/v1.0/teams/import/", {"teams": trees}, format="json"
+        )
+
+    assert response.status_code == HTTP_200_OK
+    assert [result["status"] for result in response.json()["results"]] == [
+        "unchanged"
+    ] * 3
+    assert list(models.Team.objects.order_by("path").values()) == teams_before
+    assert models.TeamAccess.objects.count() == 1
+
+
+def test_api_teams_import_update_trees(client, force_login_via_resource_server):
+    """
+    Existing teams should be renamed and moved, new teams should be created
+    where needed and teams not imported should be left untouched.
+    """
+    user = factories.UserFactory(with_organization=True)
+    service_provider = factories.ServiceProviderFactory()
+    department_a = _tree("Department A", _tree("Unit A1"))
+    department_b = _tree("Department B", _tree("Unit B1"))
+    trees = [_tree("Direction", department_a, department_b)]
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        client.post(
+            "/resource-server/v1.0/teams/import/", {"teams": trees}, format="json"
+        )
+        # A team created outside of the import
+        models.Team.objects.get(name="Unit B1").add_child(name="Local team")
+
+        # Unit A1 is renamed, Department B is moved under Department A with its
+        # children, and a new unit is created in Department A
+        department_a["children"][0]["name"] = "Unit A1 renamed"
+        department_a["children"].append(department_b)
+        department_a["children"].append(_tree("Unit A2"))
+        trees[0]["children"].pop()
+
+        response = client.post(
+            "/resource-server/v1.0/teams/import/", {"teams": trees}, format="json"
+        )
+
+    assert response.status_code == HTTP_201_CREATED
+    assert [
+        (result["external_id"], result["status"])
+        for result in response.json()["results"]
+    ] == [
+        (trees[0]["external_id"], "unchanged"),
+        (department_a["external_id"], "unchanged"),
+        (department_a["children"][0]["external_id"], "updated"),
+        (department_b["external_id"], "updated"),
+        (department_b["children"][0]["external_id"], "unchanged"),
+        (department_a["children"][2]["external_id"], "created"),
+    ]
+    assert models.Team.find_problems() == ([], [], [], [], [])
+
+    direction = models.Team.objects.get(name="Direction")
+    assert direction.numchild == 1
+    assert [
+        (team.name, team.depth) for team in direction.get_descendants().order_by("path")
+    ] == [
+        ("Department A", 2),
+        ("Unit A1 renamed", 3),
+        # New teams are created before existing teams are moved
+        ("Unit A2", 3),
+        ("Department B", 3),
+        ("Unit B1", 4),
+        ("Local team", 5),
+    ]
+
+
+def test_api_teams_import_move_to_root(client, force_login_via_resource_server):
+    """Existing teams imported at the top level should become root teams."""
+    user = factories.UserFactory(with_organization=True)
+    service_provider = factories.ServiceProviderFactory()
+    department = _tree("Department")
+    trees = [_tree("Direction", department)]
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        client.post(
+            "/resource-server/v1.0/teams/import/", {"teams": trees}, format="json"
+        )
+        response = client.post(
+            "/resource-server/v1.0/teams/import/",
+            {"teams": [trees[0] | {"children": []}, department]},
+            format="json",
+        )
+
+    assert response.status_code == HTTP_200_OK
+    assert models.Team.find_problems() == ([], [], [], [], [])
+    assert models.Team.objects.get(name="Department").is_root()
+    assert models.Team.objects.get(name="Direction").numchild == 0
+
+
+def test_api_teams_import_other_service_provider(
+    client, force_login_via_resource_server
+):
+    """Teams of other service providers should not be updated by an import."""
+    user = factories.UserFactory(with_organization=True)
+    service_provider = factories.ServiceProviderFactory()
+    team = factories.TeamFactory(name="Team", organization=user.organization)
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.post(
+            "/resource-server/v1.0/teams/import/",
+            {"teams": [_tree("Renamed", external_id=team.external_id)]},
+            format="json",
+        )
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json() == {"teams": [f"Teams already exist: {team.external_id}."]}
+    team.refresh_from_db()
+    assert team.name == "Team"
+
+
+def test_api_teams_import_duplicated_external_ids(
+    client, force_login_via_resource_server
+):
+    """External ids should be unique in the imported trees."""
+    user = factories.UserFactory(with_organization=True)
+    service_provider = factories.ServiceProviderFactory()
+    external_id = uuid.uuid4()
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.post(
+            "/resource-server/v1.0/teams/import/",
+            {
+                "teams": [
+                    _tree("Team", _tree("Child", external_id=external_id)),
+                    _tree("Other team", external_id=external_id),
+                ]
+            },
+            format="json",
+        )
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json() == {"teams": ["Teams external ids must be unique."]}
+    assert not models.Team.objects.exists()
+
+
+def _import_as_member(client, force_login_via_resource_server, trees_to_import):
+    """
+    Import trees as the owner of a team tree, then import other trees as a member
+    of the root team of this tree, and return the member response.
+    """
+    owner = factories.UserFactory(with_organization=True)
+    member = factories.UserFactory(organization=owner.organization)
+    service_provider = factories.ServiceProviderFactory()
+
+    with force_login_via_resource_server(client, owner, service_provider.audience_id):
+        client.post(
+            "/resource-server/v1.0/teams/import/",
+            {"teams": trees_to_import[0]},
+            format="json",
+        )
+    factories.TeamAccessFactory(
+        team=models.Team.objects.get(name="Direction"), user=member, role="member"
+    )
+
+    with force_login_via_resource_server(client, member, service_provider.audience_id):
+        return client.post(
+            "/resource-server/v1.0/teams/import/",
+            {"teams": trees_to_import[1]},
+            format="json",
+        )
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        # rename a team
+        lambda direction, department: [direction | {"name": "Renamed"}],
+        # change the visibility of a team
+        lambda direction, department: [direction | {"is_visible_all_services": True}],
+        # move a team to root
+        lambda direction, department: [direction | {"children": []}, department],
+        # add a child to a team
+        lambda direction, department: [
+            direction | {"children": [department, _tree("New team")]}
+        ],
+    ],
+)
+def test_api_teams_import_member_not_allowed(
+    client, force_login_via_resource_server, change
+):
+    """
+    Members who are neither owner nor administrator of existing teams should not
+    be allowed to change them.
+    """
+    department = _tree("Department")
+    direction = _tree("Direction", department)
+
+    response = _import_as_member(
+        client,
+        force_login_via_resource_server,
+        [[direction], change(direction, department)],
+    )
+
+    assert response.status_code == HTTP_403_FORBIDDEN
+    assert response.json()["detail"].startswith(
+        "You must be owner or administrator of the teams to change: "
+    )
+    assert models.Team.find_problems() == ([], [], [], [], [])
+    assert list(models.Team.objects.order_by("path").values_list("name", "depth")) == [
+        ("Direction", 1),
+        ("Department", 2),
+    ]
+    assert not models.Team.objects.filter(is_visible_all_services=True).exists()
+
+
+def test_api_teams_import_member_new_trees(client, force_login_via_resource_server):
+    """
+    Members should still be allowed to import their own new trees next to the
+    unchanged teams they are member of.
+    """
+    department = _tree("Department")
+    direction = _tree("Direction", department)
+
+    response = _import_as_member(
+        client,
+        force_login_via_resource_server,
+        [[direction], [direction, _tree("Other direction")]],
+    )
+
+    assert response.status_code == HTTP_201_CREATED
+    assert [result["status"] for result in response.json()["results"]] == [
+        "unchanged",
+        "unchanged",
+        "created",
+    ]
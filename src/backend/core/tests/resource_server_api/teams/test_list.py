@@ -64,8 +64,8 @@ def test_api_teams_list_authenticated(  # pylint: disable=too-many-locals
 
     # Authenticate using the resource server, ie via the Authorization header
     with force_login_via_resource_server(client, user, service_provider.audience_id):
-        with django_assert_num_queries(5):
-            # queries: Team path, Count, Team, ServiceProvider, TeamAccess
+        with django_assert_num_queries(4):
+            # queries: Team path, ServiceProvider audiences (cold cache), Count, Team
             response = client.get(
                 "/resource-server/v1.0/teams/?ordering=created_at",
                 format="json",
@@ -322,3 +322,16 @@ def test_api_teams_list_is_visible_all_services_teams(
     assert len(team_ids) == 2
     assert str(service_team.id) in team_ids
     assert str(other_public_team.id) in team_ids
+
+
+def test_api_teams_list_fields(client, force_login_via_resource_server):
+    """Only the requested fields should be returned."""
+    user = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    team = factories.TeamFactory(users=[user], service_providers=[service_provider])
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get("/resource-server/v1.0/teams/?fields=id,name")
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["results"] == [{"id": str(team.pk), "name": team.name}]
@@ -255,3 +255,39 @@ def test_api_teams_retrieve_is_visible_all_services_team(
 
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["id"] == str(public_team.id)
+
+
+def test_api_teams_retrieve_conditional(client, force_login_via_resource_server):
+    """
+    A team should not be sent again when unchanged, and should be when it is
+    updated or its tree changes.
+    """
+    service_provider = factories.ServiceProviderFactory()
+    user = factories.UserFactory()
+    team = factories.TeamFactory(users=[user], service_providers=[service_provider])
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        response = client.get(f"/resource-server/v1.0/teams/{team.id!s}/")
+        etag = response["ETag"]
+        assert response["Last-Modified"]
+
+        response = client.get(
+            f"/resource-server/v1.0/teams/{team.id!s}/", HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+        # Selecting other fields changes the representation
+        response = client.get(
+            f"/resource-server/v1.0/teams/{team.id!s}/?fields=id,name",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        # Adding a child team does not update the team `updated_at`
+        team.add_child(name="Child")
+        response = client.get(
+            f"/resource-server/v1.0/teams/{team.id!s}/", HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["numchild"] == 1
@@ -0,0 +1,279 @@
+"""
+Tests for the changes feed API endpoint in People's core app
+"""
+
+import base64
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+
+import pytest
+from freezegun import freeze_time
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_410_GONE,
+)
+from rest_framework.test import APIClient
+
+from core import factories, models
+from core.api.resource_server.changes import encode_cursor
+from core.tasks import purge_tombstones_task
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_settle_delay(settings):
+    """Return the changes right away."""
+    settings.CHANGES_FEED_SETTLE_DELAY = 0
+
+
+def _get_changes(client, **params):
+    """Call the changes feed and return its content."""
+    response = client.get("/resource-server/v1.0/changes/", params)
+    assert response.status_code == HTTP_200_OK
+    return response.json()
+
+
+def test_api_changes_anonymous():
+    """Anonymous users should not be allowed to read the changes feed."""
+    response = APIClient().get("/resource-server/v1.0/changes/")
+
+    assert response.status_code == HTTP_401_UNAUTHORIZED
+
+
+def test_api_changes_initial_sync(client, force_login_via_resource_server):
+    """
+    Without cursor, the changes feed should return the teams visible to the
+    service provider the user is a member of, their accesses and invitations.
+    """
+    user = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    with freeze_time("2026-01-01 10:00:00"):
+        team = factories.TeamFactory(service_providers=[service_provider])
+    with freeze_time("2026-01-01 10:00:01"):
+        access = factories.TeamAccessFactory(team=team, user=user)
+    with freeze_time("2026-01-01 10:00:02"):
+        invitation = factories.InvitationFactory(team=team)
+    # Not visible to the service provider
+    factories.TeamFactory(users=[user])
+    # The user is not a member
+    factories.TeamFactory(service_providers=[service_provider])
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        content = _get_changes(client)
+
+    assert content["has_more"] is False
+    assert [
+        (change["type"], change["action"], change["id"])
+        for change in content["changes"]
+    ] == [
+        ("team", "upserted", str(team.pk)),
+        ("team_access", "upserted", str(access.pk)),
+        ("invitation", "upserted", str(invitation.pk)),
+    ]
+    assert content["changes"][0]["data"]["name"] == team.name
+    assert content["changes"][1]["data"] == {
+        "id": str(access.pk),
+        "created_at": access.created_at.isoformat().replace("+00:00", "Z"),
+        "role": access.role,
+        "team": str(team.pk),
+        "updated_at": access.updated_at.isoformat().replace("+00:00", "Z"),
+        "user": str(user.pk),
+    }
+    assert content["changes"][2]["data"]["email"] == invitation.email
+
+
+def test_api_changes_incremental_sync(client, force_login_via_resource_server):
+    """
+    With a cursor, the changes feed should only return the changes since then,
+    deletions included.
+    """
+    user = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    team = factories.TeamFactory(users=[user], service_providers=[service_provider])
+    other_access = factories.TeamAccessFactory(team=team)
+    invitation = factories.InvitationFactory(team=team)
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        cursor = _get_changes(client)["cursor"]
+
+        # Nothing changed
+        content = _get_changes(client, cursor=cursor)
+        assert content["changes"] == []
+        cursor = content["cursor"]
+
+        team.name = "Renamed team"
+        team.save()
+        other_access.delete()
+        invitation.delete()
+
+        content = _get_changes(client, cursor=cursor)
+
+    assert [
+        (change["type"], change["action"], change["id"])
+        for change in content["changes"]
+    ] == [
+        ("team", "upserted", str(team.pk)),
+        ("team_access", "deleted", str(other_access.pk)),
+        ("invitation", "deleted", str(invitation.pk)),
+    ]
+    assert content["changes"][0]["data"]["name"] == "Renamed team"
+    assert content["changes"][1]["data"] is None
+
+
+def test_api_changes_team_deleted(client, force_login_via_resource_server):
+    """Users should be notified of the deletion of their teams and accesses."""
+    user = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    team = factories.TeamFactory(service_providers=[service_provider])
+    access = factories.TeamAccessFactory(team=team, user=user)
+    other_team = factories.TeamFactory(
+        users=[user], service_providers=[service_provider]
+    )
+    other_access = other_team.accesses.get()
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        cursor = _get_changes(client)["cursor"]
+
+        team.delete()
+        # The user is removed from the other team, which is no longer visible
+        other_access.delete()
+
+        content = _get_changes(client, cursor=cursor)
+
+    assert {
+        (change["type"], change["action"], change["id"])
+        for change in content["changes"]
+    } == {
+        ("team_access", "deleted", str(access.pk)),
+        ("team", "deleted", str(team.pk)),
+        ("team_access", "deleted", str(other_access.pk)),
+    }
+
+
+def test_api_changes_pagination(client, force_login_via_resource_server):
+    """Changes should be paginated without duplicates nor gaps."""
+    user = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+    team = factories.TeamFactory(users=[user], service_providers=[service_provider])
+    # Changes with the same timestamp
+    with freeze_time(timezone.now() - timedelta(minutes=1)):
+        factories.TeamAccessFactory.create_batch(4, team=team)
+        factories.InvitationFactory.create_batch(3, team=team)
+
+    expected_ids = {
+        str(team.pk),
+        *(str(pk) for pk in team.accesses.values_list("pk", flat=True)),
+        *(str(pk) for pk in team.invitations.values_list("pk", flat=True)),
+    }
+    assert len(expected_ids) == 9
+
+    ids = []
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        content = _get_changes(client, limit=2)
+        ids += [change["id"] for change in content["changes"]]
+        while content["has_more"]:
+            content = _get_changes(client, limit=2, cursor=content["cursor"])
+            ids += [change["id"] for change in content["changes"]]
+
+    assert len(ids) == 9
+    assert set(ids) == expected_ids
+
+
+def test_api_changes_settle_delay(client, force_login_via_resource_server, settings):
+    """The most recent changes should only be returned after the settle delay."""
+    settings.CHANGES_FEED_SETTLE_DELAY = 5
+    user = factories.UserFactory()
+    service_provider = factories.ServiceProviderFactory()
+
+    with freeze_time("2026-01-01 10:00:00"):
+        factories.TeamFactory(users=[user], service_providers=[service_provider])
+
+    with force_login_via_resource_server(client, user, service_provider.audience_id):
+        with freeze_time("2026-01-01 10:00:04"):
+            content = _get_changes(client)
+        assert content["changes"] == []
+
+        with freeze_time("2026-01-01 10:00:06"):
+            content = _get_changes(client, cursor=content["cursor"])
+        assert len(content["changes"]) == 2
+
+
+def test_api_changes_invalid_cursor(client, force_login_via_resource_server):
+    """Invalid cursors should be rejected."""
+    user = factories.UserFactory()
+
+    with force_login_via_resource_server(client, user, "some_service_provider"):
+        response = client.get(
+            "/resource-server/v1.0/changes/", {"cursor": "not-a-cursor"}
+        )
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json() == {"cursor": ["Invalid cursor."]}
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        # Naive timestamp
+        ["2026-01-01T00:00:00", -1, None],
+        # Rank of an unknown source, or not an integer
+        ["{now}", 4, "8b6b8b1e-8ab7-4cd2-b1c1-8e2cf1b0c5d8"],
+        ["{now}", -2, None],
+        ["{now}", "0", "8b6b8b1e-8ab7-4cd2-b1c1-8e2cf1b0c5d8"],
+        ["{now}", 1.5, "8b6b8b1e-8ab7-4cd2-b1c1-8e2cf1b0c5d8"],
+        # Object id which is not a UUID
+        ["{now}", 0, "not-a-uuid"],
+        ["{now}", 0, 42],
+        ["{now}", 0, None],
+        # Not a list of 3 values
+        ["{now}", 0],
+        {"timestamp": "{now}"},
+    ],
+)
+def test_api_changes_invalid_cursor_values(
+    client, force_login_via_resource_server, value
+):
+    """Cursors with invalid values should be rejected, not crash the endpoint."""
+    user = factories.UserFactory()
+    now = timezone.now().isoformat()
+    if isinstance(value, list):
+        value = [now if item == "{now}" else item for item in value]
+    cursor = base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+    with force_login_via_resource_server(client, user, "some_service_provider"):
+        response = client.get("/resource-server/v1.0/changes/", {"cursor": cursor})
+
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json() == {"cursor": ["Invalid cursor."]}
+
+
+def test_api_changes_expired_cursor(client, force_login_via_resource_server, settings):
+    """Cursors older than the retention of the deletions should be expired."""
+    user = factories.UserFactory()
+    cursor = encode_cursor(
+        timezone.now() - timedelta(seconds=settings.CHANGES_FEED_RETENTION + 1),
+        -1,
+        None,
+    )
+
+    with force_login_via_resource_server(client, user, "some_service_provider"):
+        response = client.get("/resource-server/v1.0/changes/", {"cursor": cursor})
+
+    assert response.status_code == HTTP_410_GONE
+
+
+def test_api_changes_purge_tombstones(settings):
+    """Tombstones older than the retention should be purged."""
+    with freeze_time(
+        timezone.now() - timedelta(seconds=settings.CHANGES_FEED_RETENTION + 1)
+    ):
+        factories.TeamFactory().delete()
+    factories.TeamFactory().delete()
+
+    assert purge_tombstones_task() == 1
+    assert models.Tombstone.objects.count() == 1
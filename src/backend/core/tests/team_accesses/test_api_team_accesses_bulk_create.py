@@ -0,0 +1,282 @@
+"""
+Test for team accesses API endpoints in People's core app : bulk create
+"""
+
+import json
+import re
+import uuid
+
+import pytest
+import responses
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import enums, factories, models
+
+pytestmark = pytest.mark.django_db
+
+
+def test_api_team_accesses_bulk_create_anonymous():
+    """Anonymous users should not be allowed to create team accesses."""
+    user = factories.UserFactory()
+    team = factories.TeamFactory()
+
+    response = APIClient().post(
+        f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+        {"accesses": [{"user": str(user.id), "role": "member"}]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert models.TeamAccess.objects.exists() is False
+
+
+@pytest.mark.parametrize("role", [None, "member"])
+def test_api_team_accesses_bulk_create_not_allowed(role):
+    """Only owners and administrators of a team should be allowed to add members."""
+    user, other_user = factories.UserFactory.create_batch(2)
+    team = factories.TeamFactory(users=[(user, role)] if role else [])
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+        {"accesses": [{"user": str(other_user.id), "role": "member"}]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json() == {
+        "detail": "You are not allowed to manage accesses for this team."
+    }
+    assert not models.TeamAccess.objects.filter(user=other_user).exists()
+
+
+def test_api_team_accesses_bulk_create_administrator_owner_role():
+    """Administrators should not be allowed to add owners."""
+    user, other_user = factories.UserFactory.create_batch(2)
+    team = factories.TeamFactory(users=[(user, "administrator")])
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+        {
+            "accesses": [
+                {"user": str(other_user.id), "role": "member"},
+                {"user": str(factories.UserFactory().id), "role": "owner"},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json() == {
+        "detail": "Only owners of a team can assign other users as owners."
+    }
+    assert models.TeamAccess.objects.filter(team=team).count() == 1
+
+
+def test_api_team_accesses_bulk_create_results(django_assert_num_queries):
+    """
+    Owners should be able to add several members in one request, and get
+    the result for each of them.
+    """
+    user = factories.UserFactory()
+    team = factories.TeamFactory(users=[(user, "owner")])
+    new_users = factories.UserFactory.create_batch(3)
+    existing_access = factories.TeamAccessFactory(team=team, role="member")
+    unknown_user_id = uuid.uuid4()
+
+    client = APIClient()
+    client.force_login(user)
+
+    # get user, get user role, get users, get existing accesses,
+    # insert accesses (within a savepoint), check inserted accesses, get webhooks
+    with django_assert_num_queries(9):
+        response = client.post(
+            f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+            {
+                "accesses": [
+                    {"user": str(new_users[0].id), "role": "administrator"},
+                    {"user": str(existing_access.user.id), "role": "owner"},
+                    {"user": str(unknown_user_id)},
+                    {"user": str(new_users[1].id)},
+                    {"user": str(new_users[2].id), "role": "owner"},
+                    # duplicates are ignored
+                    {"user": str(new_users[1].id), "role": "owner"},
+                ]
+            },
+            format="json",
+        )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    accesses = {
+        access.user_id: access for access in models.TeamAccess.objects.filter(team=team)
+    }
+    assert response.json() == {
+        "results": [
+            {
+                "user": str(new_users[0].id),
+                "role": "administrator",
+                "status": "created",
+                "id": str(accesses[new_users[0].id].id),
+            },
+            {
+                "user": str(existing_access.user.id),
+                "role": "owner",
+                "status": "already_exists",
+                "id": str(existing_access.id),
+            },
+            {
+                "user": str(unknown_user_id),
+                "role": "member",
+                "status": "user_not_found",
+            },
+            {
+                "user": str(new_users[1].id),
+                "role": "member",
+                "status": "created",
+                "id": str(accesses[new_users[1].id].id),
+            },
+            {
+                "user": str(new_users[2].id),
+                "role": "owner",
+                "status": "created",
+                "id": str(accesses[new_users[2].id].id),
+            },
+        ]
+    }
+    assert len(accesses) == 5
+    assert accesses[new_users[2].id].role == "owner"
+    # Existing accesses are left untouched
+    assert accesses[existing_access.user_id].role == "member"
+
+
+def test_api_team_accesses_bulk_create_nothing_created():
+    """When all users are already members, nothing should be created."""
+    user = factories.UserFactory()
+    team = factories.TeamFactory(users=[(user, "owner")])
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+        {"accesses": [{"user": str(user.id), "role": "member"}]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"][0]["status"] == "already_exists"
+    assert models.TeamAccess.objects.get(team=team).role == "owner"
+
+
+def test_api_team_accesses_bulk_create_invalid_payload():
+    """The payload should be validated."""
+    user = factories.UserFactory()
+    team = factories.TeamFactory(users=[(user, "owner")])
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+        {"accesses": [{"user": "not-a-uuid", "role": "king"}]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {
+        "accesses": [
+            {
+                "user": ["Must be a valid UUID."],
+                "role": ['"king" is not a valid choice.'],
+            }
+        ]
+    }
+
+    response = client.post(
+        f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+        {"accesses": []},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_api_team_accesses_bulk_create_with_scim_webhook(
+    django_capture_on_commit_callbacks,
+):
+    """
+    If a team has a SCIM webhook, adding members in bulk should fire a single
+    call with all the new members, once the accesses are committed.
+    """
+    user = factories.UserFactory()
+    team = factories.TeamFactory(users=[(user, "owner")])
+    webhook = factories.TeamWebhookFactory(
+        team=team, protocol=enums.WebhookProtocolChoices.SCIM
+    )
+    new_users = factories.UserFactory.create_batch(3)
+
+    client = APIClient()
+    client.force_login(user)
+
+    with responses.RequestsMock() as rsps:
+        rsp = rsps.add(
+            rsps.PATCH,
+            re.compile(r".*/Groups/.*"),
+            body="{}",
+            status=200,
+            content_type="application/json",
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+                {"accesses": [{"user": str(new_user.id)} for new_user in new_users]},
+                format="json",
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            assert rsp.call_count == 0
+            webhook.refresh_from_db()
+            assert webhook.status == enums.WebhookStatusChoices.PENDING
+
+        assert rsp.call_count == 1
+        assert rsps.calls[0].request.url == webhook.url
+        payload = json.loads(rsps.calls[0].request.body)
+        assert payload["Operations"] == [
+            {
+                "op": "add",
+                "path": "members",
+                "value": [
+                    {"value": str(new_user.id), "email": new_user.email, "type": "User"}
+                    for new_user in new_users
+                ],
+            }
+        ]
+
+    webhook.refresh_from_db()
+    assert webhook.status == enums.WebhookStatusChoices.SUCCESS
+
+
+def test_api_team_accesses_bulk_create_clears_abilities_cache(settings):
+    """The cached abilities of the new members should be computed again."""
+    settings.FEATURES = settings.FEATURES | {"TEAMS_DISPLAY": False}
+    user, other_user = factories.UserFactory.create_batch(2)
+    team = factories.TeamFactory(users=[(user, "owner")])
+    assert other_user.get_abilities()["teams"]["can_view"] is False
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/teams/{team.id!s}/accesses/bulk/",
+        {"accesses": [{"user": str(other_user.id), "role": "administrator"}]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert other_user.get_abilities()["teams"]["can_view"] is True
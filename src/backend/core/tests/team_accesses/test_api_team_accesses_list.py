@@ -367,3 +367,28 @@ def test_api_team_accesses_list_authenticated_ordering_user(ordering_field):
         mary.name,
         nicole.name,
     ]
+
+
+def test_api_team_accesses_list_fields(django_assert_num_queries):
+    """
+    Only the requested fields should be returned, without computing the abilities
+    nor loading the users when they are not requested.
+    """
+    user = factories.UserFactory()
+    team = factories.TeamFactory()
+    factories.TeamAccessFactory(team=team, user=user)
+    factories.TeamAccessFactory.create_batch(2, team=team)
+
+    client = APIClient()
+    client.force_login(user)
+
+    # get user, count accesses, get accesses
+    with django_assert_num_queries(3):
+        response = client.get(
+            f"/api/v1.0/teams/{team.id!s}/accesses/?fields=id,role",
+        )
+
+    assert response.status_code == HTTP_200_OK
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert {tuple(result) for result in results} == {("id", "role")}
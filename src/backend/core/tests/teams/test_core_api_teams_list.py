@@ -178,7 +178,7 @@ def test_api_teams_list_authenticated_team_tree(client, role, local_team_abiliti
     _fourth_team = factories.TeamFactory(name="Fourth", parent_id=third_team.pk)
 
     # user is a member of the second team
-    user_access = factories.TeamAccessFactory(team=second_team, user=user, role=role)
+    factories.TeamAccessFactory(team=second_team, user=user, role=role)
 
     response = client.get("/api/v1.0/teams/")
 
@@ -188,11 +188,11 @@ def test_api_teams_list_authenticated_team_tree(client, role, local_team_abiliti
         {
             # I have the abilities only on the team I have a specific role
             "abilities": local_team_abilities,
-            "accesses": [str(user_access.pk)],
             "created_at": second_team.created_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "depth": 3,
             "id": str(second_team.pk),
             "is_visible_all_services": False,
+            "members_count": 1,
             "name": "Second",
             "numchild": 1,
             "path": second_team.path,
@@ -208,11 +208,11 @@ def test_api_teams_list_authenticated_team_tree(client, role, local_team_abiliti
                 "patch": False,
                 "put": False,
             },
-            "accesses": [],
             "created_at": first_team.created_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "depth": 2,
             "id": str(first_team.pk),
             "is_visible_all_services": False,
+            "members_count": 0,
             "name": "First",
             "numchild": 1,
             "path": first_team.path,
@@ -228,11 +228,11 @@ def test_api_teams_list_authenticated_team_tree(client, role, local_team_abiliti
                 "patch": False,
                 "put": False,
             },
-            "accesses": [],
             "created_at": root_team.created_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "depth": 1,
             "id": str(root_team.pk),
             "is_visible_all_services": False,
+            "members_count": 0,
             "name": "Root",
             "numchild": 1,
             "path": root_team.path,
@@ -306,7 +306,7 @@ def test_api_teams_list_authenticated_team_different_organization(
     client.force_login(user)
 
     # user is a member of the second team
-    user_access = factories.TeamAccessFactory(team=second_team, user=user, role=role)
+    factories.TeamAccessFactory(team=second_team, user=user, role=role)
 
     response = client.get("/api/v1.0/teams/")
 
@@ -315,11 +315,11 @@ def test_api_teams_list_authenticated_team_different_organization(
         {
             # I have the abilities only on the team I have a specific role
             "abilities": local_team_abilities,
-            "accesses": [str(user_access.pk)],
             "created_at": second_team.created_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "depth": 3,
             "id": str(second_team.pk),
             "is_visible_all_services": False,
+            "members_count": 1,
             "name": "Second",
             "numchild": 1,
             "path": second_team.path,
@@ -327,3 +327,97 @@ def test_api_teams_list_authenticated_team_different_organization(
             "updated_at": second_team.updated_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
         },
     ]
+
+
+def test_api_teams_list_members_count(django_assert_num_queries):
+    """Teams should be listed with their number of members instead of their accesses."""
+    user = factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    team = factories.TeamFactory(users=[user])
+    factories.TeamAccessFactory.create_batch(3, team=team)
+    other_team = factories.TeamFactory(users=[user])
+
+    # get user, get user teams, get teams with counts, prefetch service providers
+    with django_assert_num_queries(4):
+        response = client.get("/api/v1.0/teams/?ordering=created_at")
+
+    assert response.status_code == HTTP_200_OK
+    assert [(team["id"], team["members_count"]) for team in response.json()] == [
+        (str(team.pk), 4),
+        (str(other_team.pk), 1),
+    ]
+    assert "accesses" not in response.json()[0]
+
+
+def test_api_teams_list_pagination_opt_in():
+    """Teams should only be paginated when a page or a page size is requested."""
+    user = factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    team_ids = [
+        str(team.id) for team in factories.TeamFactory.create_batch(3, users=[user])
+    ]
+
+    response = client.get("/api/v1.0/teams/?ordering=created_at")
+    assert response.status_code == HTTP_200_OK
+    assert len(response.json()) == 3
+
+    response = client.get("/api/v1.0/teams/?ordering=created_at&page_size=2")
+    assert response.status_code == HTTP_200_OK
+    content = response.json()
+    assert content["count"] == 3
+    assert content["next"] is not None
+    assert [team["id"] for team in content["results"]] == team_ids[:2]
+
+    response = client.get("/api/v1.0/teams/?ordering=created_at&page_size=2&page=2")
+    assert response.status_code == HTTP_200_OK
+    assert [team["id"] for team in response.json()["results"]] == team_ids[2:]
+
+
+def test_api_teams_list_fields(django_assert_num_queries):
+    """
+    Only the requested fields should be returned, without computing the others.
+    """
+    user = factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    team = factories.TeamFactory(users=[user])
+
+    # get user, get user teams, get teams (no count, no prefetch)
+    with django_assert_num_queries(3):
+        response = client.get("/api/v1.0/teams/?fields=id,name")
+
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == [{"id": str(team.pk), "name": team.name}]
+
+
+def test_api_teams_list_omit():
+    """Omitted fields should not be returned."""
+    user = factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    factories.TeamFactory(users=[user])
+
+    response = client.get("/api/v1.0/teams/?omit=abilities,service_providers")
+
+    assert response.status_code == HTTP_200_OK
+    assert set(response.json()[0]) == {
+        "created_at",
+        "depth",
+        "id",
+        "is_visible_all_services",
+        "members_count",
+        "name",
+        "numchild",
+        "path",
+        "updated_at",
+    }
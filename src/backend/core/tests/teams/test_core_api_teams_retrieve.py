@@ -52,26 +52,21 @@ def test_api_teams_retrieve_authenticated_related():
     client.force_login(user)
 
     team = factories.TeamFactory()
-    access1 = factories.TeamAccessFactory(team=team, user=user)
-    access2 = factories.TeamAccessFactory(team=team)
+    factories.TeamAccessFactory(team=team, user=user)
+    factories.TeamAccessFactory(team=team)
 
     response = client.get(
         f"/api/v1.0/teams/{team.id!s}/",
     )
 
     assert response.status_code == status.HTTP_200_OK
-    assert sorted(response.json().pop("accesses")) == sorted(
-        [
-            str(access1.id),
-            str(access2.id),
-        ]
-    )
     assert response.json() == {
         "abilities": team.get_abilities(user),
         "created_at": team.created_at.isoformat().replace("+00:00", "Z"),
         "depth": 1,
         "id": str(team.id),
         "is_visible_all_services": False,
+        "members_count": 2,
         "name": team.name,
         "numchild": 0,
         "path": team.path,
@@ -109,11 +104,11 @@ def test_api_teams_retrieve_authenticated_related_parent(client, role):
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == {
         "abilities": abilities,
-        "accesses": [],
         "created_at": first_team.created_at.isoformat().replace("+00:00", "Z"),
         "depth": 2,
         "id": str(first_team.pk),
         "is_visible_all_services": False,
+        "members_count": 0,
         "name": first_team.name,
         "numchild": 1,
         "path": first_team.path,
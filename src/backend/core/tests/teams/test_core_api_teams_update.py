@@ -119,7 +119,14 @@ def test_api_teams_update_authenticated_administrators():
     team.refresh_from_db()
     final_values = serializers.TeamSerializer(instance=team).data
     for key, value in final_values.items():
-        if key in ["id", "accesses", "created_at", "depth", "path", "numchild"]:
+        if key in [
+            "id",
+            "created_at",
+            "depth",
+            "members_count",
+            "path",
+            "numchild",
+        ]:
             assert value == initial_values[key]
         elif key == "updated_at":
             assert value > initial_values[key]
@@ -173,7 +180,14 @@ def test_api_teams_update_authenticated_owners():
     team.refresh_from_db()
     team_values = serializers.TeamSerializer(instance=team).data
     for key, value in team_values.items():
-        if key in ["id", "accesses", "created_at", "depth", "path", "numchild"]:
+        if key in [
+            "id",
+            "created_at",
+            "depth",
+            "members_count",
+            "path",
+            "numchild",
+        ]:
             assert value == old_team_values[key]
         elif key == "updated_at":
             assert value > old_team_values[key]
@@ -5,6 +5,7 @@ Test users API endpoints in the People core app.
 import pytest
 from rest_framework.status import (
     HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
 )
 from rest_framework.test import APIClient
 
@@ -55,3 +56,21 @@ def test_api_config_authenticated():
         },
         "RELEASE": "NA",
     }
+
+
+def test_api_config_conditional(settings):
+    """The configuration should not be sent again when unchanged."""
+    client = APIClient()
+    response = client.get("/api/v1.0/config/")
+    etag = response["ETag"]
+
+    response = client.get("/api/v1.0/config/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+    assert response.content == b""
+
+    settings.CRISP_WEBSITE_ID = "123"
+    response = client.get("/api/v1.0/config/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_200_OK
+    assert response["ETag"] != etag
+    assert response.json()["CRISP_WEBSITE_ID"] == "123"
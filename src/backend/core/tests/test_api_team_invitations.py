@@ -4,11 +4,13 @@ Unit tests for the Invitation model
 
 import time
 
+from django.core import mail
+
 import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core import factories
+from core import factories, models
 from core.api.client import serializers
 
 pytestmark = pytest.mark.django_db
@@ -178,6 +180,107 @@ def test_api_team_invitations__create__cannot_invite_existing_users():
     )
 
 
+def test_api_team_invitations__bulk_create__members():
+    """Members should not be able to invite people in bulk."""
+    user = factories.UserFactory()
+    team = factories.TeamFactory(users=[(user, "member")])
+
+    client = APIClient()
+    client.force_login(user)
+    response = client.post(
+        f"/api/v1.0/teams/{team.id}/invitations/bulk/",
+        {"invitations": [{"email": "john@example.com"}]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json() == {
+        "detail": "You are not allowed to manage invitation for this team."
+    }
+    assert models.Invitation.objects.exists() is False
+
+
+def test_api_team_invitations__bulk_create__results(
+    django_assert_max_num_queries, django_capture_on_commit_callbacks
+):
+    """
+    Privileged members should be able to invite several people in one request,
+    known users and invited people being found whatever the case of their email.
+    """
+    user = factories.UserFactory()
+    team = factories.TeamFactory(users=[(user, "owner")])
+    factories.UserFactory(email="known@example.com")
+    existing_invitation = factories.InvitationFactory(
+        team=team, email="invited@example.com"
+    )
+
+    client = APIClient()
+    client.force_login(user)
+
+    # get user, get user role, get team, get known users, get existing invitations,
+    # insert invitations (within a savepoint) and check inserted invitations
+    with (
+        django_capture_on_commit_callbacks() as callbacks,
+        django_assert_max_num_queries(9),
+    ):
+        response = client.post(
+            f"/api/v1.0/teams/{team.id}/invitations/bulk/",
+            {
+                "invitations": [
+                    {"email": "new@example.com", "role": "administrator"},
+                    {"email": "KNOWN@example.com"},
+                    {"email": "Invited@Example.com"},
+                    {"email": "other@example.com"},
+                    # duplicates are ignored
+                    {"email": "New@example.com", "role": "owner"},
+                ]
+            },
+            format="json",
+        )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    invitations = {
+        invitation.email: invitation
+        for invitation in models.Invitation.objects.filter(team=team)
+    }
+    assert response.json()["results"] == [
+        {
+            "email": "new@example.com",
+            "role": "administrator",
+            "status": "created",
+            "id": str(invitations["new@example.com"].id),
+        },
+        {
+            "email": "KNOWN@example.com",
+            "role": "member",
+            "status": "user_already_exists",
+        },
+        {
+            "email": "Invited@Example.com",
+            "role": "member",
+            "status": "already_invited",
+            "id": str(existing_invitation.id),
+        },
+        {
+            "email": "other@example.com",
+            "role": "member",
+            "status": "created",
+            "id": str(invitations["other@example.com"].id),
+        },
+    ]
+    assert len(invitations) == 3
+    assert invitations["new@example.com"].issuer == user
+
+    # The invitations are emailed once committed
+    assert not mail.outbox
+    assert len(callbacks) == 1
+    callbacks[0]()
+    assert sorted(email.to[0] for email in mail.outbox) == [
+        "new@example.com",
+        "other@example.com",
+    ]
+
+
 def test_api_team_invitations__list__anonymous_user():
     """Anonymous users should not be able to list invitations."""
     team = factories.TeamFactory()
@@ -0,0 +1,126 @@
+"""
+Unit tests for the validated bulk writes of the base model
+"""
+
+from django.core.exceptions import ValidationError
+
+import pytest
+
+from core import factories, models
+
+pytestmark = pytest.mark.django_db
+
+
+def test_models_bulk_create_validated_one_query_per_unique_set(
+    django_assert_num_queries,
+):
+    """Uniqueness should be checked with one query per set of unique fields."""
+    service_providers = [
+        models.ServiceProvider(name=f"sp {i:d}", audience_id=f"audience-{i:d}")
+        for i in range(10)
+    ]
+
+    # name and audience_id checks, then the insert
+    with django_assert_num_queries(3):
+        created = models.ServiceProvider.bulk_create_validated(service_providers)
+
+    assert created == service_providers
+    assert models.ServiceProvider.objects.count() == 10
+
+
+def test_models_bulk_create_validated_unique_errors():
+    """Duplicates in the database or in the batch should raise a validation error."""
+    existing = factories.ServiceProviderFactory(name="existing")
+
+    with pytest.raises(ValidationError) as excinfo:
+        models.ServiceProvider.bulk_create_validated(
+            [
+                models.ServiceProvider(name="existing", audience_id="new-1"),
+                models.ServiceProvider(name="new", audience_id="new-2"),
+                models.ServiceProvider(name="new", audience_id=existing.audience_id),
+            ]
+        )
+
+    assert excinfo.value.message_dict == {
+        "existing": ["Service provider with this Name already exists."],
+        "new": [
+            "Service provider with this Name already exists.",
+            "Service provider with this Audience id already exists.",
+        ],
+    }
+    assert models.ServiceProvider.objects.count() == 1
+
+
+def test_models_bulk_create_validated_skip_invalid():
+    """Invalid instances should be skipped, and the valid ones created."""
+    user = factories.UserFactory()
+    team = factories.TeamFactory(users=[(user, "owner")])
+    other_team = factories.TeamFactory()
+
+    duplicate_access = models.TeamAccess(user=user, team=team, role="member")
+    invalid_access = models.TeamAccess(user=user, team=other_team, role="unknown")
+    errors = models.TeamAccess.bulk_clean([duplicate_access, invalid_access])
+    assert errors[duplicate_access].message_dict == {
+        "__all__": ["This user is already in this team."]
+    }
+    assert errors[invalid_access].message_dict == {
+        "role": ["Value 'unknown' is not a valid choice."]
+    }
+
+    valid_access = models.TeamAccess(user=user, team=other_team, role="member")
+    created = models.TeamAccess.bulk_create_validated(
+        [
+            models.TeamAccess(user=user, team=team, role="member"),
+            valid_access,
+        ],
+        skip_invalid=True,
+    )
+
+    assert created == [valid_access]
+    assert models.TeamAccess.objects.filter(user=user).count() == 2
+
+
+def test_models_bulk_update_validated(django_assert_num_queries):
+    """
+    Only the updated fields should be validated, and `updated_at` should be set.
+    """
+    organizations = factories.OrganizationFactory.create_batch(
+        3, with_registration_id=True
+    )
+    updated_at = {
+        organization.pk: organization.updated_at for organization in organizations
+    }
+    for organization in organizations:
+        organization.name = f"{organization.name} updated"
+
+    # No unique field updated, only the bulk update
+    with django_assert_num_queries(1):
+        models.Organization.bulk_update_validated(organizations, ["name"])
+
+    for organization in models.Organization.objects.filter(
+        pk__in=[organization.pk for organization in organizations]
+    ):
+        assert organization.name.endswith(" updated")
+        assert organization.updated_at > updated_at[organization.pk]
+
+
+def test_models_bulk_update_validated_organization_lists_unique():
+    """Registration IDs should be unique across organizations, with one query."""
+    existing = factories.OrganizationFactory(registration_id_list=["12345678901234"])
+    organization_1, organization_2 = factories.OrganizationFactory.create_batch(
+        2, with_registration_id=True
+    )
+    organization_1.registration_id_list = ["12345678901234"]
+    organization_2.registration_id_list = ["98765432109876"]
+
+    updated = models.Organization.bulk_update_validated(
+        [organization_1, organization_2],
+        ["registration_id_list"],
+        skip_invalid=True,
+    )
+
+    assert updated == [organization_2]
+    organization_1.refresh_from_db()
+    assert organization_1.registration_id_list != existing.registration_id_list
+    organization_2.refresh_from_db()
+    assert organization_2.registration_id_list == ["98765432109876"]
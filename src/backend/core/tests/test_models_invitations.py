@@ -156,7 +156,7 @@ def test_models_invitation__new_user__filter_expired_invitations():
     ).exists()
 
 
-@pytest.mark.parametrize("num_invitations, num_queries", [(0, 5), (1, 8), (20, 8)])
+@pytest.mark.parametrize("num_invitations, num_queries", [(0, 6), (1, 9), (20, 9)])
 def test_models_invitation__new_user__user_creation_constant_num_queries(
     django_assert_num_queries, num_invitations, num_queries
 ):
@@ -172,8 +172,8 @@ def test_models_invitation__new_user__user_creation_constant_num_queries(
 
     factories.UserFactory()
 
-    # with no invitation, we skip an "if", resulting in 8 requests
-    # otherwise, we should have 11 queries with any number of invitations
+    # invitations are deleted with one query in a savepoint, then accesses and
+    # tombstones are inserted and teams having webhooks are looked up
     with django_assert_num_queries(num_queries):
         models.User.objects.create(
             email=user_email,
@@ -183,6 +183,41 @@ def test_models_invitation__new_user__user_creation_constant_num_queries(
         )
 
 
+def test_models_invitation__new_user__log_tombstones():
+    """Converted invitations should be logged in the changes feed tombstones."""
+    invitation = factories.InvitationFactory()
+
+    factories.UserFactory(email=invitation.email)
+
+    tombstone = models.Tombstone.objects.get()
+    assert tombstone.object_type == "invitation"
+    assert tombstone.object_id == invitation.pk
+    assert tombstone.team_id == invitation.team_id
+
+
+def test_models_invitation__new_user__synchronize_webhooks():
+    """
+    The webhooks of the teams the new user joins should be synchronized once
+    per team, and only for teams having webhooks.
+    """
+    webhook = factories.TeamWebhookFactory(status="success")
+    email = fake.email()
+    factories.InvitationFactory(email=email, team=webhook.team)
+    factories.InvitationFactory(email=email)
+
+    with mock.patch(
+        "core.utils.invitations.webhooks_synchronizer"
+    ) as webhooks_synchronizer_mock:
+        user = factories.UserFactory(email=email)
+
+    webhooks_synchronizer_mock.add_users_to_group.assert_called_once_with(
+        webhook.team, [user]
+    )
+    webhook.refresh_from_db()
+    assert webhook.status == "pending"
+    assert models.TeamAccess.objects.filter(user=user).count() == 2
+
+
 # get_abilities
 
 
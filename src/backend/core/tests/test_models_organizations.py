@@ -199,3 +199,25 @@ def test_models_organization_no_metadata_schema(settings):
     org = models.Organization.objects.get(pk=organization.pk)
     assert org.metadata["random_field"] == "anything"
     assert org.metadata["numeric_value"] == 123
+
+
+def test_models_organization_metadata_schema_follows_setting(settings):
+    """The metadata should be validated against the schema currently set."""
+    organization = models.Organization(
+        name="Org",
+        registration_id_list=["12345678901234"],
+        metadata={"is_public_service": 1},
+    )
+
+    settings.ORGANIZATION_METADATA_SCHEMA = None
+    organization.full_clean()
+
+    settings.ORGANIZATION_METADATA_SCHEMA = "fr/organization_metadata.json"
+    assert models.get_organization_metadata_schema()["type"] == "object"
+    with pytest.raises(ValidationError) as excinfo:
+        organization.full_clean()
+    assert "is_public_service" in str(excinfo.value)
+
+    settings.ORGANIZATION_METADATA_SCHEMA = None
+    assert models.get_organization_metadata_schema() is None
+    organization.full_clean()
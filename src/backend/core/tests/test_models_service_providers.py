@@ -0,0 +1,88 @@
+"""
+Unit tests for the ServiceProvider model
+"""
+
+import pytest
+
+from core import factories, models
+
+pytestmark = pytest.mark.django_db
+
+
+def test_models_service_providers_get_id_for_audience_cached(
+    django_assert_num_queries,
+):
+    """Audiences should be resolved from the mapping loaded once."""
+    service_provider, other_service_provider = (
+        factories.ServiceProviderFactory.create_batch(2)
+    )
+
+    with django_assert_num_queries(1):
+        assert (
+            models.ServiceProvider.objects.get_id_for_audience(
+                service_provider.audience_id
+            )
+            == service_provider.pk
+        )
+    with django_assert_num_queries(0):
+        assert (
+            models.ServiceProvider.objects.get_id_for_audience(
+                other_service_provider.audience_id
+            )
+            == other_service_provider.pk
+        )
+
+
+def test_models_service_providers_get_id_for_audience_shared_cache(
+    django_assert_num_queries, settings
+):
+    """Processes should share the mapping loaded by one of them."""
+    settings.SERVICE_PROVIDERS_LOCAL_CACHE_TIMEOUT = 0
+    service_provider = factories.ServiceProviderFactory()
+    models.ServiceProvider.objects.get_audiences()
+
+    with django_assert_num_queries(0):
+        assert (
+            models.ServiceProvider.objects.get_id_for_audience(
+                service_provider.audience_id
+            )
+            == service_provider.pk
+        )
+
+
+def test_models_service_providers_get_id_for_audience_unknown():
+    """Unknown audiences should be resolved to None, unless created on the fly."""
+    assert models.ServiceProvider.objects.get_id_for_audience("unknown") is None
+    assert not models.ServiceProvider.objects.exists()
+
+    service_provider_id = models.ServiceProvider.objects.get_id_for_audience(
+        "unknown", create=True
+    )
+
+    service_provider = models.ServiceProvider.objects.get()
+    assert service_provider.pk == service_provider_id
+    assert service_provider.audience_id == "unknown"
+    assert models.ServiceProvider.objects.get_audiences() == {
+        "unknown": service_provider_id
+    }
+
+
+def test_models_service_providers_get_id_for_audience_cache_cleared():
+    """The mapping should be loaded again when a service provider changes."""
+    service_provider = factories.ServiceProviderFactory()
+    assert models.ServiceProvider.objects.get_audiences() == {
+        service_provider.audience_id: service_provider.pk
+    }
+
+    new_service_provider = factories.ServiceProviderFactory()
+    service_provider.audience_id = "renamed"
+    service_provider.save()
+    assert models.ServiceProvider.objects.get_audiences() == {
+        "renamed": service_provider.pk,
+        new_service_provider.audience_id: new_service_provider.pk,
+    }
+
+    service_provider.delete()
+    assert models.ServiceProvider.objects.get_audiences() == {
+        new_service_provider.audience_id: new_service_provider.pk,
+    }
@@ -4,6 +4,8 @@ Unit tests for the Team model
 
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 import pytest
 
@@ -190,6 +192,49 @@ def test_models_teams_delete_team():
     assert models.Team.objects.all().count() == 0
 
 
+def test_models_teams_delete_team_tombstones():
+    """
+    Deleting teams should log the tombstones of the teams, their accesses and
+    their invitations, with one insert per team.
+    """
+    root_team = models.Team.add_root(name="Root Team")
+    child_team = root_team.add_child(name="Child Team")
+    accesses = factories.TeamAccessFactory.create_batch(3, team=root_team)
+    child_access = factories.TeamAccessFactory(team=child_team)
+    invitations = factories.InvitationFactory.create_batch(2, team=root_team)
+    other_access = factories.TeamAccessFactory()
+    root_team_id, child_team_id = root_team.pk, child_team.pk
+
+    with CaptureQueriesContext(connection) as queries:
+        root_team.delete()
+
+    assert {
+        (tombstone.object_type, tombstone.object_id, tombstone.team_id)
+        for tombstone in models.Tombstone.objects.all()
+    } == {
+        ("team", root_team_id, root_team_id),
+        ("team", child_team_id, child_team_id),
+        ("team_access", child_access.pk, child_team_id),
+        *(("team_access", access.pk, root_team_id) for access in accesses),
+        *(("invitation", invitation.pk, root_team_id) for invitation in invitations),
+    }
+    assert (
+        len(
+            [
+                query
+                for query in queries
+                if query["sql"].startswith('INSERT INTO "people_tombstone"')
+            ]
+        )
+        == 2
+    )
+
+    # Accesses deleted on their own are still logged
+    other_access_id = other_access.pk
+    other_access.delete()
+    assert models.Tombstone.objects.filter(object_id=other_access_id).exists()
+
+
 def test_models_teams_manager_create():
     """Create a team using the manager."""
     team = models.Team.objects.create(name="Team")
@@ -217,3 +262,105 @@ def test_models_teams_tree_alphabet():
     )
 
     assert models.Team.objects.count() == len(models.Team.alphabet) * 2
+
+
+def test_models_teams_manager_create_child_num_queries(django_assert_num_queries):
+    """
+    Creating a child team should lock the parent and compute the new path in
+    one query, whatever the number of existing children.
+    """
+    team = models.Team.objects.create(name="Team")
+    for i in range(3):
+        models.Team.objects.create(name=f"Child {i}", parent_id=team.pk)
+
+    # savepoint, parent lock with its last child path, insert, parent numchild
+    # update, release savepoint
+    with django_assert_num_queries(5):
+        child_team = models.Team.objects.create(name="Last child", parent_id=team.pk)
+
+    team.refresh_from_db()
+    assert team.numchild == 4
+    assert child_team.get_parent(update=True) == team
+    assert [child.name for child in team.get_children().order_by("path")] == [
+        "Child 0",
+        "Child 1",
+        "Child 2",
+        "Last child",
+    ]
+
+
+def test_models_teams_manager_create_subtrees():
+    """Whole subtrees should be created under a parent, after its existing children."""
+    service_provider = factories.ServiceProviderFactory()
+    root_team = models.Team.add_root(name="Root")
+    existing_child = root_team.add_child(name="Existing child")
+
+    teams = models.Team.objects.create_subtrees(
+        [
+            {
+                "name": "A",
+                "service_providers": [service_provider],
+                "children": [
+                    {"name": "A1", "children": [{"name": "A1a"}]},
+                    {"name": "A2", "service_providers": [service_provider.pk]},
+                ],
+            },
+            {"name": "B"},
+        ],
+        parent_id=root_team.pk,
+    )
+
+    assert [team.name for team in teams] == ["A", "A1", "A1a", "A2", "B"]
+    assert models.Team.find_problems() == ([], [], [], [], [])
+
+    root_team.refresh_from_db()
+    assert root_team.numchild == 3
+    assert list(root_team.get_children().order_by("path")) == [
+        existing_child,
+        teams[0],
+        teams[4],
+    ]
+
+    team_a = models.Team.objects.get(name="A")
+    assert team_a.depth == 2
+    assert team_a.numchild == 2
+    assert [child.name for child in team_a.get_children().order_by("path")] == [
+        "A1",
+        "A2",
+    ]
+    assert [team.name for team in team_a.get_descendants().order_by("path")] == [
+        "A1",
+        "A1a",
+        "A2",
+    ]
+    assert list(
+        service_provider.teams.order_by("name").values_list("name", flat=True)
+    ) == ["A", "A2"]
+
+
+def test_models_teams_manager_create_subtrees_roots():
+    """Subtrees should be created as root teams when no parent is given."""
+    existing_root = models.Team.add_root(name="Existing root")
+
+    teams = models.Team.objects.create_subtrees(
+        [{"name": "Root", "children": [{"name": "Child"}]}]
+    )
+
+    assert models.Team.find_problems() == ([], [], [], [], [])
+    assert list(models.Team.get_root_nodes()) == [existing_root, teams[0]]
+    assert teams[1].get_parent(update=True) == teams[0]
+
+
+def test_models_teams_manager_create_subtrees_invalid():
+    """Invalid teams should be rejected before anything is created."""
+    root_team = models.Team.add_root(name="Root")
+
+    with pytest.raises(ValidationError):
+        models.Team.objects.create_subtrees(
+            [{"name": "Valid", "children": [{"name": "a" * 101}]}],
+            parent_id=root_team.pk,
+        )
+
+    root_team.refresh_from_db()
+    assert root_team.numchild == 0
+    assert models.Team.objects.count() == 1
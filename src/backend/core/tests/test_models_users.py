@@ -10,6 +10,8 @@ import pytest
 
 from core import factories, models
 
+from mailbox_manager.factories import MailDomainAccessFactory
+
 pytestmark = pytest.mark.django_db
 
 
@@ -193,3 +195,58 @@ def test_models_users_send_mail_main_missing():
         user.email_user("my subject", "my message")
 
     assert str(excinfo.value) == "You must first set an email for the user."
+
+
+def test_models_users_get_abilities_cached(django_assert_num_queries):
+    """The abilities granted by the user accesses should be computed only once."""
+    user = factories.UserFactory()
+    factories.TeamAccessFactory(user=user, role=models.RoleChoices.OWNER)
+
+    with django_assert_num_queries(1):
+        abilities = user.get_abilities()
+    with django_assert_num_queries(0):
+        assert models.User.objects.get(pk=user.pk).get_abilities() == abilities
+
+
+def test_models_users_get_abilities_cache_disabled(settings, django_assert_num_queries):
+    """The abilities should be computed each time when the cache is disabled."""
+    settings.USER_ABILITIES_CACHE_TIMEOUT = 0
+    user = factories.UserFactory()
+
+    for _ in range(2):
+        with django_assert_num_queries(1):
+            user.get_abilities()
+
+
+def test_models_users_get_abilities_cache_invalidated_on_accesses_changes(settings):
+    """The cached abilities should be computed again when the user accesses change."""
+    settings.FEATURES = settings.FEATURES | {"TEAMS_DISPLAY": False}
+    user = factories.UserFactory()
+    assert user.get_abilities()["teams"]["can_view"] is False
+    assert user.get_abilities()["mailboxes"]["can_view"] is False
+
+    team_access = factories.TeamAccessFactory(user=user, role=models.RoleChoices.MEMBER)
+    assert user.get_abilities()["teams"]["can_view"] is False
+
+    team_access.role = models.RoleChoices.ADMIN
+    team_access.save()
+    assert user.get_abilities()["teams"]["can_view"] is True
+
+    team_access.team.delete()
+    assert user.get_abilities()["teams"]["can_view"] is False
+
+    domain_access = MailDomainAccessFactory(user=user)
+    assert user.get_abilities()["mailboxes"]["can_view"] is True
+
+    domain_access.delete()
+    assert user.get_abilities()["mailboxes"]["can_view"] is False
+
+
+def test_models_users_get_abilities_cache_features_not_cached(settings):
+    """Features enabled in the settings should not be cached with the abilities."""
+    settings.FEATURES = settings.FEATURES | {"TEAMS_DISPLAY": False}
+    user = factories.UserFactory()
+    assert user.get_abilities()["teams"]["can_view"] is False
+
+    settings.FEATURES = settings.FEATURES | {"TEAMS_DISPLAY": True}
+    assert user.get_abilities()["teams"]["can_view"] is True
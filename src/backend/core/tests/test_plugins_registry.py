@@ -0,0 +1,248 @@
+"""
+Unit tests for the plugins hooks registry
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+
+import pytest
+
+from core import factories, models
+from core.plugins.registry import (
+    HOOK_MODE_ASYNC,
+    get_callback_name,
+    registry,
+    serialize_hook_argument,
+)
+from core.tasks import execute_hook_callback_task
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="hooks_registry")
+def hooks_registry_fixture():
+    """Run the test with an empty registry, and restore the hooks after the test."""
+    _original_hooks = registry._hooks  # pylint: disable=protected-access
+    _original_options = registry._options  # pylint: disable=protected-access
+    registry.reset()
+
+    yield registry
+
+    registry._hooks = _original_hooks  # pylint: disable=protected-access
+    registry._options = _original_options  # pylint: disable=protected-access
+
+
+def rename_organization(organization, suffix=""):
+    """Hook callback used in the tests."""
+    organization.name = f"Renamed{suffix}"
+    organization.save(update_fields=["name"])
+    return organization.name
+
+
+def test_plugins_registry_sync_hook(hooks_registry):
+    """Sync hooks should be run when the hook is executed."""
+    hooks_registry.register_hook("organization_created", rename_organization)
+
+    organization = models.Organization.objects.create(name="Test")
+
+    organization.refresh_from_db()
+    assert organization.name == "Renamed"
+
+
+def test_plugins_registry_invalid_mode(hooks_registry):
+    """Hooks should only be registered with a known mode."""
+    with pytest.raises(ValueError, match="Invalid hook mode: later"):
+        hooks_registry.register_hook(
+            "organization_created", rename_organization, mode="later"
+        )
+
+
+def test_plugins_registry_async_hook(
+    hooks_registry, django_capture_on_commit_callbacks
+):
+    """
+    Async hooks should be queued once the transaction is committed, and run by
+    a Celery task with the objects loaded back.
+    """
+    hooks_registry.register_hook(
+        "organization_created", rename_organization, mode=HOOK_MODE_ASYNC
+    )
+
+    with (
+        mock.patch.object(execute_hook_callback_task, "apply_async") as apply_async,
+        django_capture_on_commit_callbacks(execute=True) as callbacks,
+    ):
+        organization = factories.OrganizationFactory(name="Test")
+        assert not apply_async.called
+
+    assert len(callbacks) == 1
+    organization.refresh_from_db()
+    assert organization.name == "Test"
+
+    apply_async.assert_called_once()
+    result = execute_hook_callback_task.apply(**apply_async.call_args.kwargs)
+
+    assert result.get() == "Renamed"
+    organization.refresh_from_db()
+    assert organization.name == "Renamed"
+
+
+def test_plugins_registry_async_hook_deduplicated(
+    hooks_registry, django_capture_on_commit_callbacks
+):
+    """The same async hook should not be queued twice for the same arguments."""
+    hooks_registry.register_hook(
+        "organization_created", rename_organization, mode=HOOK_MODE_ASYNC
+    )
+    organization = factories.OrganizationFactory(name="Test")
+    cache.clear()
+
+    with (
+        mock.patch.object(execute_hook_callback_task, "apply_async") as apply_async,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        results = hooks_registry.execute_hook("organization_created", organization)
+        hooks_registry.execute_hook("organization_created", organization)
+        hooks_registry.execute_hook("organization_created", organization, suffix="!")
+
+    assert apply_async.call_count == 2
+    assert apply_async.call_args_list[0].kwargs["task_id"] == results[0]
+
+    # While queued, the same call is not scheduled again
+    assert hooks_registry.execute_hook("organization_created", organization) == [None]
+
+    # Once done, the hook can be queued again
+    execute_hook_callback_task.apply(**apply_async.call_args_list[0].kwargs)
+    assert hooks_registry.execute_hook("organization_created", organization) != [None]
+
+
+def test_plugins_registry_async_hook_rolled_back(
+    hooks_registry, django_capture_on_commit_callbacks
+):
+    """A rolled back async hook should neither be queued nor block the next one."""
+    hooks_registry.register_hook(
+        "organization_created", rename_organization, mode=HOOK_MODE_ASYNC
+    )
+    organization = factories.OrganizationFactory(name="Test")
+    cache.clear()
+
+    with (
+        mock.patch.object(execute_hook_callback_task, "apply_async") as apply_async,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            hooks_registry.execute_hook("organization_created", organization)
+            raise RuntimeError("rollback")
+
+        results = hooks_registry.execute_hook("organization_created", organization)
+
+    assert results != [None]
+    apply_async.assert_called_once()
+    assert apply_async.call_args.kwargs["task_id"] == results[0]
+
+
+def test_plugins_registry_async_hook_retried(hooks_registry):
+    """Failing async hooks should be retried, then fail and release their lock."""
+    calls = []
+
+    def failing_callback(organization):
+        calls.append(organization)
+        raise RuntimeError("API down")
+
+    hooks_registry.register_hook(
+        "organization_created", failing_callback, mode=HOOK_MODE_ASYNC, max_retries=2
+    )
+    organization = factories.OrganizationFactory()
+    cache.set("plugin-hook:test", True)
+
+    execute_hook_callback_task.apply(
+        args=[
+            "organization_created",
+            get_callback_name(failing_callback),
+            {"args": [serialize_hook_argument(organization)], "kwargs": {}},
+            "plugin-hook:test",
+        ]
+    )
+
+    assert calls == [organization] * 3
+    assert cache.get("plugin-hook:test") is None
+
+
+def test_plugins_registry_async_hook_deleted_objects(hooks_registry):
+    """Async hooks should not be run when their objects were deleted meanwhile."""
+    calls = []
+
+    def callback(organization):
+        calls.append(organization)
+
+    hooks_registry.register_hook("organization_created", callback, mode=HOOK_MODE_ASYNC)
+    organization = factories.OrganizationFactory()
+    arguments = {"args": [serialize_hook_argument(organization)], "kwargs": {}}
+    organization.delete()
+
+    execute_hook_callback_task.apply(
+        args=[
+            "organization_created",
+            get_callback_name(callback),
+            arguments,
+            "plugin-hook:test",
+        ]
+    )
+
+    assert calls == []
+
+
+def test_plugins_registry_execute_hook_batch(
+    hooks_registry, django_capture_on_commit_callbacks
+):
+    """
+    Batch callbacks should be given all the objects at once, by chunks when async,
+    and other callbacks each object.
+    """
+    organizations = factories.OrganizationFactory.create_batch(3)
+    calls = []
+
+    def callback(organization):
+        calls.append(organization)
+
+    def batch_callback(organizations):
+        calls.append(organizations)
+        return len(organizations)
+
+    hooks_registry.register_hook("organization_created", callback)
+    hooks_registry.register_hook(
+        "organization_created", lambda organization: None, batch_callback=batch_callback
+    )
+    hooks_registry.register_hook(
+        "organization_created",
+        rename_organization,
+        mode=HOOK_MODE_ASYNC,
+        batch_callback=batch_callback,
+    )
+
+    with (
+        mock.patch("core.plugins.registry.ASYNC_HOOK_BATCH_SIZE", 2),
+        mock.patch.object(execute_hook_callback_task, "apply_async") as apply_async,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        results = hooks_registry.execute_hook_batch(
+            "organization_created", models.Organization.objects.order_by("pk")
+        )
+
+    organizations.sort(key=lambda organization: organization.pk)
+    assert calls == [*organizations, organizations]
+    assert results[:4] == [None, None, None, 3]
+    assert apply_async.call_count == 2
+
+    # The async batch callback is run on the chunks by the Celery task
+    calls.clear()
+    for call in apply_async.call_args_list:
+        assert execute_hook_callback_task.apply(**call.kwargs).get() == len(
+            call.kwargs["args"][2]["args"][0]["pks"]
+        )
+    assert [sorted(organization.pk for organization in call) for call in calls] == [
+        [organization.pk for organization in organizations[:2]],
+        [organizations[2].pk],
+    ]
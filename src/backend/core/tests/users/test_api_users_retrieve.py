@@ -5,6 +5,7 @@ Test users API endpoints in the People core app: focus on "retrieve" action
 import pytest
 from rest_framework.status import (
     HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
     HTTP_401_UNAUTHORIZED,
     HTTP_405_METHOD_NOT_ALLOWED,
 )
@@ -181,3 +182,42 @@ def test_api_users_retrieve_authenticated_other():
     )
     assert response.status_code == HTTP_405_METHOD_NOT_ALLOWED
     assert response.json() == {"detail": 'Method "GET" not allowed.'}
+
+
+def test_api_users_retrieve_me_conditional(django_assert_num_queries):
+    """
+    The current user should not be computed nor sent again when unchanged, and
+    should be when their accesses change.
+    """
+    user = factories.UserFactory(with_organization=True)
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.get("/api/v1.0/users/me/")
+    assert response.status_code == HTTP_200_OK
+    etag = response["ETag"]
+    assert response["Last-Modified"]
+
+    # user, watermarks
+    with django_assert_num_queries(2):
+        response = client.get("/api/v1.0/users/me/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+
+    TeamAccessFactory(user=user, role=models.RoleChoices.OWNER)
+    response = client.get("/api/v1.0/users/me/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_200_OK
+    assert response["ETag"] != etag
+    etag = response["ETag"]
+
+    MailDomainAccessFactory(user=user)
+    response = client.get("/api/v1.0/users/me/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["abilities"]["mailboxes"]["can_view"] is True
+
+    # Other users have other ETags
+    other_user = factories.UserFactory(with_organization=True)
+    client.force_login(other_user)
+    response = client.get("/api/v1.0/users/me/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["id"] == str(other_user.pk)
@@ -0,0 +1,46 @@
+"""Tests for the purge of expired invitations."""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+import pytest
+from freezegun import freeze_time
+
+from core import factories, models
+from core.tasks import purge_expired_invitations_task
+from core.utils.invitations import purge_expired_invitations
+
+pytestmark = pytest.mark.django_db
+
+
+def test_utils_purge_expired_invitations(settings):
+    """Only expired invitations should be deleted, with a tombstone for teams."""
+    with freeze_time(
+        timezone.now() - timedelta(seconds=settings.INVITATION_VALIDITY_DURATION + 1)
+    ):
+        expired_invitations = factories.InvitationFactory.create_batch(3)
+    valid_invitation = factories.InvitationFactory()
+
+    results = purge_expired_invitations(batch_size=2)
+
+    assert results["core.Invitation"] == 3
+    assert list(models.Invitation.objects.all()) == [valid_invitation]
+    assert sorted(
+        models.Tombstone.objects.values_list("object_id", "team_id", "object_type")
+    ) == sorted(
+        (invitation.pk, invitation.team_id, "invitation")
+        for invitation in expired_invitations
+    )
+
+
+def test_utils_purge_expired_invitations_refreshed(settings):
+    """Invitations refreshed since their creation should be kept."""
+    with freeze_time(
+        timezone.now() - timedelta(seconds=settings.INVITATION_VALIDITY_DURATION + 1)
+    ):
+        invitation = factories.InvitationFactory()
+    models.Invitation.objects.filter(pk=invitation.pk).update(updated_at=timezone.now())
+
+    assert purge_expired_invitations_task()["core.Invitation"] == 0
+    assert models.Invitation.objects.filter(pk=invitation.pk).exists()
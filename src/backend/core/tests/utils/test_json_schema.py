@@ -1,8 +1,19 @@
-"""Tests for the JSON schema `generate_default_from_schema` utility functions."""
+"""Tests for the JSON schema utility functions."""
 
+import json
+from unittest import mock
+
+import jsonschema
 import pytest
 
-from core.utils.json_schema import generate_default_from_schema
+from core.utils.json_schema import (
+    compile_schema_validator,
+    format_validation_error,
+    generate_default_from_schema,
+    get_schema_validator,
+    get_validation_error,
+    iter_validation_errors,
+)
 
 
 @pytest.mark.parametrize(
@@ -160,3 +171,74 @@ def test_complex_nested_arrays():
 
     result = generate_default_from_schema(schema)
     assert result == expected
+
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "properties": {
+        "siret": {"type": "string", "pattern": "^[0-9]{14}$"},
+        "is_commune": {"type": "boolean"},
+    },
+}
+
+
+def test_json_schema_compile_schema_validator():
+    """The validator class should follow the `$schema` of the schema, once checked."""
+    validator = compile_schema_validator(SCHEMA)
+    assert isinstance(validator, jsonschema.Draft7Validator)
+
+    with pytest.raises(jsonschema.SchemaError):
+        compile_schema_validator({"type": "unknown"})
+
+
+def test_json_schema_get_validation_error_same_as_validate():
+    """The error returned should be the one `jsonschema.validate` raises."""
+    validator = compile_schema_validator(SCHEMA)
+    instance = {"siret": "123", "is_commune": "yes"}
+
+    with pytest.raises(jsonschema.ValidationError) as excinfo:
+        jsonschema.validate(instance, SCHEMA)
+
+    error = get_validation_error(validator, instance)
+    assert error.message == excinfo.value.message
+    assert list(error.path) == list(excinfo.value.path)
+    assert get_validation_error(validator, {"siret": "12345678901234"}) is None
+
+
+def test_json_schema_iter_validation_errors():
+    """Only the invalid instances should be reported, with their index."""
+    validator = compile_schema_validator(SCHEMA)
+    instances = [
+        {"siret": "12345678901234"},
+        {"is_commune": 1},
+        {},
+        {"siret": "abc"},
+    ]
+
+    errors = [
+        (index, format_validation_error(error))
+        for index, error in iter_validation_errors(validator, instances)
+    ]
+
+    assert errors == [
+        (1, "Validation error in 'is_commune': 1 is not of type 'boolean'"),
+        (3, "Validation error in 'siret': 'abc' does not match '^[0-9]{14}$'"),
+    ]
+
+
+def test_json_schema_get_schema_validator_compiled_once(tmp_path):
+    """A schema file should be loaded and checked once per path."""
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(SCHEMA), encoding="utf-8")
+    get_schema_validator.cache_clear()
+
+    with mock.patch.object(
+        jsonschema.Draft7Validator,
+        "check_schema",
+        wraps=jsonschema.Draft7Validator.check_schema,
+    ) as check_schema_mock:
+        validators = {get_schema_validator(str(schema_path)) for _ in range(3)}
+
+    assert len(validators) == 1
+    assert check_schema_mock.call_count == 1
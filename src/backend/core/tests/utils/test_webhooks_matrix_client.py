@@ -197,6 +197,44 @@ def test_matrix_webhook__invite_user_to_room_success(caplog):
     assert webhook.status == "success"
 
 
+@responses.activate
+def test_matrix_webhook__invite_users_to_room_success():
+    """Users added in bulk should all get invited, with the room joined once."""
+    users = factories.UserFactory.create_batch(2)
+    webhook = factories.TeamWebhookFactory(
+        protocol=WebhookProtocolChoices.MATRIX,
+        url="https://www.matrix.org/#/room/room_id:home_server",
+        secret="secret-access-token",
+    )
+
+    # Mock successful responses
+    join = responses.post(
+        re.compile(r".*/join"),
+        body=str(matrix.mock_join_room_successful("room_id")["message"]),
+        status=matrix.mock_join_room_successful("room_id")["status_code"],
+    )
+    responses.post(
+        re.compile(r".*/search"),
+        body=json.dumps(matrix.mock_search_empty()["message"]),
+        status=status.HTTP_200_OK,
+    )
+    invite = responses.post(
+        re.compile(r".*/invite"),
+        body=str(matrix.mock_invite_successful()["message"]),
+        status=matrix.mock_invite_successful()["status_code"],
+    )
+    webhooks_synchronizer.add_users_to_group(webhook.team, users)
+
+    assert join.call_count == 1
+    assert [json.loads(call.request.body)["user_id"] for call in invite.calls] == [
+        f"@{user.email.replace('@', '-')}:home_server" for user in users
+    ]
+
+    # Status
+    webhook.refresh_from_db()
+    assert webhook.status == "success"
+
+
 @responses.activate
 @override_settings(MATRIX_BOT_ACCESS_TOKEN="TCHAP_TOKEN")
 def test_matrix_webhook__override_secret_for_tchap():
@@ -0,0 +1,253 @@
+"""
+Conversion of the invitations of a new user to accesses, and purge of the
+expired invitations.
+
+Team invitations are registered by core. Other apps register their own
+invitation models with `register_invitation_model` (e.g. the mail domain
+invitations of mailbox_manager), so this module does not depend on them.
+
+The valid invitations sent to the email of a new user are deleted from all the
+invitation tables with one `DELETE … RETURNING` statement, through their
+`(UPPER(email), created_at)` indexes, and converted to accesses in the same
+transaction. The webhooks of the teams are then synchronized once per team.
+
+Expired invitations are deleted by batches by a periodic task, so the
+invitation tables only hold live invitations.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import models
+from core.enums import ChangeObjectTypeChoices, WebhookStatusChoices
+from core.utils.webhooks import webhooks_synchronizer
+
+logger = logging.getLogger(__name__)
+
+# Registered invitation models, by label
+_invitation_models = {}
+
+
+def register_invitation_model(model, target_column, create_accesses, on_purge=None):
+    """
+    Register an invitation model, so its valid invitations are converted to
+    accesses for new users and its expired invitations are purged.
+
+    Args:
+        model: The invitation model, with `email`, `role`, `created_at` and
+            `updated_at` fields.
+        target_column: The column of the UUID of the object the invitations give
+            access to, e.g. `team_id`.
+        create_accesses: A function creating the accesses of a new user from
+            their deleted invitations, as (invitation id, target id, role)
+            tuples, in the deletion transaction. It returns the accesses.
+        on_purge: An optional function called with each batch of deleted expired
+            invitations, as (invitation id, target id) tuples, in the deletion
+            transaction, as the deletion bypasses the signals.
+    """
+    _invitation_models[model._meta.label] = {  # noqa: SLF001
+        "model": model,
+        "target_column": target_column,
+        "create_accesses": create_accesses,
+        "on_purge": on_purge,
+    }
+
+
+def _get_delete_valid_invitations_query(labels):
+    """
+    Return the statement deleting the valid invitations sent to an email from
+    the tables of the given invitation models, returning (model index,
+    invitation id, target id, role) rows. Deleting the rows bypasses the
+    `post_delete` signals of invitations.
+    """
+    deletions = []
+    selections = []
+    for index, label in enumerate(labels):
+        options = _invitation_models[label]
+        deletions.append(
+            f"""invitations_{index:d} AS (
+                DELETE FROM {options["model"]._meta.db_table}
+                WHERE UPPER(email) = UPPER(%(email)s)
+                AND created_at >= %(valid_since)s
+                RETURNING id, {options["target_column"]}, role
+            )"""  # noqa: S608, SLF001
+        )
+        selections.append(
+            f"SELECT {index:d}, id, {options['target_column']}, role "  # noqa: S608
+            f"FROM invitations_{index:d}"
+        )
+    return f"WITH {', '.join(deletions)} {' UNION ALL '.join(selections)}"
+
+
+def _delete_valid_invitations(labels, email):
+    """
+    Delete the valid invitations sent to an email, and return them as
+    (model index, invitation id, target id, role) tuples.
+    """
+    valid_since = timezone.now() - timedelta(
+        seconds=settings.INVITATION_VALIDITY_DURATION
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _get_delete_valid_invitations_query(labels),
+            {"email": email, "valid_since": valid_since},
+        )
+        return cursor.fetchall()
+
+
+def synchronize_new_team_accesses(user, team_ids):
+    """
+    Synchronize the new accesses of a user to the webhooks of their teams,
+    with one query to find the teams having webhooks.
+    """
+    teams = list(
+        models.Team.objects.filter(pk__in=team_ids, webhooks__isnull=False)
+        .distinct()
+        .prefetch_related("webhooks")
+    )
+    if not teams:
+        return
+
+    models.TeamWebhook.objects.filter(team__in=teams).update(
+        status=WebhookStatusChoices.PENDING
+    )
+    for team in teams:
+        webhooks_synchronizer.add_users_to_group(team, [user])
+
+
+def _log_invitation_tombstones(invitations):
+    """
+    Keep the tombstones of the changes feed for deleted team invitations, given
+    as (invitation id, team id) tuples, as their deletion bypassed the signals.
+    """
+    models.Tombstone.objects.bulk_create(
+        [
+            models.Tombstone(
+                object_type=ChangeObjectTypeChoices.INVITATION,
+                object_id=invitation_id,
+                team_id=team_id,
+            )
+            for invitation_id, team_id in invitations
+        ]
+    )
+
+
+def create_team_accesses(user, invitations):
+    """Convert the deleted team invitations of a new user into team accesses."""
+    team_accesses = models.TeamAccess.objects.bulk_create(
+        [
+            models.TeamAccess(user=user, team_id=team_id, role=role)
+            for _invitation_id, team_id, role in invitations
+        ]
+    )
+    _log_invitation_tombstones(
+        (invitation_id, team_id) for invitation_id, team_id, _role in invitations
+    )
+    return team_accesses
+
+
+def convert_valid_invitations(user):
+    """
+    Convert the valid invitations sent to the email of a new user into accesses,
+    in one transaction. Expired invitations are ignored.
+
+    Return the created accesses, as a dictionary of lists by invitation model
+    label.
+    """
+    if not user.email:
+        return {}
+
+    labels = list(_invitation_models)
+    with transaction.atomic():
+        rows = _delete_valid_invitations(labels, user.email)
+        if not rows:
+            return {}
+
+        invitations = {}
+        for index, invitation_id, target_id, role in rows:
+            invitations.setdefault(labels[index], []).append(
+                (invitation_id, target_id, role)
+            )
+        accesses = {
+            label: _invitation_models[label]["create_accesses"](user, label_invitations)
+            for label, label_invitations in invitations.items()
+        }
+
+    models.User.clear_abilities_cache([user.pk])
+    if team_accesses := accesses.get(models.Invitation._meta.label):  # noqa: SLF001
+        synchronize_new_team_accesses(
+            user, [access.team_id for access in team_accesses]
+        )
+
+    return accesses
+
+
+# Invitations are expired once `INVITATION_VALIDITY_DURATION` has elapsed since
+# their last refresh, as in `BaseInvitation.is_expired`
+DELETE_EXPIRED_INVITATIONS_QUERY = """
+    DELETE FROM {table}
+    WHERE id IN (
+        SELECT id FROM {table}
+        WHERE updated_at < %(expired_before)s
+        LIMIT %(batch_size)s
+    )
+    RETURNING {columns}
+"""
+
+
+def _delete_expired_invitations_batch(model, columns, expired_before, batch_size):
+    """Delete a batch of expired invitations and return their given columns."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            DELETE_EXPIRED_INVITATIONS_QUERY.format(
+                table=model._meta.db_table,  # noqa: SLF001
+                columns=", ".join(columns),
+            ),
+            {"expired_before": expired_before, "batch_size": batch_size},
+        )
+        return cursor.fetchall()
+
+
+def purge_expired_invitations(batch_size=1000):
+    """
+    Delete the expired invitations of all the registered models, by batches
+    each in its own transaction.
+
+    Return a dictionary of the number of deleted invitations per model label.
+    """
+    expired_before = timezone.now() - timedelta(
+        seconds=settings.INVITATION_VALIDITY_DURATION
+    )
+    results = {}
+    for label, options in _invitation_models.items():
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                rows = _delete_expired_invitations_batch(
+                    options["model"],
+                    ["id", options["target_column"]],
+                    expired_before,
+                    batch_size,
+                )
+                if options["on_purge"] is not None:
+                    options["on_purge"](rows)
+            deleted += len(rows)
+            if len(rows) < batch_size:
+                break
+
+        results[label] = deleted
+        logger.info("%s expired %s deleted", deleted, label)
+
+    return results
+
+
+register_invitation_model(
+    models.Invitation,
+    "team_id",
+    create_team_accesses,
+    on_purge=_log_invitation_tombstones,
+)
@@ -1,5 +1,52 @@
 """Useful functions for working with JSON schemas"""
 
+import json
+from functools import lru_cache
+
+import jsonschema
+
+
+def compile_schema_validator(schema: dict):
+    """
+    Check a JSON schema and return a validator for it, to be reused for every
+    validation: `jsonschema.validate` checks the schema and builds a new validator
+    on each call. The validator class follows the `$schema` of the schema.
+    """
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+@lru_cache(maxsize=None)
+def get_schema_validator(schema_path: str):
+    """Load a JSON schema file and compile its validator, once per process and path."""
+    with open(schema_path, "r", encoding="utf-8") as schema_file:
+        return compile_schema_validator(json.load(schema_file))
+
+
+def get_validation_error(validator, instance):
+    """
+    Return the most relevant error of an instance, the one `jsonschema.validate`
+    would raise, or None if the instance is valid.
+    """
+    return jsonschema.exceptions.best_match(validator.iter_errors(instance))
+
+
+def iter_validation_errors(validator, instances):
+    """
+    Validate many instances with the same compiled validator, yielding the index
+    and the most relevant error of each invalid instance.
+    """
+    for index, instance in enumerate(instances):
+        if (error := get_validation_error(validator, instance)) is not None:
+            yield index, error
+
+
+def format_validation_error(error) -> str:
+    """Return the message of a validation error with the path where it occurred."""
+    field_path = ".".join(map(str, error.path))
+    return f"Validation error in '{field_path:s}': {error.message}"
+
 
 def generate_default_from_schema(schema: dict) -> dict:
     """
@@ -82,19 +82,8 @@ class MatrixAPIClient:
             timeout=3,
         )
 
-    def add_user_to_group(self, webhook, user):
-        """Send request to invite an user to a room or space upon adding them to group.."""
-        join_response = self.join_room(webhook)
-        if join_response.status_code != HTTP_200_OK:
-            logger.error(
-                "Synchronization failed (cannot join room) %s",
-                webhook.url,
-            )
-            return join_response, False
-        logger.info(
-            "Succesfully joined room",
-        )
-
+    def _invite_user(self, webhook, user):
+        """Send request to invite an user to a room or space the bot has joined."""
         user_id = self.get_user_id(user, webhook)
         response = session.post(
             f"{self._get_room_url(webhook.url)}/invite",
@@ -118,6 +107,41 @@ class MatrixAPIClient:
 
         return response, webhook_succeeded
 
+    def add_user_to_group(self, webhook, user):
+        """Send request to invite an user to a room or space upon adding them to group.."""
+        join_response = self.join_room(webhook)
+        if join_response.status_code != HTTP_200_OK:
+            logger.error(
+                "Synchronization failed (cannot join room) %s",
+                webhook.url,
+            )
+            return join_response, False
+        logger.info(
+            "Succesfully joined room",
+        )
+
+        return self._invite_user(webhook, user)
+
+    def add_users_to_group(self, webhook, users):
+        """
+        Send requests to invite several users to a room or space.
+        Matrix has no bulk invitation, but the room is joined only once.
+        """
+        join_response = self.join_room(webhook)
+        if join_response.status_code != HTTP_200_OK:
+            logger.error(
+                "Synchronization failed (cannot join room) %s",
+                webhook.url,
+            )
+            return join_response, False
+
+        response, webhook_succeeded = join_response, True
+        for user in users:
+            response, user_succeeded = self._invite_user(webhook, user)
+            webhook_succeeded = webhook_succeeded and user_succeeded
+
+        return response, webhook_succeeded
+
     def remove_user_from_group(self, webhook, user):
         """Send request to kick an user from a room or space upon removing them from group."""
         join_response = self.join_room(webhook)
@@ -26,6 +26,10 @@ class SCIMClient:
 
     def add_user_to_group(self, webhook, user):
         """Add a user to a group from its ID or email."""
+        return self.add_users_to_group(webhook, [user])
+
+    def add_users_to_group(self, webhook, users):
+        """Add several users to a group from their ID or email, in one request."""
         payload = {
             "schemas": ["urn:ietf:params:scim:api:messages:2.0:PatchOp"],
             "Operations": [
@@ -34,6 +38,7 @@ class SCIMClient:
                     "path": "members",
                     "value": [
                         {"value": str(user.id), "email": user.email, "type": "User"}
+                        for user in users
                     ],
                 }
             ],
@@ -4,7 +4,40 @@ NB_OBJECTS = {
     "users": 1000,
     "teams": 100,
     "max_users_per_team": 100,
+    "max_team_depth": 1,
     "domains": 10,
     "mailboxes_per_domain": 2,
     "aliases_per_domain": 2,
 }
+
+# Sizes of the demo site, to reproduce production-scale data locally
+SIZE_PROFILES = {
+    "S": NB_OBJECTS,
+    "M": {
+        "users": 100_000,
+        "teams": 10_000,
+        "max_users_per_team": 100,
+        "max_team_depth": 5,
+        "domains": 1_000,
+        "mailboxes_per_domain": 50,
+        "aliases_per_domain": 10,
+    },
+    "L": {
+        "users": 1_000_000,
+        "teams": 100_000,
+        "max_users_per_team": 100,
+        "max_team_depth": 10,
+        "domains": 10_000,
+        "mailboxes_per_domain": 100,
+        "aliases_per_domain": 20,
+    },
+    "XL": {
+        "users": 5_000_000,
+        "teams": 500_000,
+        "max_users_per_team": 100,
+        "max_team_depth": 20,
+        "domains": 20_000,
+        "mailboxes_per_domain": 500,
+        "aliases_per_domain": 50,
+    },
+}
@@ -1,11 +1,14 @@
 # ruff: noqa: S311, S106
 """create_demo management command"""
 
+import hashlib
 import logging
+import multiprocessing
 import random
 import time
 from collections import defaultdict
-from uuid import uuid4
+from contextlib import contextmanager
+from uuid import UUID, uuid4
 
 from django import db
 from django.conf import settings
@@ -15,7 +18,6 @@ from django.utils.text import slugify
 
 from faker import Faker
 from oauth2_provider.models import Application
-from treebeard.mp_tree import MP_Node
 
 from core import models
 
@@ -31,10 +33,207 @@ fake = Faker()
 
 logger = logging.getLogger("people.commands.demo.create_demo")
 
+# Number of objects generated and copied by each task of the workers
+CHUNK_SIZE = 20000
 
-def random_true_with_probability(probability):
-    """return True with the requested probability, False otherwise."""
-    return random.random() < probability
+# Probability for a new team to be a root team when teams are nested
+ROOT_TEAM_PROBABILITY = 0.2
+
+
+def get_demo_uuid(seed, kind, index):
+    """
+    Return the id of the demo object of a kind at an index. It is derived from the
+    seed, so workers can reference objects created by other workers, and the same
+    seed builds the same demo site.
+    """
+    digest = hashlib.blake2b(
+        f"{seed}:{kind}:{index:d}".encode(), digest_size=16
+    ).digest()
+    return UUID(bytes=digest, version=4)
+
+
+def get_random_generators(seed, kind, start):
+    """Return a random generator and a faker seeded for a chunk of objects."""
+    chunk_seed = f"{seed}:{kind}:{start:d}"
+    faker = Faker()
+    faker.seed_instance(chunk_seed)
+    return random.Random(chunk_seed), faker
+
+
+def copy_objects(model, objects):
+    """
+    Create model instances with one Postgres `COPY`, much faster than inserts
+    for large volumes. As for `bulk_create`, `save` is not called and no signal
+    is sent.
+    """
+    fields = model._meta.concrete_fields  # noqa: SLF001
+    connection = db.connection
+    table = connection.ops.quote_name(model._meta.db_table)  # noqa: SLF001
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+
+    with (
+        connection.cursor() as cursor,
+        cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy,
+    ):
+        for obj in objects:
+            copy.write_row(
+                [
+                    field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+                    for field in fields
+                ]
+            )
+
+
+@contextmanager
+def worker_pool(workers):
+    """Provide a pool of worker processes, or None to work in the current process."""
+    if workers <= 1:
+        yield None
+        return
+
+    # Forked workers must not share the database connection of the parent process
+    db.connections.close_all()
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        yield pool
+
+
+def _run_task(task_and_args):
+    """Run a task with its arguments, in a worker of the pool."""
+    task, args = task_and_args
+    return task(*args)
+
+
+def run_tasks(stdout, pool, task, tasks_args):
+    """Run a task for each set of arguments, in the workers of the pool if any."""
+    if pool is None:
+        results = (task(*args) for args in tasks_args)
+    else:
+        results = pool.imap_unordered(_run_task, [(task, args) for args in tasks_args])
+
+    for _result in results:
+        stdout.write(".", ending="")
+
+
+def copy_users(seed, start, stop):
+    """Create the random users from index `start` to `stop`."""
+    rng, faker = get_random_generators(seed, "users", start)
+    languages = [language for language, _name in settings.LANGUAGES]
+    copy_objects(
+        models.User,
+        (
+            models.User(
+                id=get_demo_uuid(seed, "user", i),
+                sub=str(get_demo_uuid(seed, "user", i)),
+                email=f"user{i:d}@example.com" if rng.random() < 0.97 else None,
+                name=faker.name() if rng.random() < 0.97 else None,
+                password="!",
+                is_superuser=False,
+                is_active=True,
+                is_staff=False,
+                language=rng.choice(languages),
+            )
+            for i in range(start, stop)
+        ),
+    )
+
+
+def iter_teams(seed, nb_teams, max_depth):
+    """
+    Yield random teams, nested up to `max_depth`. The materialized paths of the tree
+    are computed here, which is much faster than treebeard's `load_bulk` that adds
+    the nodes one by one.
+    """
+    rng = random.Random(f"{seed}:teams")
+    last_root = models.Team.get_last_root_node()
+    root_step = models.Team._str2int(last_root.path) if last_root else 0  # noqa: SLF001
+
+    # path, depth and number of children of each team
+    nodes = []
+    parents = []
+    for i in range(nb_teams):
+        if not parents or rng.random() < ROOT_TEAM_PROBABILITY:
+            root_step += 1
+            path, depth = models.Team._get_path(None, 1, root_step), 1  # noqa: SLF001
+        else:
+            # Nest new teams under recent ones to build deep trees
+            parent = nodes[rng.choice(parents[-100:])]
+            parent[2] += 1
+            depth = parent[1] + 1
+            path = models.Team._get_path(parent[0], depth, parent[2])  # noqa: SLF001
+
+        nodes.append([path, depth, 0])
+        if depth < max_depth:
+            parents.append(i)
+
+    for i, (path, depth, numchild) in enumerate(nodes):
+        yield models.Team(
+            id=get_demo_uuid(seed, "team", i),
+            external_id=get_demo_uuid(seed, "team-external-id", i),
+            name=f"Team {i:d}",
+            path=path,
+            depth=depth,
+            numchild=numchild,
+        )
+
+
+def copy_team_accesses(seed, nb_objects, start, stop):
+    """Create the random accesses of the teams from index `start` to `stop`."""
+    rng, _faker = get_random_generators(seed, "team-accesses", start)
+    max_users = min(nb_objects["users"], nb_objects["max_users_per_team"])
+    copy_objects(
+        models.TeamAccess,
+        (
+            models.TeamAccess(
+                team_id=get_demo_uuid(seed, "team", i),
+                user_id=get_demo_uuid(seed, "user", user_index),
+                role=rng.choice(models.RoleChoices.values),
+            )
+            for i in range(start, stop)
+            for user_index in rng.sample(
+                range(nb_objects["users"]), rng.randint(1, max_users)
+            )
+        ),
+    )
+
+
+def copy_mailboxes_and_aliases(seed, nb_objects, start, domains):
+    """Create the random mailboxes and aliases of a chunk of (id, name) domains."""
+    rng, faker = get_random_generators(seed, "mailboxes", start)
+    mailboxes = []
+    aliases = []
+    for domain_id, domain_name in domains:
+        # Display names are unique in a domain, whatever their case
+        display_names = set()
+        for i in range(nb_objects["mailboxes_per_domain"]):
+            first_name, last_name = faker.first_name(), faker.last_name()
+            while (first_name.lower(), last_name.lower()) in display_names:
+                first_name, last_name = faker.first_name(), faker.last_name()
+            display_names.add((first_name.lower(), last_name.lower()))
+            local_part = f"{slugify(first_name)}.{slugify(last_name)}{i:d}"
+
+            mailboxes.append(
+                mailbox_models.Mailbox(
+                    first_name=first_name,
+                    last_name=last_name,
+                    local_part=local_part,
+                    domain_id=domain_id,
+                    secondary_email=f"{local_part}@example.fr",
+                    status=rng.choice(MailboxStatusChoices.values),
+                    dn_email=f"{local_part}@{domain_name}",
+                )
+            )
+
+        aliases.extend(
+            mailbox_models.Alias(
+                local_part=faker.word(),
+                destination=faker.email(),
+                domain_id=domain_id,
+            )
+            for _i in range(nb_objects["aliases_per_domain"])
+        )
+
+    copy_objects(mailbox_models.Mailbox, mailboxes)
+    copy_objects(mailbox_models.Alias, aliases)
 
 
 class BulkQueue:
@@ -52,32 +251,10 @@ class BulkQueue:
         if not objects:
             return
 
-        objects_model = objects[0]._meta.model  # noqa: SLF001
-        if issubclass(objects_model, MP_Node):
-            # For treebeard models, we need to create the tree structure
-            # in a specific way. This is not perfect but it works for the
-            # current use case.
-            model_fields = {
-                field
-                for field in objects_model._meta.concrete_fields  # noqa: SLF001
-                if field.name not in {"depth", "numchild", "path"}
-            }
-            bulk_data = [
-                {
-                    "data": {
-                        field.name: field.value_from_object(obj)
-                        for field in model_fields
-                        if field.value_from_object(obj)
-                    }
-                }
-                for obj in objects
-            ]
-            objects_model.load_bulk(bulk_data)
-        else:
-            objects_model.objects.bulk_create(
-                objects,
-                ignore_conflicts=False,
-            )
+        objects[0]._meta.model.objects.bulk_create(  # noqa: SLF001
+            objects,
+            ignore_conflicts=False,
+        )
 
         # In debug mode, Django keeps query cache which creates a memory leak in this case
         db.reset_queries()
@@ -181,28 +358,131 @@ def create_oidc_people_idp_client_user():
     )
 
 
-def create_demo(stdout):  # pylint: disable=too-many-branches too-many-statements too-many-locals # noqa: PLR0912, PLR0915
+def create_random_objects(stdout, nb_objects, seed, pool):
     """
-    Create a database with demo data for developers to work in a realistic environment.
-    The code is engineered to create a huge number of objects fast.
+    Create the random users, teams, domains, mailboxes and aliases of the demo site,
+    with Postgres `COPY`. The largest volumes are generated by chunks, by the workers
+    of the pool if any.
     """
+    with Timeit(stdout, "Creating users"):
+        run_tasks(
+            stdout,
+            pool,
+            copy_users,
+            [
+                (seed, start, min(start + CHUNK_SIZE, nb_objects["users"]))
+                for start in range(0, nb_objects["users"], CHUNK_SIZE)
+            ],
+        )
 
-    queue = BulkQueue(stdout)
+    with Timeit(stdout, "Creating teams"):
+        copy_objects(
+            models.Team,
+            iter_teams(seed, nb_objects["teams"], nb_objects["max_team_depth"]),
+        )
 
-    with Timeit(stdout, "Creating users"):
-        for i in range(defaults.NB_OBJECTS["users"]):
-            queue.push(
-                models.User(
-                    sub=uuid4(),
-                    email=f"user{i:d}@example.com" if random.random() < 0.97 else None,
-                    name=fake.name() if random.random() < 0.97 else None,
-                    password="!",
-                    is_superuser=False,
-                    is_active=True,
-                    is_staff=False,
-                    language=random.choice(settings.LANGUAGES)[0],
+    with Timeit(stdout, "Creating team accesses"):
+        teams_per_task = max(1, CHUNK_SIZE // nb_objects["max_users_per_team"])
+        run_tasks(
+            stdout,
+            pool,
+            copy_team_accesses,
+            [
+                (
+                    seed,
+                    nb_objects,
+                    start,
+                    min(start + teams_per_task, nb_objects["teams"]),
                 )
+                for start in range(0, nb_objects["teams"], teams_per_task)
+            ],
+        )
+
+    with Timeit(stdout, "Creating domains"):
+        domain_names = [
+            (
+                get_demo_uuid(seed, "domain", i),
+                fake.domain_name().replace(".", f"-i{i:d}."),
             )
+            for i in range(nb_objects["domains"])
+        ]
+        copy_objects(
+            mailbox_models.MailDomain,
+            (
+                mailbox_models.MailDomain(
+                    id=domain_id,
+                    name=name,
+                    # slug should be automatic but bulk creation doesn't use save
+                    slug=slugify(name),
+                    status=random.choice(MailDomainStatusChoices.values),
+                    support_email="support@example.com",
+                )
+                for domain_id, name in domain_names
+            ),
+        )
+
+    with Timeit(stdout, "Creating accesses to domains"):
+        copy_objects(
+            mailbox_models.MailDomainAccess,
+            (
+                mailbox_models.MailDomainAccess(
+                    domain_id=domain_id,
+                    user_id=get_demo_uuid(
+                        seed, "user", random.randrange(nb_objects["users"])
+                    ),
+                    role=models.RoleChoices.OWNER,
+                )
+                for domain_id, _name in domain_names
+            ),
+        )
+
+    with Timeit(stdout, "Creating mailboxes and aliases"):
+        domains_per_task = max(
+            1,
+            CHUNK_SIZE
+            // (nb_objects["mailboxes_per_domain"] + nb_objects["aliases_per_domain"]),
+        )
+        run_tasks(
+            stdout,
+            pool,
+            copy_mailboxes_and_aliases,
+            [
+                (
+                    seed,
+                    nb_objects,
+                    start,
+                    domain_names[start : start + domains_per_task],
+                )
+                for start in range(0, len(domain_names), domains_per_task)
+            ],
+        )
+
+
+def create_demo(stdout, nb_objects=None, seed=None, workers=1):  # pylint: disable=too-many-branches too-many-statements too-many-locals
+    """
+    Create a database with demo data for developers to work in a realistic environment.
+    The code is engineered to create a huge number of objects fast.
+
+    The number of objects defaults to `defaults.NB_OBJECTS`. The same seed builds
+    the same random objects, whatever the number of workers.
+    """
+    nb_objects = nb_objects or defaults.NB_OBJECTS
+    if nb_objects["teams"] < 1:
+        # The E2E users are given accesses to the first team
+        raise ValueError("The demo site needs at least one team.")
+    if seed is None:
+        seed = random.randrange(2**32)
+    stdout.write(f"Creating the demo site with seed {seed:d}")
+    random.seed(seed)
+    fake.seed_instance(seed)
+
+    with worker_pool(workers) as pool:
+        create_random_objects(stdout, nb_objects, seed, pool)
+
+    queue = BulkQueue(stdout)
+    first_team_id = get_demo_uuid(seed, "team", 0)
+    domains = mailbox_models.MailDomain.objects.all()
+    with Timeit(stdout, "Creating specific users"):
         # this is a quick fix to fix e2e tests
         # tests needs some no random data
         organization, _created = models.Organization.objects.get_or_create(
@@ -248,94 +528,6 @@ def create_demo(stdout):  # pylint: disable=too-many-branches too-many-statement
             )
         )
 
-        queue.flush()
-
-    with Timeit(stdout, "Creating teams"):
-        for i in range(defaults.NB_OBJECTS["teams"]):
-            queue.push(
-                models.Team(
-                    name=f"Team {i:d}",
-                )
-            )
-        queue.flush()
-
-    with Timeit(stdout, "Creating team accesses"):
-        teams_ids = list(models.Team.objects.values_list("id", flat=True))
-        users_ids = list(models.User.objects.values_list("id", flat=True))
-        for team_id in teams_ids:
-            for user_id in random.sample(
-                users_ids,
-                random.randint(1, defaults.NB_OBJECTS["max_users_per_team"]),
-            ):
-                role = random.choice(models.RoleChoices.choices)
-                queue.push(
-                    models.TeamAccess(team_id=team_id, user_id=user_id, role=role[0])
-                )
-        queue.flush()
-
-    with Timeit(stdout, "Creating domains"):
-        for i in range(defaults.NB_OBJECTS["domains"]):
-            name = fake.domain_name().replace(".", f"-i{i:d}.")
-
-            queue.push(
-                mailbox_models.MailDomain(
-                    name=name,
-                    # slug should be automatic but bulk_create doesn't use save
-                    slug=slugify(name),
-                    status=random.choice(MailDomainStatusChoices.values),
-                    support_email="support@example.com",
-                )
-            )
-        queue.flush()
-
-    domains = mailbox_models.MailDomain.objects.all()
-    with Timeit(stdout, "Creating accesses to domains"):
-        for domain in domains:
-            queue.push(
-                mailbox_models.MailDomainAccess(
-                    domain=domain,
-                    user_id=random.choice(users_ids),
-                    role=models.RoleChoices.OWNER,
-                )
-            )
-
-        queue.flush()
-
-    with Timeit(stdout, "Creating mailboxes"):
-        for domain in domains:
-            for i in range(defaults.NB_OBJECTS["mailboxes_per_domain"]):
-                first_name = fake.first_name()
-                last_name = fake.last_name()
-                local_part = f"{first_name.lower()}.{last_name.lower()}{i}"
-
-                queue.push(
-                    mailbox_models.Mailbox(
-                        first_name=first_name,
-                        last_name=last_name,
-                        local_part=local_part,
-                        domain=domain,
-                        secondary_email=f"{local_part}@example.fr",
-                        status=random.choice(MailboxStatusChoices.values),
-                        dn_email=local_part,
-                    )
-                )
-
-        queue.flush()
-
-    with Timeit(stdout, "Creating aliases"):
-        for domain in domains:
-            for _i in range(defaults.NB_OBJECTS["aliases_per_domain"]):
-                queue.push(
-                    mailbox_models.Alias(
-                        local_part=fake.word(),
-                        destination=fake.email(),
-                        domain=domain,
-                    )
-                )
-
-        queue.flush()
-
-    with Timeit(stdout, "Creating specific users"):
         # ⚠️ Warning: this users also need to be created in the keycloak
         # realm.json AND the OIDC setting to fallback on user email
         # should be set to True, because we don't pilot the sub.
@@ -352,7 +544,9 @@ def create_demo(stdout):  # pylint: disable=too-many-branches too-many-statement
             )
             queue.push(team_user)
             queue.push(
-                models.TeamAccess(team_id=teams_ids[0], user_id=team_user.pk, role=role)
+                models.TeamAccess(
+                    team_id=first_team_id, user_id=team_user.pk, role=role
+                )
             )
 
         for role in models.RoleChoices.values:
@@ -390,7 +584,7 @@ def create_demo(stdout):  # pylint: disable=too-many-branches too-many-statement
                 queue.push(team_mail_user)
                 queue.push(
                     models.TeamAccess(
-                        team_id=teams_ids[0], user_id=team_mail_user.pk, role=team_role
+                        team_id=first_team_id, user_id=team_mail_user.pk, role=team_role
                     )
                 )
                 queue.push(
@@ -482,6 +676,27 @@ class Command(BaseCommand):
             default=False,
             help="Force command execution despite DEBUG is set to False",
         )
+        parser.add_argument(
+            "-s",
+            "--size",
+            type=str.upper,
+            choices=defaults.SIZE_PROFILES,
+            default=None,
+            help="Size profile of the demo site, from S (the default) to XL",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Seed of the random generators, to build the same demo site again",
+        )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes generating the largest volumes",
+        )
 
     def handle(self, *args, **options):
         """Handling of the management command."""
@@ -493,4 +708,11 @@ class Command(BaseCommand):
                 )
             )
 
-        create_demo(self.stdout)
+        create_demo(
+            self.stdout,
+            nb_objects=defaults.SIZE_PROFILES[options["size"]]
+            if options["size"]
+            else None,
+            seed=options["seed"],
+            workers=options["workers"],
+        )
@@ -9,6 +9,7 @@ import pytest
 from core import models
 
 from demo import defaults
+from demo.management.commands.create_demo import create_demo, get_demo_uuid
 from mailbox_manager import models as mailbox_models
 from people.settings import Base
 
@@ -68,6 +69,41 @@ def test_commands_create_demo(settings):
     assert mailbox_models.Alias.objects.count() == 50
 
 
+@mock.patch.dict(
+    defaults.SIZE_PROFILES,
+    {"TEST": {**TEST_NB_OBJECTS, "teams": 300, "max_team_depth": 4}},
+)
+def test_commands_create_demo_size_and_seed(settings):
+    """
+    The create_demo management command should create the objects of a size profile,
+    with nested teams and ids derived from the seed.
+    """
+    settings.DEBUG = True
+
+    call_command("create_demo", "--size", "test", "--seed", "42")
+
+    assert models.Team.objects.count() == 300
+    assert models.Team.objects.filter(depth__gt=1).exists()
+    assert not models.Team.objects.filter(depth__gt=4).exists()
+    # The materialized paths of the tree are consistent
+    assert all(not problems for problems in models.Team.find_problems())
+
+    assert (
+        models.User.objects.filter(
+            id__in=[
+                get_demo_uuid(42, "user", i) for i in range(TEST_NB_OBJECTS["users"])
+            ]
+        ).count()
+        == TEST_NB_OBJECTS["users"]
+    )
+    assert models.Team.objects.get(id=get_demo_uuid(42, "team", 0)).name == "Team 0"
+    assert mailbox_models.Mailbox.objects.filter(
+        domain_id__in=[
+            get_demo_uuid(42, "domain", i) for i in range(TEST_NB_OBJECTS["domains"])
+        ]
+    ).count() == (TEST_NB_OBJECTS["domains"] * TEST_NB_OBJECTS["mailboxes_per_domain"])
+
+
 def test_commands_createsuperuser():
     """
     The createsuperuser management command should create a user
@@ -79,3 +115,11 @@ def test_commands_createsuperuser():
     assert models.User.objects.count() == 1
     user = models.User.objects.get()
     assert user.sub == "admin"
+
+
+def test_commands_create_demo_without_teams():
+    """The demo site should not be created without teams, for the E2E users."""
+    with pytest.raises(ValueError, match="The demo site needs at least one team."):
+        create_demo(mock.Mock(), nb_objects={**TEST_NB_OBJECTS, "teams": 0})
+
+    assert not models.User.objects.exists()
@@ -10,7 +10,7 @@ from django.shortcuts import get_object_or_404
 from requests.exceptions import HTTPError
 from rest_framework import exceptions, serializers
 
-from core.api.client.serializers import UserSerializer
+from core.api.client.serializers import DynamicFieldsModelSerializer, UserSerializer
 from core.models import User
 
 from mailbox_manager import enums, models
@@ -19,7 +19,7 @@ from mailbox_manager.utils.dimail import DimailAPIClient
 logger = getLogger(__name__)
 
 
-class MailboxSerializer(serializers.ModelSerializer):
+class MailboxSerializer(DynamicFieldsModelSerializer):
     """Serialize mailbox."""
 
     class Meta:
@@ -103,7 +103,7 @@ class MailboxUpdateSerializer(MailboxSerializer):
         read_only_fields = ("id", "local_part", "status")
 
 
-class MailDomainSerializer(serializers.ModelSerializer):
+class MailDomainSerializer(DynamicFieldsModelSerializer):
     """Serialize mail domain."""
 
     abilities = serializers.SerializerMethodField(read_only=True)
@@ -161,8 +161,11 @@ class MailDomainSerializer(serializers.ModelSerializer):
         return {}
 
     def get_count_mailboxes(self, domain) -> int:
-        """Return count of mailboxes for the domain."""
-        return domain.mailboxes.count()
+        """Return count of mailboxes for the domain, annotated by the viewset."""
+        try:
+            return domain.count_mailboxes
+        except AttributeError:
+            return domain.mailboxes.count()
 
     def create(self, validated_data):
         """
@@ -274,7 +277,7 @@ class MailDomainAccessReadOnlySerializer(MailDomainAccessSerializer):
         ]
 
 
-class MailDomainInvitationSerializer(serializers.ModelSerializer):
+class MailDomainInvitationSerializer(DynamicFieldsModelSerializer):
     """Serialize invitations."""
 
     class Meta:
@@ -318,7 +321,7 @@ class MailDomainInvitationSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class AliasSerializer(serializers.ModelSerializer):
+class AliasSerializer(DynamicFieldsModelSerializer):
     """Serialize aliases."""
 
     domain = MailDomainSerializer(default="")
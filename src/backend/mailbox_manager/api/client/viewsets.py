@@ -1,6 +1,8 @@
 """API endpoints"""
 
-from django.db.models import Q, Subquery
+from functools import partial
+
+from django.db.models import Count, Max, OuterRef, Q, Subquery
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 
@@ -10,6 +12,12 @@ from rest_framework.response import Response
 
 from core import models as core_models
 from core.api.client.serializers import UserSerializer
+from core.api.client.viewsets import SparseFieldsetsMixin
+from core.api.conditional import (
+    aggregate_subquery,
+    conditional_response,
+    make_etag,
+)
 from core.exceptions import EmailAlreadyKnownException
 
 from mailbox_manager import enums, models
@@ -20,6 +28,7 @@ from mailbox_manager.utils.dimail import DimailAPIClient
 
 # pylint: disable=too-many-ancestors
 class MailDomainViewSet(
+    SparseFieldsetsMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -41,6 +50,9 @@ class MailDomainViewSet(
 
     POST /api/<version>/mail-domains/<domain-slug>/fetch/
         Fetch domain status and expected config from dimail.
+
+    The `fields` and `omit` query parameters allow to select the returned fields,
+    e.g. `?fields=id,name,slug`.
     """
 
     permission_classes = [
@@ -56,7 +68,66 @@ class MailDomainViewSet(
 
     def get_queryset(self):
         """Restrict results to the current user's domain."""
-        return self.queryset.filter(accesses__user=self.request.user)
+        queryset = self.queryset.filter(accesses__user=self.request.user)
+        if self.is_field_requested("count_mailboxes"):
+            queryset = queryset.annotate(
+                count_mailboxes=Count("mailboxes", distinct=True)
+            )
+        if self.is_field_requested("abilities"):
+            # Abilities are computed from the logged-in user role on each domain
+            queryset = queryset.annotate(
+                user_role=Subquery(
+                    models.MailDomainAccess.objects.filter(
+                        domain=OuterRef("pk"), user=self.request.user
+                    ).values("role")[:1]
+                )
+            )
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the domain details, or a 304 Not Modified response when the client
+        copy is still fresh: the watermarks of the domain, of the user access and
+        of the mailboxes are read with one query, before any permission check
+        on the domain or abilities computation.
+        """
+        mailboxes = models.Mailbox.objects.filter(domain=OuterRef("pk"))
+        watermark = (
+            models.MailDomain.objects.filter(slug=kwargs["slug"])
+            .annotate(
+                user_role=Subquery(
+                    models.MailDomainAccess.objects.filter(
+                        domain=OuterRef("pk"), user=request.user
+                    ).values("role")[:1]
+                ),
+                mailboxes_count=aggregate_subquery(mailboxes, "domain", Count("pk")),
+                mailboxes_updated_at=aggregate_subquery(
+                    mailboxes, "domain", Max("updated_at")
+                ),
+            )
+            .values(
+                "pk",
+                "updated_at",
+                "user_role",
+                "mailboxes_count",
+                "mailboxes_updated_at",
+            )
+            .first()
+        )
+        if watermark is None or watermark["user_role"] is None:
+            # Not found or not allowed, as answered by the regular retrieve
+            return super().retrieve(request, *args, **kwargs)
+
+        return conditional_response(
+            request,
+            make_etag(watermark, sorted(request.query_params.lists())),
+            partial(super().retrieve, request, *args, **kwargs),
+            last_modified=max(
+                filter(
+                    None, [watermark["updated_at"], watermark["mailboxes_updated_at"]]
+                )
+            ),
+        )
 
     def perform_create(self, serializer):
         """Set the current user as owner of the newly created mail domain."""
@@ -234,6 +305,7 @@ class MailDomainAccessViewSet(
 
 
 class MailBoxViewSet(
+    SparseFieldsetsMixin,
     viewsets.GenericViewSet,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
@@ -358,6 +430,7 @@ class MailBoxViewSet(
 
 
 class MailDomainInvitationViewset(
+    SparseFieldsetsMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -383,6 +456,9 @@ class MailDomainInvitationViewset(
 
     DELETE /api/<version>/mail-domains/<domain_slug>/invitations/:<invitation_id>/
         Delete targeted invitation
+
+    The `fields` and `omit` query parameters allow to select the returned fields,
+    e.g. `?fields=id,email,role`.
     """
 
     lookup_field = "id"
@@ -405,6 +481,10 @@ class MailDomainInvitationViewset(
         queryset = super().get_queryset()
         queryset = queryset.filter(domain__slug=self.kwargs["domain_slug"])
 
+        if not self.is_field_requested("domain"):
+            # Drop the join on domains made by the base queryset
+            queryset = queryset.select_related(None)
+
         if self.action == "list":
             # Determine which role the logged-in user has in the domain
             user_role_query = models.MailDomainAccess.objects.filter(
@@ -450,6 +530,7 @@ class MailDomainInvitationViewset(
 
 
 class AliasViewSet(
+    SparseFieldsetsMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -491,6 +572,10 @@ class AliasViewSet(
         queryset = super().get_queryset()
         queryset = queryset.filter(domain__slug=self.kwargs["domain_slug"])
 
+        if not self.is_field_requested("domain"):
+            # Drop the join on domains made by the base queryset
+            queryset = queryset.select_related(None)
+
         if self.action == "list":
             # Determine which role the logged-in user has in the domain
             user_role_query = models.MailDomainAccess.objects.filter(
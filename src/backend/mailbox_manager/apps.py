@@ -13,7 +13,17 @@ class MailboxManagerConfig(AppConfig):
 
     def ready(self):
         """
-        Import signals when the app is ready.
+        Import signals and register the domain invitations when the app is ready.
         """
         # pylint: disable=import-outside-toplevel, unused-import
+        from core.utils.invitations import register_invitation_model  # noqa: PLC0415
+
         import mailbox_manager.signals  # noqa: PLC0415
+        from mailbox_manager.models import MailDomainInvitation  # noqa: PLC0415
+        from mailbox_manager.utils.invitations import (  # noqa: PLC0415
+            create_domain_accesses,
+        )
+
+        register_invitation_model(
+            MailDomainInvitation, "domain_id", create_domain_accesses
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailbox_manager', '0029_alter_alias_unique_together_alias_no_duplicate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maildomaininvitation',
+            index=models.Index(fields=['email', 'created_at'], name='domain_invit_email_created_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-19 13:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailbox_manager', '0030_maildomaininvitation_email_created_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='maildomaininvitation',
+            name='domain_invit_email_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='maildomaininvitation',
+            index=models.Index(django.db.models.functions.text.Upper('email'), models.F('created_at'), name='domain_invit_email_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailbox_manager', '0031_alter_maildomaininvitation_email_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maildomaininvitation',
+            index=models.Index(fields=['updated_at'], name='domain_invit_updated_idx'),
+        ),
+    ]
@@ -11,7 +11,7 @@ from django.contrib.sites.models import Site
 from django.core import exceptions, mail, validators
 from django.core.validators import EmailValidator
 from django.db import models
-from django.db.models.functions import Lower
+from django.db.models.functions import Lower, Upper
 from django.template.loader import render_to_string
 from django.utils.text import slugify
 from django.utils.translation import get_language, gettext, override
@@ -110,9 +110,12 @@ class MailDomain(BaseModel):
 
         if user.is_authenticated:
             try:
-                role = self.accesses.filter(user=user).values("role")[0]["role"]
-            except MailDomainAccess.DoesNotExist, IndexError:
-                role = None
+                role = self.user_role
+            except AttributeError:
+                try:
+                    role = self.accesses.filter(user=user).values("role")[0]["role"]
+                except MailDomainAccess.DoesNotExist, IndexError:
+                    role = None
 
         is_owner_or_admin = role in [
             MailDomainRoleChoices.OWNER,
@@ -133,7 +136,8 @@ class MailDomain(BaseModel):
         Check if the identity provider is ready to manage the domain.
         """
         return (
-            bool(self.organization) and self.status == MailDomainStatusChoices.ENABLED
+            self.organization_id is not None
+            and self.status == MailDomainStatusChoices.ENABLED
         )
 
     def notify_status_change(self, recipients=None, language=None):
@@ -410,6 +414,17 @@ class MailDomainInvitation(BaseInvitation):
         db_table = "people_mail_domain_invitation"
         verbose_name = _("Mail domain invitation")
         verbose_name_plural = _("Mail domain invitations")
+        indexes = [
+            # Case-insensitive conversion to accesses of the valid invitations
+            # of new users
+            models.Index(
+                Upper("email"),
+                models.F("created_at"),
+                name="domain_invit_email_created_idx",
+            ),
+            # Purge of the expired invitations
+            models.Index(fields=["updated_at"], name="domain_invit_updated_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["email", "domain"], name="email_and_domain_unique_together"
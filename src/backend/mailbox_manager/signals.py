@@ -2,51 +2,16 @@
 Signals module for the mailbox_manager app.
 """
 
-import logging
-from datetime import timedelta
-
-from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.utils import timezone
 
 from core.models import User
 
-from mailbox_manager.models import MailDomainAccess, MailDomainInvitation
-
-logger = logging.getLogger(__name__)
-
-
-@receiver(post_save, sender=User)
-def convert_domain_invitations(sender, created, instance, **kwargs):  # pylint: disable=unused-argument
-    """
-    Convert valid domain invitations to domain accesses for a given user.
-    Expired invitations are ignored.
-    """
-    if created:
-        valid_domain_invitations = MailDomainInvitation.objects.filter(
-            email=instance.email,
-            created_at__gte=(
-                timezone.now()
-                - timedelta(seconds=settings.INVITATION_VALIDITY_DURATION)
-            ),
-        )
-
-        if not valid_domain_invitations.exists():
-            return
+from mailbox_manager.models import MailDomainAccess
 
-        logger.info(
-            "Converting %s domain invitations for new user %s",
-            len(valid_domain_invitations),
-            instance,
-        )
-        MailDomainAccess.objects.bulk_create(
-            [
-                MailDomainAccess(
-                    user=instance, domain=invitation.domain, role=invitation.role
-                )
-                for invitation in valid_domain_invitations
-            ]
-        )
 
-        valid_domain_invitations.delete()
+@receiver(post_save, sender=MailDomainAccess)
+@receiver(post_delete, sender=MailDomainAccess)
+def clear_domain_access_user_abilities(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Domain accesses grant abilities to their user, which must be computed again."""
+    User.clear_abilities_cache([instance.user_id])
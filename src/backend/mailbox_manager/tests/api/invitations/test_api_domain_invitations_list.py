@@ -82,3 +82,24 @@ def test_api_domain_invitations__domain_managers_should_list_invitations():
         ],
         key=lambda x: x["created_at"],
     )
+
+
+def test_api_domain_invitations__list_fields():
+    """Only the requested fields should be returned."""
+    user = core_factories.UserFactory()
+    domain = factories.MailDomainEnabledFactory()
+    factories.MailDomainAccessFactory(
+        domain=domain, user=user, role=enums.MailDomainRoleChoices.OWNER
+    )
+    invitation = factories.MailDomainInvitationFactory(domain=domain, issuer=user)
+
+    client = APIClient()
+    client.force_login(user)
+    response = client.get(
+        f"/api/v1.0/mail-domains/{domain.slug}/invitations/?fields=id,email"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"] == [
+        {"id": str(invitation.id), "email": invitation.email}
+    ]
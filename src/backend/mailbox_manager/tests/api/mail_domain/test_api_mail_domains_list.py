@@ -8,7 +8,7 @@ from rest_framework.test import APIClient
 
 from core import factories as core_factories
 
-from mailbox_manager import factories
+from mailbox_manager import enums, factories
 
 pytestmark = pytest.mark.django_db
 
@@ -53,3 +53,91 @@ def test_api_mail_domains__list_authenticated():
     assert len(results) == 5
     results_id = {result["id"] for result in results}
     assert expected_ids == results_id
+
+
+def test_api_mail_domains__list_abilities(django_assert_num_queries):
+    """The abilities of all the listed domains should be computed with one query."""
+    user = core_factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    owner_access = factories.MailDomainAccessFactory(
+        user=user, role=enums.MailDomainRoleChoices.OWNER
+    )
+    factories.MailDomainAccessFactory.create_batch(
+        2, user=user, role=enums.MailDomainRoleChoices.VIEWER
+    )
+
+    # get user, count domains, get domains with their mailboxes count and user role
+    with django_assert_num_queries(3):
+        response = client.get("/api/v1.0/mail-domains/")
+
+    assert response.status_code == status.HTTP_200_OK
+    abilities = {
+        result["id"]: result["abilities"] for result in response.json()["results"]
+    }
+    assert len(abilities) == 3
+    assert abilities.pop(str(owner_access.domain.pk)) == (
+        owner_access.domain.get_abilities(user)
+    )
+    viewer_abilities = {
+        "get": True,
+        "patch": False,
+        "put": False,
+        "post": False,
+        "delete": False,
+        "manage_accesses": False,
+    }
+    assert list(abilities.values()) == [viewer_abilities, viewer_abilities]
+
+
+def test_api_mail_domains__list_fields(django_assert_num_queries):
+    """
+    Only the requested fields should be returned, and the abilities should not be
+    computed when they are not requested.
+    """
+    user = core_factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    access = factories.MailDomainAccessFactory(user=user)
+    factories.MailboxFactory.create_batch(2, domain=access.domain)
+    for _ in range(2):
+        factories.MailDomainAccessFactory(user=user)
+
+    # get user, count domains, get domains with their mailboxes count
+    with django_assert_num_queries(3):
+        response = client.get(
+            "/api/v1.0/mail-domains/?fields=id,name,count_mailboxes&ordering=created_at"
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert results[0] == {
+        "id": str(access.domain.pk),
+        "name": access.domain.name,
+        "count_mailboxes": 2,
+    }
+    assert [result["count_mailboxes"] for result in results[1:]] == [0, 0]
+
+
+def test_api_mail_domains__list_omit(django_assert_num_queries):
+    """Omitted fields should not be returned nor computed."""
+    user = core_factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    factories.MailDomainAccessFactory.create_batch(3, user=user)
+
+    # get user, count domains, get domains
+    with django_assert_num_queries(3):
+        response = client.get("/api/v1.0/mail-domains/?omit=abilities,count_mailboxes")
+
+    assert response.status_code == status.HTTP_200_OK
+    for result in response.json()["results"]:
+        assert "abilities" not in result
+        assert "count_mailboxes" not in result
+        assert "name" in result
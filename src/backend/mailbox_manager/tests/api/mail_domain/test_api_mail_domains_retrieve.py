@@ -217,3 +217,58 @@ def test_api_mail_domains__retrieve_authenticated_related_with_failed_status():
         "action_required_details": {},
         "expected_config": None,
     }
+
+
+@responses.activate
+def test_api_mail_domains__retrieve_conditional(django_assert_num_queries):
+    """
+    A domain should not be computed nor sent again when unchanged, and should be
+    when its mailboxes or the user access change.
+    """
+    user = core_factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+    access = factories.MailDomainAccessFactory(
+        user=user, role=enums.MailDomainRoleChoices.VIEWER
+    )
+    domain = access.domain
+
+    response = client.get(f"/api/v1.0/mail-domains/{domain.slug}/")
+    etag = response["ETag"]
+
+    # user, watermarks
+    with django_assert_num_queries(2):
+        response = client.get(
+            f"/api/v1.0/mail-domains/{domain.slug}/", HTTP_IF_NONE_MATCH=etag
+        )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+
+    factories.MailboxFactory(domain=domain)
+    response = client.get(
+        f"/api/v1.0/mail-domains/{domain.slug}/", HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["count_mailboxes"] == 1
+    etag = response["ETag"]
+
+    access.role = enums.MailDomainRoleChoices.ADMIN
+    access.save()
+    response = client.get(
+        f"/api/v1.0/mail-domains/{domain.slug}/", HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["abilities"]["patch"] is True
+
+
+@responses.activate
+def test_api_mail_domains__retrieve_conditional_unrelated():
+    """Conditional requests should not reveal domains the user has no access to."""
+    client = APIClient()
+    client.force_login(core_factories.UserFactory())
+    domain = factories.MailDomainEnabledFactory()
+
+    response = client.get(
+        f"/api/v1.0/mail-domains/{domain.slug}/", HTTP_IF_NONE_MATCH="*"
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
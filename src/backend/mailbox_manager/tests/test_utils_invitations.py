@@ -0,0 +1,52 @@
+"""Tests for the registration of the domain invitations in the core invitations."""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+import pytest
+from freezegun import freeze_time
+
+from core import factories as core_factories
+from core import models as core_models
+from core.utils.invitations import convert_valid_invitations, purge_expired_invitations
+
+from mailbox_manager import factories, models
+
+pytestmark = pytest.mark.django_db
+
+
+def test_utils_invitations_convert_domain_invitations():
+    """Team and domain invitations of a new user should be converted at once."""
+    email = "future_admin@example.com"
+    team_invitation = core_factories.InvitationFactory(email=email)
+    domain_invitation = factories.MailDomainInvitationFactory(email=email)
+    # Saved without email, for the invitations to be converted below
+    user = core_factories.UserFactory(email=None)
+    user.email = email
+
+    accesses = convert_valid_invitations(user)
+
+    assert [access.team for access in accesses["core.Invitation"]] == [
+        team_invitation.team
+    ]
+    assert [
+        access.domain for access in accesses["mailbox_manager.MailDomainInvitation"]
+    ] == [domain_invitation.domain]
+    assert not models.MailDomainInvitation.objects.exists()
+    assert not core_models.Invitation.objects.exists()
+
+
+def test_utils_invitations_purge_expired_domain_invitations(settings):
+    """Expired domain invitations should be purged with the team invitations."""
+    with freeze_time(
+        timezone.now() - timedelta(seconds=settings.INVITATION_VALIDITY_DURATION + 1)
+    ):
+        factories.MailDomainInvitationFactory.create_batch(2)
+    valid_invitation = factories.MailDomainInvitationFactory()
+
+    results = purge_expired_invitations(batch_size=1)
+
+    assert results == {"core.Invitation": 0, "mailbox_manager.MailDomainInvitation": 2}
+    assert list(models.MailDomainInvitation.objects.all()) == [valid_invitation]
+    assert not core_models.Tombstone.objects.exists()
@@ -914,25 +914,19 @@ class DimailAPIClient:
             for known_alias in models.Alias.objects.filter(domain=domain)
         ]
 
-        imported_aliases = []
-        for incoming_alias in incoming_aliases:
-            if (
-                incoming_alias["username"],
-                incoming_alias["destination"],
-            ) not in known_aliases:
-                try:
-                    new_alias = models.Alias.objects.create(
-                        local_part=incoming_alias["username"],
-                        destination=incoming_alias["destination"],
-                        domain=domain,
-                    )
-                except (HeaderParseError, NonASCIILocalPartDefect) as err:
-                    logger.warning(
-                        "Import of alias %s to %s failed with error %s",
-                        incoming_alias["username"],
-                        incoming_alias["destination"],
-                        err,
-                    )
-                else:
-                    imported_aliases.append(str(new_alias))
-        return imported_aliases
+        new_aliases = [
+            models.Alias(
+                local_part=incoming_alias["username"],
+                destination=incoming_alias["destination"],
+                domain=domain,
+            )
+            for incoming_alias in incoming_aliases
+            if (incoming_alias["username"], incoming_alias["destination"])
+            not in known_aliases
+        ]
+        # Validated in one pass and inserted at once, invalid aliases are logged
+        # and not imported
+        imported_aliases = models.Alias.bulk_create_validated(
+            new_aliases, skip_invalid=True
+        )
+        return [str(alias) for alias in imported_aliases]
@@ -0,0 +1,23 @@
+"""Conversion of the mail domain invitations of a new user to domain accesses."""
+
+import logging
+
+from mailbox_manager.models import MailDomainAccess
+
+logger = logging.getLogger(__name__)
+
+
+def create_domain_accesses(user, invitations):
+    """
+    Convert the deleted domain invitations of a new user, given as (invitation
+    id, domain id, role) tuples, into domain accesses.
+    """
+    logger.info(
+        "Converting %s domain invitations for new user %s", len(invitations), user
+    )
+    return MailDomainAccess.objects.bulk_create(
+        [
+            MailDomainAccess(user=user, domain_id=domain_id, role=role)
+            for _invitation_id, domain_id, role in invitations
+        ]
+    )
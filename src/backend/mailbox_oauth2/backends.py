@@ -1,13 +1,14 @@
 """Authentication backend for OIDC provider"""
 
+import hashlib
 import logging
+import time
 from email.errors import HeaderParseError
 from email.headerregistry import Address
 
 from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
-from django.core.cache import cache
-from django.utils.text import slugify
+from django.core.cache import caches
 
 from mailbox_manager.models import Mailbox
 
@@ -36,32 +37,115 @@ class MailboxModelBackend(ModelBackend):
     them to access the /o/authorize endpoint **only**.
     """
 
-    def _get_cache_key(self, email):
-        """Generate a cache key for tracking login attempts."""
-        stringified_email = email.replace("@", "_at_").replace(".", "_dot_")
-        return f"login_attempts_{slugify(stringified_email)}"
+    def _get_cache_key(self, scope, value, window):
+        """
+        Generate the cache key counting failed login attempts of an email or an
+        IP address during a time window.
+        """
+        digest = hashlib.sha256(value.lower().encode("utf8")).hexdigest()
+        return f"login_attempts_{scope}_{digest}_{window}"
+
+    def _get_cache_keys(self, scope, value):
+        """Return the cache keys of the current and previous time windows."""
+        window = int(time.time() // settings.ACCOUNT_LOCKOUT_TIME)
+        return (
+            self._get_cache_key(scope, value, window),
+            self._get_cache_key(scope, value, window - 1),
+        )
+
+    def _get_client_ip_address(self, request):
+        """
+        Return the client IP address from the configured request header, or None
+        if it is not configured or missing.
+
+        Behind proxies, each trusted proxy appends the address it received the
+        request from, so the client address is the one added by the farthest
+        trusted proxy.
+        """
+        header = settings.LOGIN_ATTEMPTS_CLIENT_IP_HEADER
+        if request is None or not header:
+            return None
 
-    def _increment_login_attempts(self, email):
-        """Increment the number of failed login attempts."""
-        cache_key = self._get_cache_key(email)
-        attempts = cache.get(cache_key, 0) + 1
-        cache.set(cache_key, attempts, settings.ACCOUNT_LOCKOUT_TIME)
+        addresses = [
+            address.strip()
+            for address in request.META.get(header, "").split(",")
+            if address.strip()
+        ]
+        if len(addresses) < settings.LOGIN_ATTEMPTS_TRUSTED_PROXIES:
+            return None
+        return addresses[-settings.LOGIN_ATTEMPTS_TRUSTED_PROXIES]
+
+    def _get_login_attempts_scopes(self, request, email):
+        """Return the (scope, value, limit) of the counters of a login attempt."""
+        scopes = [("email", email, settings.MAX_LOGIN_ATTEMPTS)]
+        if ip_address := self._get_client_ip_address(request):
+            scopes.append(("ip", ip_address, settings.MAX_LOGIN_ATTEMPTS_PER_IP))
+        return scopes
+
+    def _increment_login_attempts(self, request, email):
+        """
+        Increment the number of failed login attempts of the email and the IP.
+
+        `add` then `incr` are atomic on the shared cache, concurrent failed
+        attempts can't overwrite each other.
+        """
+        login_attempts_cache = caches[settings.LOGIN_ATTEMPTS_CACHE_ALIAS]
+        for scope, value, _limit in self._get_login_attempts_scopes(request, email):
+            current_key, _previous_key = self._get_cache_keys(scope, value)
+            # Keep the counter during the next window for the sliding window
+            login_attempts_cache.add(
+                current_key, 0, timeout=2 * settings.ACCOUNT_LOCKOUT_TIME
+            )
+            try:
+                login_attempts_cache.incr(current_key)
+            except ValueError:
+                # The key expired in between, or the cache is a dummy cache
+                pass
 
     def _reset_login_attempts(self, email):
-        """Reset the number of failed login attempts."""
-        cache_key = self._get_cache_key(email)
-        cache.delete(cache_key)
-
-    def _is_login_attempts_exceeded(self, email) -> bool:
-        """Check if the account is locked due to too many failed attempts."""
-        cache_key = self._get_cache_key(email)
-        attempts = cache.get(cache_key, 0)
-        return attempts >= settings.MAX_LOGIN_ATTEMPTS
+        """
+        Reset the number of failed login attempts of the email.
+        Attempts from the IP address are not reset: a single valid account
+        must not allow to spray passwords on the other ones.
+        """
+        caches[settings.LOGIN_ATTEMPTS_CACHE_ALIAS].delete_many(
+            self._get_cache_keys("email", email)
+        )
+
+    def _is_login_attempts_exceeded(self, request, email) -> bool:
+        """
+        Check if the account or the IP address is locked due to too many failed
+        attempts, in a sliding window of ACCOUNT_LOCKOUT_TIME seconds.
+
+        The window is approximated from the counters of the current and previous
+        fixed windows, the previous one weighted by its part still in the window.
+        """
+        scopes = self._get_login_attempts_scopes(request, email)
+        keys = {scope: self._get_cache_keys(scope, value) for scope, value, _ in scopes}
+        counters = caches[settings.LOGIN_ATTEMPTS_CACHE_ALIAS].get_many(
+            [key for scope_keys in keys.values() for key in scope_keys]
+        )
+
+        elapsed = (time.time() % settings.ACCOUNT_LOCKOUT_TIME) / (
+            settings.ACCOUNT_LOCKOUT_TIME
+        )
+        for scope, _value, limit in scopes:
+            current_key, previous_key = keys[scope]
+            attempts = counters.get(current_key, 0) + counters.get(previous_key, 0) * (
+                1 - elapsed
+            )
+            if attempts >= limit:
+                return True
+        return False
 
     def get_user(self, user_id):
         """Retrieve a user, here a mailbox, by its unique identifier."""
         try:
-            mailbox = Mailbox.objects.get(pk=user_id)
+            # The domain and organization are needed to check the mailbox can
+            # authenticate, and later to build the OIDC claims
+            mailbox = Mailbox.objects.select_related("domain__organization").get(
+                pk=user_id
+            )
         except Mailbox.DoesNotExist:
             return None
 
@@ -86,12 +170,11 @@ class MailboxModelBackend(ModelBackend):
             )
             return None
 
-        # Check if the account is locked
-        if self._is_login_attempts_exceeded(email):
+        # Check if the account or the IP address is locked, before any database
+        # or hashing work. There is no need to hide the lockout with a dummy hash:
+        # it applies the same way to existing and nonexistent accounts.
+        if self._is_login_attempts_exceeded(request, email):
             logger.warning("Account locked due to too many failed attempts: %s", email)
-            # Run the default password hasher once to reduce the timing
-            # difference between a locked account and valid one (django issue #20760)
-            Mailbox().set_password(password)
             return None
 
         local_part, domain = get_username_domain_from_email(email)
@@ -99,7 +182,7 @@ class MailboxModelBackend(ModelBackend):
             return None
 
         try:
-            user = Mailbox.objects.select_related("domain").get(
+            user = Mailbox.objects.select_related("domain__organization").get(
                 local_part__iexact=local_part, domain__name__iexact=domain
             )
         except Mailbox.DoesNotExist:
@@ -117,10 +200,8 @@ class MailboxModelBackend(ModelBackend):
                 self._reset_login_attempts(email)
                 return user
 
-            else:
-                # Track failed attempt
-                self._increment_login_attempts(email)
-
+        # Track failed attempt, whether the account exists or not
+        self._increment_login_attempts(request, email)
         return None
 
     def user_can_authenticate(self, user):
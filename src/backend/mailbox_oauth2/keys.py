@@ -0,0 +1,76 @@
+"""
+Signing keys management for the OIDC provider.
+
+django-oauth-toolkit parses the RSA private key from the settings each time
+`Application.jwk_key` is accessed, and computes the key thumbprint for every
+signed token. Here keys are parsed once per process and their identifiers and
+the JWKS document are computed once.
+
+Key rotation without downtime:
+    1. publish the new key in `OIDC_RSA_PRIVATE_KEYS_INACTIVE`, so relying parties
+       can fetch it from the JWKS endpoint before any token is signed with it;
+    2. swap it with `OIDC_RSA_PRIVATE_KEY`, keeping the former key in
+       `OIDC_RSA_PRIVATE_KEYS_INACTIVE` until all tokens it signed have expired;
+    3. remove the former key.
+"""
+
+import json
+from functools import lru_cache
+
+from jwcrypto import jwk
+from oauth2_provider.settings import oauth2_settings
+
+
+@lru_cache(maxsize=16)
+def load_private_key(private_key_pem: str) -> jwk.JWK:
+    """Parse a PEM encoded private key, once per process."""
+    return jwk.JWK.from_pem(private_key_pem.encode("utf8"))
+
+
+@lru_cache(maxsize=16)
+def get_key_id(private_key_pem: str) -> str:
+    """Return the `kid` of a PEM encoded private key: its JWK thumbprint."""
+    return load_private_key(private_key_pem).thumbprint()
+
+
+@lru_cache(maxsize=4)
+def _build_jwks(private_key_pems: tuple) -> dict:
+    """Build the JWKS document publishing the public part of the given keys."""
+    keys = []
+    for private_key_pem in private_key_pems:
+        key = load_private_key(private_key_pem)
+        keys.append(
+            {
+                "alg": "RS256",
+                "use": "sig",
+                "kid": get_key_id(private_key_pem),
+                **json.loads(key.export_public()),
+            }
+        )
+    return {"keys": keys}
+
+
+def get_signing_key() -> jwk.JWK:
+    """Return the key used to sign RS256 tokens."""
+    return load_private_key(oauth2_settings.OIDC_RSA_PRIVATE_KEY)
+
+
+def get_signing_key_id() -> str:
+    """Return the `kid` of the key used to sign RS256 tokens."""
+    return get_key_id(oauth2_settings.OIDC_RSA_PRIVATE_KEY)
+
+
+def get_published_private_keys() -> tuple:
+    """Return the active key followed by the inactive keys still published."""
+    if not oauth2_settings.OIDC_RSA_PRIVATE_KEY:
+        return ()
+
+    return (
+        oauth2_settings.OIDC_RSA_PRIVATE_KEY,
+        *oauth2_settings.OIDC_RSA_PRIVATE_KEYS_INACTIVE,
+    )
+
+
+def get_jwks() -> dict:
+    """Return the JWKS document of all the published keys."""
+    return _build_jwks(get_published_private_keys())
@@ -0,0 +1 @@
+"""Mailbox OAuth2 management module."""
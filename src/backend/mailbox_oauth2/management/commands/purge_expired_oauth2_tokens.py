@@ -0,0 +1,49 @@
+"""
+Management command to purge expired OAuth2 grants and tokens.
+"""
+
+from django.core.management.base import BaseCommand
+
+from mailbox_oauth2.purge import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    """Management command to purge expired OAuth2 grants and tokens."""
+
+    help = (
+        "Delete expired grants, access tokens, refresh tokens and ID tokens of the "
+        "OAuth2 provider, by batches to avoid long locks on the tokens tables."
+    )
+
+    def add_arguments(self, parser):
+        """Add the batch options."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of rows deleted per transaction "
+            "(defaults to CLEAR_EXPIRED_TOKENS_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--batch-interval",
+            type=float,
+            default=None,
+            help="Seconds to wait between two batches "
+            "(defaults to CLEAR_EXPIRED_TOKENS_BATCH_INTERVAL).",
+        )
+
+    def handle(self, *args, **options):
+        """Purge expired grants and tokens, reporting progress after each batch."""
+        self.stdout.write("Start purging expired OAuth2 grants and tokens...")
+
+        results = purge_expired_tokens(
+            batch_size=options["batch_size"],
+            batch_interval=options["batch_interval"],
+            progress=lambda label, count: self.stdout.write(
+                f"{count} {label} deleted so far..."
+            ),
+        )
+
+        for label, count in results.items():
+            self.stdout.write(self.style.SUCCESS(f"{count} {label} deleted"))
+        self.stdout.write("Done", ending="\n")
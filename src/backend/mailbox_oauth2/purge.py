@@ -0,0 +1,153 @@
+"""
+Purge of expired OAuth2 grants and tokens.
+
+django-oauth-toolkit provides a `cleartokens` command, but it counts the
+whole set of expired rows again before each batch. Here rows are deleted in
+bounded batches walking the primary key index (keyset iteration), each batch in
+its own short transaction, so the OIDC provider lookups are never blocked for
+long.
+
+The rules are the same as `oauth2_provider.models.clear_expired`:
+    - revoked refresh tokens and refresh tokens of expired access tokens are
+      deleted once `REFRESH_TOKEN_EXPIRE_SECONDS` have elapsed (never when
+      this setting is not defined);
+    - expired access tokens without refresh token are deleted;
+    - expired ID tokens without access token are deleted;
+    - expired grants are deleted.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from oauth2_provider.models import (
+    get_access_token_model,
+    get_grant_model,
+    get_id_token_model,
+    get_refresh_token_model,
+)
+from oauth2_provider.settings import oauth2_settings
+
+logger = logging.getLogger(__name__)
+
+
+def delete_in_batches(queryset, batch_size, batch_interval=0, progress=None):
+    """
+    Delete the rows of a queryset by batches of primary keys, in ascending order.
+
+    Each batch is selected with `pk > last_pk ORDER BY pk LIMIT batch_size` and
+    deleted in its own transaction. `progress` is called after each batch with
+    the number of rows deleted so far. Returns the number of deleted rows.
+    """
+    model = queryset.model
+    label = model._meta.label  # noqa: SLF001
+    last_pk = None
+    deleted = 0
+
+    while True:
+        batch = queryset.order_by("pk")
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        pks = list(batch.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+
+        with transaction.atomic():
+            # Related rows (cascade, set null) are only the ones of this batch
+            _count, per_model = model.objects.filter(pk__in=pks).delete()
+
+        deleted += per_model.get(label, 0)
+        last_pk = pks[-1]
+        if progress:
+            progress(deleted)
+
+        if len(pks) < batch_size:
+            break
+        if batch_interval:
+            time.sleep(batch_interval)
+
+    return deleted
+
+
+def get_expired_querysets(now=None):
+    """
+    Return the querysets of expired rows to delete, in deletion order,
+    as a list of (label, queryset) tuples.
+    """
+    now = now or timezone.now()
+    querysets = []
+
+    refresh_token_expire_seconds = oauth2_settings.REFRESH_TOKEN_EXPIRE_SECONDS
+    if refresh_token_expire_seconds:
+        if not isinstance(refresh_token_expire_seconds, timedelta):
+            refresh_token_expire_seconds = timedelta(
+                seconds=refresh_token_expire_seconds
+            )
+        refresh_expire_at = now - refresh_token_expire_seconds
+        refresh_token_model = get_refresh_token_model()
+        querysets += [
+            (
+                "revoked refresh tokens",
+                refresh_token_model.objects.filter(revoked__lt=refresh_expire_at),
+            ),
+            (
+                "expired refresh tokens",
+                refresh_token_model.objects.filter(
+                    access_token__expires__lt=refresh_expire_at
+                ),
+            ),
+        ]
+
+    querysets += [
+        (
+            "expired access tokens",
+            get_access_token_model().objects.filter(
+                refresh_token__isnull=True, expires__lt=now
+            ),
+        ),
+        (
+            "expired ID tokens",
+            get_id_token_model().objects.filter(
+                access_token__isnull=True, expires__lt=now
+            ),
+        ),
+        (
+            "expired grants",
+            get_grant_model().objects.filter(expires__lt=now),
+        ),
+    ]
+    return querysets
+
+
+def purge_expired_tokens(batch_size=None, batch_interval=None, progress=None):
+    """
+    Delete expired grants and tokens, by batches.
+
+    `batch_size` and `batch_interval` default to django-oauth-toolkit's
+    `CLEAR_EXPIRED_TOKENS_BATCH_SIZE` and `CLEAR_EXPIRED_TOKENS_BATCH_INTERVAL`
+    settings. `progress` is called after each batch with the label of the rows
+    being purged and the number of rows deleted so far.
+
+    Returns a dictionary of the number of deleted rows per label.
+    """
+    if batch_size is None:
+        batch_size = oauth2_settings.CLEAR_EXPIRED_TOKENS_BATCH_SIZE
+    if batch_interval is None:
+        batch_interval = oauth2_settings.CLEAR_EXPIRED_TOKENS_BATCH_INTERVAL
+
+    results = {}
+    for label, queryset in get_expired_querysets():
+        results[label] = delete_in_batches(
+            queryset,
+            batch_size,
+            batch_interval=batch_interval,
+            progress=(lambda count, label=label: progress(label, count))
+            if progress
+            else None,
+        )
+        logger.info("%s %s deleted", results[label], label)
+
+    return results
@@ -0,0 +1,30 @@
+"""Mailbox OAuth2 tasks."""
+
+from celery import Celery
+from celery.schedules import crontab
+from celery.utils.log import get_task_logger
+
+from mailbox_oauth2.purge import purge_expired_tokens
+from people.celery_app import app as celery_app
+
+logger = get_task_logger(__name__)
+
+
+@celery_app.on_after_finalize.connect
+def setup_periodic_tasks(sender: Celery, **kwargs):
+    """Setup periodic tasks."""
+    sender.add_periodic_task(
+        crontab(minute="15"),  # Run at the 15th minute of every hour
+        purge_expired_tokens_task.s(),
+        name="purge_expired_oauth2_tokens_every_hour",
+        serializer="json",
+    )
+
+
+@celery_app.task
+def purge_expired_tokens_task():
+    """Celery task to delete expired OAuth2 grants and tokens, by batches."""
+    results = purge_expired_tokens(
+        progress=lambda label, count: logger.info("%s %s deleted so far", count, label),
+    )
+    return results
@@ -1,8 +1,13 @@
 """Test authentication backend for OIDC provider."""
 
+from unittest import mock
+
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import RequestFactory
 
 import pytest
+from freezegun import freeze_time
 
 from core import factories as core_factories
 
@@ -12,6 +17,14 @@ from mailbox_oauth2.backends import MailboxModelBackend, get_username_domain_fro
 pytestmark = pytest.mark.django_db
 
 
+@pytest.fixture(autouse=True)
+def clear_login_attempts():
+    """Failed login attempts are counted in the cache, clear it between tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 def test_authenticate_valid_credentials():
     """Test authentication with valid credentials."""
     organization = core_factories.OrganizationFactory(with_registration_id=True)
@@ -139,6 +152,20 @@ def test_get_user_exists():
     assert user == mailbox
 
 
+def test_get_user_num_queries(django_assert_num_queries):
+    """
+    get_user should load the mailbox with its domain and organization,
+    needed to check the mailbox can authenticate, in a single query.
+    """
+    organization = core_factories.OrganizationFactory(with_registration_id=True)
+    domain = factories.MailDomainEnabledFactory(organization=organization)
+    mailbox = factories.MailboxEnabledFactory(domain=domain)
+
+    with django_assert_num_queries(1):
+        user = MailboxModelBackend().get_user(mailbox.pk)
+        assert user.domain.organization == organization
+
+
 def test_get_user_does_not_exist():
     """Test get_user with non-existent user."""
     user = MailboxModelBackend().get_user(999999)
@@ -264,7 +291,151 @@ def test_login_attempts_reset_on_success(settings):
 def test_login_attempts_cache_key():
     """Test the cache key generation for login attempts."""
     backend = MailboxModelBackend()
-    email = "test@example.com"
 
-    cache_key = backend._get_cache_key(email)  # pylint: disable=protected-access
-    assert cache_key == "login_attempts_test_at_example_dot_com"
+    # pylint: disable=protected-access
+    cache_key = backend._get_cache_key("email", "Test@Example.com", 42)
+    assert cache_key == (
+        "login_attempts_email_"
+        "973dfe463ec85785f5f95af5ba3906eedb2d931c24e69824a89ea65dba4e813b_42"
+    )
+    assert cache_key == backend._get_cache_key("email", "test@example.com", 42)
+
+
+def test_login_attempts_locked_account_rejected_before_hashing(
+    settings, django_assert_num_queries
+):
+    """A locked account should be rejected without any query nor password hashing."""
+    organization = core_factories.OrganizationFactory(with_registration_id=True)
+    domain = factories.MailDomainEnabledFactory(organization=organization)
+    mailbox = factories.MailboxEnabledFactory(domain=domain)
+    email = f"{mailbox.local_part}@{domain.name}"
+    backend = MailboxModelBackend()
+
+    for _ in range(settings.MAX_LOGIN_ATTEMPTS):
+        backend.authenticate(None, email=email, password="wrong-password")
+
+    with (
+        django_assert_num_queries(0),
+        mock.patch("mailbox_oauth2.backends.Mailbox.set_password") as set_password,
+    ):
+        assert backend.authenticate(None, email=email, password="password") is None
+
+    set_password.assert_not_called()
+
+
+def test_login_attempts_nonexistent_account_locked(settings):
+    """Failed attempts on nonexistent accounts should be counted as well."""
+    backend = MailboxModelBackend()
+
+    # pylint: disable=protected-access
+    for _ in range(settings.MAX_LOGIN_ATTEMPTS):
+        assert not backend._is_login_attempts_exceeded(None, "nobody@example.com")
+        backend.authenticate(None, email="nobody@example.com", password="password")
+
+    assert backend._is_login_attempts_exceeded(None, "nobody@example.com")
+
+
+def test_login_attempts_ip_address_locked(settings):
+    """Too many failed attempts from an IP address should lock it for all accounts."""
+    settings.MAX_LOGIN_ATTEMPTS_PER_IP = 3
+    settings.LOGIN_ATTEMPTS_CLIENT_IP_HEADER = "REMOTE_ADDR"
+    organization = core_factories.OrganizationFactory(with_registration_id=True)
+    domain = factories.MailDomainEnabledFactory(organization=organization)
+    mailbox = factories.MailboxEnabledFactory(domain=domain)
+    email = f"{mailbox.local_part}@{domain.name}"
+    backend = MailboxModelBackend()
+    request = RequestFactory().post("/", REMOTE_ADDR="203.0.113.7")
+
+    # Spray one password on several accounts
+    for i in range(3):
+        backend.authenticate(request, email=f"user{i}@{domain.name}", password="123")
+
+    # The IP address is locked, even for a valid account
+    assert backend.authenticate(request, email=email, password="password") is None
+
+    # Other IP addresses are not
+    other_request = RequestFactory().post("/", REMOTE_ADDR="203.0.113.8")
+    assert backend.authenticate(other_request, email=email, password="password") == (
+        mailbox
+    )
+
+
+def test_login_attempts_ip_address_forwarded(settings):
+    """
+    Behind proxies, the client address should be taken from the forwarded header,
+    ignoring the addresses the client could forge.
+    """
+    settings.MAX_LOGIN_ATTEMPTS_PER_IP = 3
+    settings.LOGIN_ATTEMPTS_CLIENT_IP_HEADER = "HTTP_X_FORWARDED_FOR"
+    settings.LOGIN_ATTEMPTS_TRUSTED_PROXIES = 1
+    organization = core_factories.OrganizationFactory(with_registration_id=True)
+    domain = factories.MailDomainEnabledFactory(organization=organization)
+    mailbox = factories.MailboxEnabledFactory(domain=domain)
+    email = f"{mailbox.local_part}@{domain.name}"
+    backend = MailboxModelBackend()
+
+    # The client forges a different address on each attempt, all the requests
+    # come from the proxy
+    for i in range(3):
+        request = RequestFactory().post(
+            "/",
+            REMOTE_ADDR="10.0.0.1",
+            HTTP_X_FORWARDED_FOR=f"198.51.100.{i}, 203.0.113.7",
+        )
+        backend.authenticate(request, email=f"user{i}@{domain.name}", password="123")
+
+    locked_request = RequestFactory().post(
+        "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.7"
+    )
+    assert (
+        backend.authenticate(locked_request, email=email, password="password") is None
+    )
+
+    # Other clients behind the same proxy are not locked
+    other_request = RequestFactory().post(
+        "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.8"
+    )
+    assert backend.authenticate(other_request, email=email, password="password") == (
+        mailbox
+    )
+
+
+def test_login_attempts_ip_address_not_configured(settings):
+    """The limit per IP address should be disabled without a client IP header."""
+    settings.MAX_LOGIN_ATTEMPTS_PER_IP = 3
+    settings.LOGIN_ATTEMPTS_CLIENT_IP_HEADER = None
+    organization = core_factories.OrganizationFactory(with_registration_id=True)
+    domain = factories.MailDomainEnabledFactory(organization=organization)
+    mailbox = factories.MailboxEnabledFactory(domain=domain)
+    email = f"{mailbox.local_part}@{domain.name}"
+    backend = MailboxModelBackend()
+    request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+
+    for i in range(3):
+        backend.authenticate(request, email=f"user{i}@{domain.name}", password="123")
+
+    assert backend.authenticate(request, email=email, password="password") == mailbox
+
+
+def test_login_attempts_sliding_window(settings):
+    """Failed attempts should be forgotten progressively, in a sliding window."""
+    settings.MAX_LOGIN_ATTEMPTS = 4
+    settings.ACCOUNT_LOCKOUT_TIME = 100
+    backend = MailboxModelBackend()
+    email = "nobody@example.com"
+
+    # pylint: disable=protected-access
+    with freeze_time("2026-01-01 00:00:00") as frozen_time:  # window start
+        for _ in range(4):
+            backend.authenticate(None, email=email, password="password")
+        assert backend._is_login_attempts_exceeded(None, email)
+
+        # Next window: the 4 previous attempts still weigh 3
+        frozen_time.tick(125)
+        assert not backend._is_login_attempts_exceeded(None, email)
+        backend.authenticate(None, email=email, password="password")
+        assert backend._is_login_attempts_exceeded(None, email)
+
+        # Two windows later, all attempts are forgotten
+        frozen_time.tick(200)
+        assert not backend._is_login_attempts_exceeded(None, email)
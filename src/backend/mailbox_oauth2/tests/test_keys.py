@@ -0,0 +1,102 @@
+"""Tests for the OIDC provider signing keys management."""
+
+from unittest import mock
+
+import pytest
+from jwcrypto import jwk, jwt
+from oauth2_provider.models import Application
+
+from mailbox_oauth2 import keys
+from mailbox_oauth2.validators import BaseValidator
+from people.settings import Base
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="rsa_keys")
+def rsa_keys_fixture(settings):
+    """Configure an active and an inactive RSA key for the OIDC provider."""
+    active_key = Base.generate_temporary_rsa_key()
+    inactive_key = jwk.JWK.generate(kty="RSA", size=2048).export_to_pem(
+        private_key=True, password=None
+    )
+    settings.OAUTH2_PROVIDER = settings.OAUTH2_PROVIDER | {
+        "OIDC_ENABLED": True,
+        "OIDC_RSA_PRIVATE_KEY": active_key,
+        "OIDC_RSA_PRIVATE_KEYS_INACTIVE": [inactive_key.decode("utf8")],
+    }
+    return active_key, inactive_key.decode("utf8")
+
+
+def test_keys_signing_key_parsed_once(rsa_keys):
+    """The signing key should be parsed only once per process."""
+    active_key, _inactive_key = rsa_keys
+    keys.load_private_key.cache_clear()
+    keys.get_key_id.cache_clear()
+
+    with mock.patch.object(
+        jwk.JWK, "from_pem", wraps=jwk.JWK.from_pem
+    ) as from_pem_mock:
+        for _ in range(3):
+            key = keys.get_signing_key()
+            key_id = keys.get_signing_key_id()
+
+    assert from_pem_mock.call_count == 1
+    assert key_id == jwk.JWK.from_pem(active_key.encode("utf8")).thumbprint()
+    assert key.has_private
+
+
+def test_keys_jwks_publishes_active_and_inactive_keys(rsa_keys):
+    """The JWKS document should publish the public part of all the keys."""
+    active_key, inactive_key = rsa_keys
+
+    jwks = keys.get_jwks()
+
+    assert [key["kid"] for key in jwks["keys"]] == [
+        keys.get_key_id(active_key),
+        keys.get_key_id(inactive_key),
+    ]
+    for key in jwks["keys"]:
+        assert key["alg"] == "RS256"
+        assert key["use"] == "sig"
+        assert "d" not in key  # no private material
+
+
+def test_keys_jwks_view(client, rsa_keys):
+    """The JWKS endpoint should return the published keys."""
+    active_key, inactive_key = rsa_keys
+
+    response = client.get("/o/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response["Access-Control-Allow-Origin"] == "*"
+    assert [key["kid"] for key in response.json()["keys"]] == [
+        keys.get_key_id(active_key),
+        keys.get_key_id(inactive_key),
+    ]
+
+
+def test_keys_make_signed_token_rs256(rsa_keys):
+    """RS256 tokens should be signed with the active key and carry its kid."""
+    active_key, _inactive_key = rsa_keys
+
+    class MockRequest:  # pylint: disable=missing-class-docstring
+        client = Application(
+            name="test_app",
+            client_type=Application.CLIENT_CONFIDENTIAL,
+            authorization_grant_type=Application.GRANT_AUTHORIZATION_CODE,
+            algorithm=Application.RS256_ALGORITHM,
+        )
+
+    signed_token = BaseValidator().make_signed_token(MockRequest(), {"sub": "123"})
+
+    public_key = jwk.JWK()
+    public_key.import_key(**keys.get_jwks()["keys"][0])
+    token = jwt.JWT(jwt=signed_token.serialize(), key=public_key)
+
+    assert token.token.jose_header == {
+        "typ": "JWT",
+        "alg": "RS256",
+        "kid": keys.get_key_id(active_key),
+    }
+    assert token.claims == '{"sub": "123"}'
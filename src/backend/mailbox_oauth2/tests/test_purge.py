@@ -0,0 +1,131 @@
+"""Tests for the purge of expired OAuth2 grants and tokens."""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+import pytest
+from oauth2_provider.models import Application
+
+from mailbox_manager import factories
+from mailbox_oauth2 import models, tasks
+from mailbox_oauth2.purge import delete_in_batches, purge_expired_tokens
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="application")
+def application_fixture():
+    """Return an OAuth2 application."""
+    return Application.objects.create(
+        name="test_app",
+        client_type=Application.CLIENT_CONFIDENTIAL,
+        authorization_grant_type=Application.GRANT_AUTHORIZATION_CODE,
+    )
+
+
+def _create_grant(application, mailbox, expires):
+    return models.Grant.objects.create(
+        application=application,
+        user=mailbox,
+        code=f"code-{expires.timestamp()}-{models.Grant.objects.count()}",
+        expires=expires,
+        redirect_uri="https://example.com/callback",
+    )
+
+
+def _create_access_token(application, mailbox, expires):
+    return models.AccessToken.objects.create(
+        application=application,
+        user=mailbox,
+        token=f"token-{expires.timestamp()}-{models.AccessToken.objects.count()}",
+        expires=expires,
+    )
+
+
+def test_purge_expired_tokens(application):
+    """Expired grants and access tokens should be deleted, valid ones kept."""
+    mailbox = factories.MailboxEnabledFactory()
+    now = timezone.now()
+    expired, valid = now - timedelta(minutes=1), now + timedelta(minutes=1)
+
+    for _ in range(3):
+        _create_grant(application, mailbox, expired)
+        _create_access_token(application, mailbox, expired)
+    valid_grant = _create_grant(application, mailbox, valid)
+    valid_token = _create_access_token(application, mailbox, valid)
+
+    results = purge_expired_tokens(batch_size=2)
+
+    assert results["expired grants"] == 3
+    assert results["expired access tokens"] == 3
+    assert list(models.Grant.objects.all()) == [valid_grant]
+    assert list(models.AccessToken.objects.all()) == [valid_token]
+
+
+def test_purge_expired_tokens_keeps_refreshable_access_tokens(application):
+    """Expired access tokens with a refresh token should not be deleted."""
+    mailbox = factories.MailboxEnabledFactory()
+    access_token = _create_access_token(
+        application, mailbox, timezone.now() - timedelta(minutes=1)
+    )
+    models.RefreshToken.objects.create(
+        application=application,
+        user=mailbox,
+        token="refresh-token",
+        access_token=access_token,
+    )
+
+    results = purge_expired_tokens()
+
+    assert results["expired access tokens"] == 0
+    assert models.AccessToken.objects.count() == 1
+    # No refresh token expiration configured: refresh tokens are never purged
+    assert "expired refresh tokens" not in results
+
+
+def test_purge_delete_in_batches_num_queries(application, django_assert_num_queries):
+    """Each batch should select primary keys then delete them, by keyset."""
+    mailbox = factories.MailboxEnabledFactory()
+    expired = timezone.now() - timedelta(minutes=1)
+    for _ in range(5):
+        _create_grant(application, mailbox, expired)
+
+    progress = []
+    # 3 batches (2 + 2 + 1): 1 select and 1 delete per batch, plus savepoints
+    with django_assert_num_queries(12):
+        deleted = delete_in_batches(
+            models.Grant.objects.filter(expires__lt=timezone.now()),
+            batch_size=2,
+            progress=progress.append,
+        )
+
+    assert deleted == 5
+    assert progress == [2, 4, 5]
+    assert not models.Grant.objects.exists()
+
+
+def test_purge_command(application):
+    """The management command should purge and report progress."""
+    mailbox = factories.MailboxEnabledFactory()
+    _create_grant(application, mailbox, timezone.now() - timedelta(minutes=1))
+
+    output = StringIO()
+    call_command("purge_expired_oauth2_tokens", "--batch-size=10", stdout=output)
+
+    assert "1 expired grants deleted so far..." in output.getvalue()
+    assert "1 expired grants deleted\n" in output.getvalue()
+    assert not models.Grant.objects.exists()
+
+
+def test_purge_task(application):
+    """The celery task should purge expired rows and return the counts."""
+    mailbox = factories.MailboxEnabledFactory()
+    _create_access_token(application, mailbox, timezone.now() - timedelta(hours=1))
+
+    results = tasks.purge_expired_tokens_task.delay().get()
+
+    assert results["expired access tokens"] == 1
+    assert not models.AccessToken.objects.exists()
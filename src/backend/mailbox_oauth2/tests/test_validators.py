@@ -1,5 +1,11 @@
 """Tests for OAuth2 validators."""
 
+import base64
+import hashlib
+import json
+import secrets
+from urllib.parse import parse_qs, urlparse
+
 from django.contrib.auth.models import AnonymousUser
 
 import pytest
@@ -8,7 +14,11 @@ from oauth2_provider.models import Application
 from core import factories as core_factories
 
 from mailbox_manager import factories
+from mailbox_manager.models import Mailbox
+from mailbox_oauth2 import keys
+from mailbox_oauth2.models import IDToken
 from mailbox_oauth2.validators import BaseValidator, ProConnectValidator
+from people.settings import Base
 
 pytestmark = pytest.mark.django_db
 
@@ -192,3 +202,98 @@ def test_proconnect_create_authorization_code_without_eidas1(
     code = {"code": "test_code"}  # OAuth2 provider expects a dict with 'code' key
     validator._create_authorization_code(oauth_request_for_auth_code, code)  # pylint: disable=protected-access
     assert not oauth_request_for_auth_code.claims
+
+
+def test_proconnect_get_additional_claims_num_queries(
+    oauth_request_authenticated, django_assert_num_queries
+):
+    """
+    The mailbox, its domain and its organization should be loaded in a single
+    query, once per token exchange.
+    """
+    validator = ProConnectValidator()
+    mailbox = oauth_request_authenticated.user
+    oauth_request_authenticated.user = Mailbox.objects.get(pk=mailbox.pk)
+    oauth_request_authenticated.scopes = {"email", "siret", "siren", "uid"}
+
+    with django_assert_num_queries(1):
+        claims = validator.get_additional_claims(oauth_request_authenticated)
+
+    registration_id = mailbox.domain.organization.registration_id_list[0]
+    assert claims["email"] == mailbox.get_email()
+    assert claims["siret"] == registration_id
+    assert claims["siren"] == registration_id[:9]
+    assert claims["uid"] == str(mailbox.pk)
+
+    # The loaded mailbox is kept on the request
+    with django_assert_num_queries(0):
+        validator.get_additional_claims(oauth_request_authenticated)
+
+
+def _b64url(data):
+    """Encode bytes as unpadded base64url, as in PKCE and JWTs."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def test_authorization_code_exchange_saves_id_token(client, mailbox, settings):
+    """
+    A full authorization code exchange with the openid scope should return an
+    ID token, saved with the jti it claims.
+    """
+    settings.OAUTH2_PROVIDER = settings.OAUTH2_PROVIDER | {
+        "OIDC_ENABLED": True,
+        "OIDC_RSA_PRIVATE_KEY": Base.generate_temporary_rsa_key(),
+    }
+    keys.load_private_key.cache_clear()
+    keys.get_key_id.cache_clear()
+    application = Application.objects.create(
+        name="test_app",
+        client_id="test-client",
+        client_secret="test-secret",
+        client_type=Application.CLIENT_CONFIDENTIAL,
+        authorization_grant_type=Application.GRANT_AUTHORIZATION_CODE,
+        redirect_uris="https://example.com/callback",
+        algorithm=Application.RS256_ALGORITHM,
+        skip_authorization=True,
+    )
+    code_verifier = secrets.token_urlsafe(64)
+
+    response = client.post(
+        "/api/v1.0/login/", {"email": "user@example.com", "password": "password"}
+    )
+    assert response.status_code == 200
+
+    response = client.get(
+        "/o/authorize/",
+        {
+            "response_type": "code",
+            "client_id": application.client_id,
+            "redirect_uri": "https://example.com/callback",
+            "scope": "openid email",
+            "nonce": "test_nonce",
+            "code_challenge": _b64url(hashlib.sha256(code_verifier.encode()).digest()),
+            "code_challenge_method": "S256",
+        },
+    )
+    assert response.status_code == 302
+    code = parse_qs(urlparse(response["Location"]).query)["code"][0]
+
+    response = client.post(
+        "/o/token/",
+        {
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": "https://example.com/callback",
+            "client_id": application.client_id,
+            "client_secret": "test-secret",
+            "code_verifier": code_verifier,
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()["id_token"].split(".")[1]
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    assert claims["sub"] == str(mailbox.pk)
+    id_token = IDToken.objects.get()
+    assert str(id_token.jti) == claims["jti"]
+    assert id_token.user == mailbox
@@ -7,14 +7,91 @@ people as an Identity Provider.
 
 import json
 
+from django.db import router, transaction
+
 from jwcrypto import jwt
-from oauth2_provider.models import AbstractApplication
+from oauth2_provider.models import AbstractApplication, get_id_token_model
 from oauth2_provider.oauth2_validators import OAuth2Validator
 
+from mailbox_manager.models import Mailbox, MailDomain
+from mailbox_oauth2 import keys
+
 
 class BaseValidator(OAuth2Validator):
     """This validator adds additional claims to the token based on the requested scopes."""
 
+    def make_signed_token(self, request, claims) -> jwt.JWT:
+        """
+        Sign the claims with the request client key.
+
+        RS256 tokens are signed with the provider key, which is parsed once
+        per process (see `mailbox_oauth2.keys`), instead of using
+        `request.client.jwk_key` which parses the key on each access.
+        """
+        header = {
+            "typ": "JWT",
+            "alg": request.client.algorithm,
+        }
+
+        if request.client.algorithm == AbstractApplication.RS256_ALGORITHM:
+            # RS256 consumers expect a kid in the header for verifying the token
+            header["kid"] = keys.get_signing_key_id()
+            key = keys.get_signing_key()
+        else:
+            key = request.client.jwk_key
+
+        jwt_token = jwt.JWT(
+            header=json.dumps(header, default=str),
+            claims=json.dumps(claims, default=str),
+        )
+        jwt_token.make_signed_token(key)
+        return jwt_token
+
+    def get_claims_user(self, request):
+        """
+        Return the request mailbox, with its domain and organization loaded.
+
+        Claims are built from the mailbox, its domain and its organization.
+        When the mailbox was not loaded along with them, they are fetched in
+        a single query and the loaded mailbox replaces `request.user` for the
+        rest of the token exchange.
+        """
+        mailbox = request.user
+        if Mailbox.domain.is_cached(mailbox) and MailDomain.organization.is_cached(
+            mailbox.domain
+        ):
+            return mailbox
+
+        mailbox = Mailbox.objects.select_related("domain__organization").get(
+            pk=mailbox.pk
+        )
+        request.user = mailbox
+        return mailbox
+
+    def finalize_id_token(self, id_token, token, token_handler, request):
+        """
+        Sign and save the ID token.
+
+        This is the same as django-oauth-toolkit implementation but uses
+        `make_signed_token` to avoid parsing the signing key for each token.
+        """
+        claims, expiration_time = self.get_id_token_dictionary(
+            token, token_handler, request
+        )
+        id_token.update(**claims)
+        # Workaround for oauthlib bug #746
+        # https://github.com/oauthlib/oauthlib/issues/746
+        if "nonce" not in id_token and request.nonce:
+            id_token["nonce"] = request.nonce
+
+        jwt_token = self.make_signed_token(request, id_token)
+        with transaction.atomic(using=router.db_for_write(get_id_token_model())):
+            id_token = self._save_id_token(id_token["jti"], request, expiration_time)
+            # this is needed by django rest framework
+            request.access_token = id_token
+            request.id_token = id_token
+        return jwt_token.serialize()
+
     def get_additional_claims(self, request):
         """
         Generate additional claims to be included in the token.
@@ -27,16 +104,17 @@ class BaseValidator(OAuth2Validator):
             dict: A dictionary of additional claims to be included in the token.
         """
         additional_claims = super().get_additional_claims(request)
+        mailbox = self.get_claims_user(request)
 
         # Enforce the use of the sub instead of the user pk as sub
-        additional_claims["sub"] = str(request.user.pk)
+        additional_claims["sub"] = str(mailbox.pk)
 
         # Authentication method reference
         additional_claims["amr"] = "pwd"
 
         # Include the user's email if 'email' scope is requested
         if "email" in request.scopes:
-            additional_claims["email"] = request.user.get_email()
+            additional_claims["email"] = mailbox.get_email()
 
         return additional_claims
 
@@ -139,27 +217,28 @@ class ProConnectValidator(BaseValidator):
             dict: A dictionary of additional claims to be included in the token.
         """
         additional_claims = super().get_additional_claims(request)
+        mailbox = self.get_claims_user(request)  # already loaded by the parent
 
         # Include the user's name if 'profile' scope is requested
         if "given_name" in request.scopes:
-            additional_claims["given_name"] = request.user.first_name
+            additional_claims["given_name"] = mailbox.first_name
 
         if "usual_name" in request.scopes:
-            additional_claims["usual_name"] = request.user.last_name
+            additional_claims["usual_name"] = mailbox.last_name
 
         if "uid" in request.scopes:
-            additional_claims["uid"] = str(request.user.pk)
+            additional_claims["uid"] = str(mailbox.pk)
 
         if "siret" in request.scopes:
             # The following line will fail on purpose if we don't have the proper information
             additional_claims["siret"] = (
-                request.user.domain.organization.registration_id_list[0]
+                mailbox.domain.organization.registration_id_list[0]
             )
 
         if "siren" in request.scopes:
             # The following line will fail on purpose if we don't have the proper information
             additional_claims["siren"] = (
-                request.user.domain.organization.registration_id_list[0][:9]
+                mailbox.domain.organization.registration_id_list[0][:9]
             )
 
         # Include 'acr' claim if it is present in the request claims and equals 'eidas1'
@@ -217,23 +296,9 @@ class ProConnectValidator(BaseValidator):
         Generates and saves a new JWT for this request, and returns it as the
         current user's claims.
 
-        This is overridden to enforce JWT signing, we use `finalize_id_token` like code.
+        This is overridden to enforce JWT signing, like in `finalize_id_token`.
         """
         claims, _expiration_time = self.get_id_token_dictionary(
             request.access_token, None, request
         )
-
-        header = {
-            "typ": "JWT",
-            "alg": request.client.algorithm,
-        }
-        # RS256 consumers expect a kid in the header for verifying the token
-        if request.client.algorithm == AbstractApplication.RS256_ALGORITHM:
-            header["kid"] = request.client.jwk_key.thumbprint()
-
-        jwt_token = jwt.JWT(
-            header=json.dumps(header, default=str),
-            claims=json.dumps(claims, default=str),
-        )
-        jwt_token.make_signed_token(request.client.jwk_key)
-        return jwt_token.serialize()
+        return self.make_signed_token(request, claims).serialize()
@@ -3,12 +3,16 @@
 import datetime
 
 from django.contrib.auth import login
+from django.http import JsonResponse
 
+from oauth2_provider.settings import oauth2_settings
+from oauth2_provider.views import JwksInfoView as BaseJwksInfoView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.status import HTTP_401_UNAUTHORIZED
 from rest_framework.views import APIView
 
+from . import keys
 from .serializers import LoginSerializer
 
 
@@ -41,3 +45,21 @@ class LoginView(APIView):
             {"error": "Invalid credentials"},
             status=HTTP_401_UNAUTHORIZED,
         )
+
+
+class JwksInfoView(BaseJwksInfoView):
+    """
+    View used to show oidc json web key set document.
+
+    Same as the django-oauth-toolkit view, but the document is computed
+    once per process instead of parsing all the keys on each call.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """Return the JWKS document of the published keys."""
+        response = JsonResponse(keys.get_jwks())
+        response["Access-Control-Allow-Origin"] = "*"
+        response["Cache-Control"] = (
+            f"public, max-age={oauth2_settings.OIDC_JWKS_MAX_AGE_SECONDS}"
+        )
+        return response
@@ -13,10 +13,13 @@ from core.api.resource_server.scim import viewsets as scim_viewsets
 # Users will be added later
 router = SimpleRouter()
 router.register("teams", viewsets.TeamViewSet, basename="teams")
+router.register("changes", viewsets.ChangesViewSet, basename="changes")
 
 # - SCIM endpoints
 scim_router = SimpleRouter()
 scim_router.register("Me", scim_viewsets.MeViewSet, basename="scim-me")
+scim_router.register("Groups", scim_viewsets.GroupViewSet, basename="scim-groups")
+scim_router.register("Users", scim_viewsets.UserViewSet, basename="scim-users")
 
 # - Routes nested under a team
 team_related_router = SimpleRouter()
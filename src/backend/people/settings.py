@@ -14,6 +14,7 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 
 import json
 import os
+from functools import cache
 from socket import gethostbyname, gethostname
 
 from django.utils.translation import gettext_lazy as _
@@ -508,7 +509,7 @@ class Base(Configuration):
     )
     OIDC_OP_URL = values.Value(None, environ_name="OIDC_OP_URL", environ_prefix=None)
     OIDC_RS_BACKEND_CLASS = values.Value(
-        "lasuite.oidc_resource_server.backend.ResourceServerBackend",
+        "core.authentication.backends.CachedResourceServerBackend",
         environ_name="OIDC_RS_BACKEND_CLASS",
         environ_prefix=None,
     )
@@ -531,6 +532,19 @@ class Base(Configuration):
     OIDC_RS_SCOPES = values.ListValue(
         ["groups"], environ_name="OIDC_RS_SCOPES", environ_prefix=None
     )
+    # - Maximum lifetime of a cached token introspection (0 disables the cache),
+    # the token expiration time always takes precedence
+    OIDC_RS_INTROSPECTION_CACHE_TIMEOUT = values.IntegerValue(
+        default=60,
+        environ_name="OIDC_RS_INTROSPECTION_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
+    # - Lifetime of the cache for tokens rejected by the authorization server
+    OIDC_RS_INTROSPECTION_NEGATIVE_CACHE_TIMEOUT = values.IntegerValue(
+        default=10,
+        environ_name="OIDC_RS_INTROSPECTION_NEGATIVE_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
     OIDC_PROXY = values.Value(None, environ_name="OIDC_PROXY", environ_prefix=None)
 
     OIDC_VERIFY_SSL = values.BooleanValue(
@@ -544,6 +558,72 @@ class Base(Configuration):
         environ_prefix=None,
     )
 
+    # Changes feed of the resource server
+    # - Changes more recent than this delay, in seconds, are not returned yet, so
+    # changes of transactions still running when the feed is read are not missed
+    CHANGES_FEED_SETTLE_DELAY = values.IntegerValue(
+        default=5,
+        environ_name="CHANGES_FEED_SETTLE_DELAY",
+        environ_prefix=None,
+    )
+    # - Retention of the deletions, in seconds: older cursors are expired and
+    # clients must synchronize again from scratch
+    CHANGES_FEED_RETENTION = values.IntegerValue(
+        default=60 * 60 * 24 * 30,  # 30 days
+        environ_name="CHANGES_FEED_RETENTION",
+        environ_prefix=None,
+    )
+
+    # Caches
+    # - Lifetime, in seconds, of the cached user abilities (0 disables the cache),
+    # they are invalidated whenever the user team or domain accesses change
+    USER_ABILITIES_CACHE_TIMEOUT = values.IntegerValue(
+        default=60 * 60,
+        environ_name="USER_ABILITIES_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
+    # - Lifetime, in seconds, of the cached mapping of audiences to service
+    # providers (0 disables the cache): in the shared cache, cleared when a service
+    # provider changes, and in each process, not cleared from other processes
+    SERVICE_PROVIDERS_CACHE_TIMEOUT = values.IntegerValue(
+        default=60 * 60,
+        environ_name="SERVICE_PROVIDERS_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
+    SERVICE_PROVIDERS_LOCAL_CACHE_TIMEOUT = values.IntegerValue(
+        default=60,
+        environ_name="SERVICE_PROVIDERS_LOCAL_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
+
+    # La Suite plugin: organization names and metadata found from their SIRET
+    # - Lifetime, in seconds, of the results of the search API
+    LA_SUITE_SIRET_CACHE_TIMEOUT = values.IntegerValue(
+        default=60 * 60 * 24 * 30,  # 30 days
+        environ_name="LA_SUITE_SIRET_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
+    # - Quota of the search API, in requests per second, shared by all processes
+    LA_SUITE_SIRET_API_RATE_LIMIT = values.IntegerValue(
+        default=7,
+        environ_name="LA_SUITE_SIRET_API_RATE_LIMIT",
+        environ_prefix=None,
+    )
+    # - Number of concurrent requests to the search API when resolving in batch
+    LA_SUITE_SIRET_API_CONCURRENCY = values.IntegerValue(
+        default=7,
+        environ_name="LA_SUITE_SIRET_API_CONCURRENCY",
+        environ_prefix=None,
+    )
+    # - Lifetime, in seconds, of the cached export of the SIRET of active communes
+    # (0 disables the cache), it is cleared whenever an organization is saved or
+    # deleted, but not by `QuerySet.update()`
+    LA_SUITE_SIRET_EXPORT_CACHE_TIMEOUT = values.IntegerValue(
+        default=60 * 60,
+        environ_name="LA_SUITE_SIRET_EXPORT_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
+
     ACCOUNT_SERVICE_SCOPES = values.ListValue(
         default=[],
         environ_name="ACCOUNT_SERVICE_SCOPES",
@@ -627,6 +707,36 @@ class Base(Configuration):
         environ_name="ACCOUNT_LOCKOUT_TIME",
         environ_prefix=None,
     )
+    # - Maximum number of failed login attempts from a single IP address, on any
+    #   account, before lockout of this address (password spraying)
+    MAX_LOGIN_ATTEMPTS_PER_IP = values.IntegerValue(
+        default=50,
+        environ_name="MAX_LOGIN_ATTEMPTS_PER_IP",
+        environ_prefix=None,
+    )
+    # - Request META key holding the client IP address, e.g. "REMOTE_ADDR" when the
+    #   app is directly exposed or "HTTP_X_FORWARDED_FOR" behind proxies. The limit
+    #   per IP address is disabled when it is not set, as all clients would share
+    #   the address of the proxy.
+    LOGIN_ATTEMPTS_CLIENT_IP_HEADER = values.Value(
+        default=None,
+        environ_name="LOGIN_ATTEMPTS_CLIENT_IP_HEADER",
+        environ_prefix=None,
+    )
+    # - Number of trusted proxies appending to the client IP header: the client
+    #   address is the one added by the farthest trusted proxy, the addresses
+    #   before it can be forged by the client
+    LOGIN_ATTEMPTS_TRUSTED_PROXIES = values.IntegerValue(
+        default=1,
+        environ_name="LOGIN_ATTEMPTS_TRUSTED_PROXIES",
+        environ_prefix=None,
+    )
+    # - Cache used to count failed login attempts, must be shared by all workers
+    LOGIN_ATTEMPTS_CACHE_ALIAS = values.Value(
+        default="default",
+        environ_name="LOGIN_ATTEMPTS_CACHE_ALIAS",
+        environ_prefix=None,
+    )
 
     MANAGEMENT_COMMAND_AS_TASK = [
         "fill_organization_metadata",
@@ -713,6 +823,13 @@ class Base(Configuration):
             environ_name="OAUTH2_PROVIDER_OIDC_RSA_PRIVATE_KEY",
             environ_prefix=None,
         )
+        # Keys still published in the JWKS document, but not used to sign tokens
+        # anymore, used for key rotation (see mailbox_oauth2.keys)
+        OIDC_RSA_PRIVATE_KEYS_INACTIVE = values.ListValue(
+            default=[],
+            environ_name="OAUTH2_PROVIDER_OIDC_RSA_PRIVATE_KEYS_INACTIVE",
+            environ_prefix=None,
+        )
         OAUTH2_VALIDATOR_CLASS = values.Value(
             default="mailbox_oauth2.validators.BaseValidator",
             environ_name="OAUTH2_PROVIDER_VALIDATOR_CLASS",
@@ -737,6 +854,7 @@ class Base(Configuration):
         return {
             "OIDC_ENABLED": OIDC_ENABLED,
             "OIDC_RSA_PRIVATE_KEY": OIDC_RSA_PRIVATE_KEY,
+            "OIDC_RSA_PRIVATE_KEYS_INACTIVE": OIDC_RSA_PRIVATE_KEYS_INACTIVE,
             "SCOPES": SCOPES,
             "OAUTH2_VALIDATOR_CLASS": OAUTH2_VALIDATOR_CLASS,
         }
@@ -776,9 +894,14 @@ class Base(Configuration):
             # Ignore the logs added by the DockerflowMiddleware
             ignore_logger("request.summary")
 
-    @classmethod
-    def generate_temporary_rsa_key(cls):
-        """Generate a temporary RSA key for OIDC Provider."""
+    @staticmethod
+    @cache
+    def generate_temporary_rsa_key():
+        """
+        Generate a temporary RSA key for OIDC Provider.
+
+        The key is generated once per process, whichever settings access it.
+        """
 
         private_key = rsa.generate_private_key(
             public_exponent=65537,
@@ -897,6 +1020,15 @@ class Test(Base):
     ]
     USE_SWAGGER = True
 
+    # Plugins have models, so they are installed for the test database to have
+    # their tables, which is created once for all the tests. They are not listed
+    # in INSTALLED_PLUGINS, so their hooks and signals are only enabled by their
+    # own tests.
+    INSTALLED_APPS = [
+        *[app for app in Base.INSTALLED_APPS if app != "plugins.la_suite"],
+        "plugins.la_suite",
+    ]
+
     STORAGES = {
         "default": {
             "BACKEND": "django.core.files.storage.FileSystemStorage",
@@ -16,6 +16,7 @@ from oauth2_provider import urls as oauth2_urls
 from core.plugins import urls as plugin_urls
 
 from debug import urls as debug_urls
+from mailbox_oauth2.views import JwksInfoView
 
 from . import api_urls, resource_server_urls
 
@@ -25,6 +26,8 @@ API_VERSION = settings.API_VERSION
 urlpatterns = (
     [
         path("admin/", admin.site.urls),
+        # Override the django-oauth-toolkit JWKS view, see JwksInfoView
+        path("o/.well-known/jwks.json", JwksInfoView.as_view(), name="jwks-info"),
         path("o/", include(oauth2_urls)),
     ]
     + api_urls.urlpatterns
@@ -1,15 +1,16 @@
 """API viewsets for La Suite plugin"""
 
-from functools import reduce
-from operator import iconcat
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 
 from rest_framework import viewsets
 from rest_framework.mixins import ListModelMixin
 from rest_framework.permissions import BasePermission
-from rest_framework.response import Response
 
+from core.api.conditional import conditional_response
 from core.authentication.backends import AccountServiceAuthentication
-from core.models import Organization
+
+from plugins.la_suite import exports
 
 
 class ScopeAPIPermission(BasePermission):
@@ -34,23 +35,22 @@ class ActiveOrganizationsSiret(viewsets.GenericViewSet, ListModelMixin):
     permission_classes = [ScopeAPIPermission]
     scope = "la-suite-list-organizations-siret"
 
-    def get_queryset(self):
-        """
-        Return queryset of active communes.
-        """
-        return Organization.objects.filter(
-            metadata__is_commune=True,
-            registration_id_list__isnull=False,
-            is_active=True,
-        ).order_by("-created_at")
-
     def list(self, request, *args, **kwargs):
         """
         Return a list of all SIRET of active communes.
+
+        The list is served from a cached snapshot with its ETag (304 Not Modified
+        when unchanged), or streamed from the database when the cache is disabled.
         """
-        registration_ids_lists = self.get_queryset().values_list(
-            "registration_id_list", flat=True
+        if not settings.LA_SUITE_SIRET_EXPORT_CACHE_TIMEOUT:
+            return StreamingHttpResponse(
+                exports.iter_active_communes_siret_json(),
+                content_type="application/json",
+            )
+
+        snapshot = exports.get_active_communes_siret_snapshot()
+        return conditional_response(
+            request,
+            snapshot["etag"],
+            lambda: HttpResponse(snapshot["content"], content_type="application/json"),
         )
-        registration_ids = reduce(iconcat, registration_ids_lists, [])
-
-        return Response(registration_ids)
@@ -10,3 +10,11 @@ class LaSuitePluginConfig(BasePluginAppConfigMixIn, AppConfig):
 
     name = "plugins.la_suite"
     verbose_name = "La Suite Plugin"
+
+    def enable(self):
+        """Register the hooks and connect the signals of the plugin."""
+        super().enable()
+        # pylint: disable=import-outside-toplevel
+        from plugins.la_suite.signals import connect_signals  # noqa: PLC0415
+
+        connect_signals()
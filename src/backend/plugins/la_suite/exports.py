@@ -0,0 +1,82 @@
+"""
+Export of the SIRET of active communes, polled by the other services.
+
+SIRET lists are flattened by Postgres (`unnest`), walking the organizations
+with a server-side cursor through the `la_suite_active_commune_idx` partial
+index. The JSON document is kept in the cache until an organization changes,
+with its ETag.
+
+The cache is cleared when organizations are saved, deleted or updated in bulk by
+the plugin. `QuerySet.update()` sends no signal and does not clear it: such
+changes are served once the cache expires, after
+`LA_SUITE_SIRET_EXPORT_CACHE_TIMEOUT`.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from core.api.conditional import make_etag
+from core.models import Organization
+
+ACTIVE_COMMUNES_SIRET_CACHE_KEY = "la-suite-active-communes-siret"
+
+# Keep in sync with the `la_suite_active_commune_idx` partial index conditions,
+# and use the original order of the SIRET in each organization
+ACTIVE_COMMUNES_SIRET_QUERY = f"""
+    SELECT sirets.siret
+    FROM {Organization._meta.db_table} AS organization,
+        unnest(organization.registration_id_list)
+        WITH ORDINALITY AS sirets(siret, position)
+    WHERE organization.is_active
+        AND (organization.metadata -> 'is_commune') = 'true'::jsonb
+    ORDER BY organization.created_at DESC, organization.id, sirets.position
+"""  # noqa: S608, SLF001
+
+CHUNK_SIZE = 2000
+
+
+def iter_active_communes_siret_json():
+    """Yield the JSON array of the SIRET of active communes, by chunks."""
+    yield "["
+    separator = ""
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(ACTIVE_COMMUNES_SIRET_QUERY)
+        while rows := cursor.fetchmany(CHUNK_SIZE):
+            yield separator + ",".join(json.dumps(siret) for (siret,) in rows)
+            separator = ","
+    yield "]"
+
+
+def get_active_communes_siret_snapshot():
+    """
+    Return the JSON array of the SIRET of active communes and its ETag, from the
+    cache when available.
+    """
+    if snapshot := cache.get(ACTIVE_COMMUNES_SIRET_CACHE_KEY):
+        return snapshot
+
+    content = "".join(iter_active_communes_siret_json()).encode()
+    snapshot = {
+        "content": content,
+        "etag": make_etag(hashlib.sha256(content).hexdigest()),
+    }
+    cache.set(
+        ACTIVE_COMMUNES_SIRET_CACHE_KEY,
+        snapshot,
+        settings.LA_SUITE_SIRET_EXPORT_CACHE_TIMEOUT,
+    )
+    return snapshot
+
+
+def clear_active_communes_siret_snapshot():
+    """
+    Forget the cached export, when organizations change.
+
+    The cache is cleared once the current transaction is committed: cleared
+    before, a concurrent request could cache the export of the old rows again.
+    """
+    transaction.on_commit(lambda: cache.delete(ACTIVE_COMMUNES_SIRET_CACHE_KEY))
@@ -6,14 +6,33 @@ Putting hooks registration here allows to test the "utils"
 function without registering the hook unwillingly.
 """
 
-from core.plugins.registry import register_hook
+from core.plugins.registry import HOOK_MODE_ASYNC, register_hook
 
 from plugins.la_suite.hooks_utils.all_organizations import (
     get_organization_name_and_metadata_from_siret,
+    update_organizations_from_siret,
 )
 
 
-@register_hook("organization_created")
+def update_organizations_from_siret_hook(organizations):
+    """
+    Update the name & metadata of existing organizations, raising when the API
+    failed so the task is retried.
+    """
+    return update_organizations_from_siret(organizations, raise_on_error=True)
+
+
+@register_hook(
+    "organization_created",
+    mode=HOOK_MODE_ASYNC,
+    batch_callback=update_organizations_from_siret_hook,
+)
 def get_organization_name_and_metadata_from_siret_hook(organization):
-    """After creating an organization, update the organization name & metadata."""
-    get_organization_name_and_metadata_from_siret(organization)
+    """
+    After creating an organization, update the organization name & metadata.
+
+    The API may be slow or rate limited, so this is not run during the login
+    of the first user of the organization. API failures are raised so the task
+    is retried.
+    """
+    get_organization_name_and_metadata_from_siret(organization, raise_on_error=True)
@@ -9,15 +9,81 @@ later.
 """
 
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
 import requests
 from requests.adapters import HTTPAdapter, Retry
 
+from core.models import Organization
+
+from plugins.la_suite.exports import clear_active_communes_siret_snapshot
+from plugins.la_suite.models import SiretCacheEntry
+
 logger = logging.getLogger(__name__)
 
 
 API_URL = "https://recherche-entreprises.api.gouv.fr/search?q={siret}"
 
+# Sessions are reused for keep-alive connections, one per thread
+_sessions = threading.local()
+
+
+class SiretApiError(Exception):
+    """The search API failed for some SIRETs, they can be resolved again later."""
+
+
+class RateLimiter:
+    """
+    Fixed window counter shared by all processes through the cache: `rate` calls
+    are allowed in each second of the clock, and callers wait for the next second
+    when the count is reached.
+
+    Up to twice the rate may be allowed across the boundary of two seconds, the
+    requests then rate limited by the API are retried by the HTTP session.
+    """
+
+    def __init__(self, name, rate):
+        """Initialize the limiter of `rate` calls per second."""
+        self.name = name
+        self.rate = rate
+
+    def acquire(self):
+        """Wait until a call is allowed."""
+        while True:
+            now = time.time()
+            second = int(now)
+            key = f"rate-limit:{self.name}:{second}"
+            added = cache.add(key, 0, timeout=2)
+            try:
+                count = cache.incr(key)
+            except ValueError:
+                if added:
+                    # The key was not kept, the cache is disabled: do not block
+                    return
+                # The key expired between `add` and `incr`: count again
+                continue
+            if count <= self.rate:
+                return
+            time.sleep(second + 1 - now)
+
+
+def _get_session():
+    """Return the HTTP session of the current thread."""
+    if not hasattr(_sessions, "session"):
+        session = requests.Session()
+        # Retry logic as the API may be rate limited despite our own limiter
+        retries = Retry(total=5, backoff_factor=0.1, status_forcelist=[429])
+        session.mount("https://", HTTPAdapter(max_retries=retries))
+        _sessions.session = session
+    return _sessions.session
+
 
 def _get_organization_name_and_metadata_from_results(data, siret):
     """Return the organization name and metadata from the results of a SIRET search."""
@@ -62,38 +128,162 @@ def _get_organization_name_and_metadata_from_results(data, siret):
     return None, metadata
 
 
-def get_organization_name_and_metadata_from_siret(organization):
-    """After creating an organization, update the organization name."""
-    if not organization.registration_id_list:
-        # No registration ID to convert...
-        return
-
-    if organization.name not in organization.registration_id_list:
-        # The name has probably already been customized
-        return
+def _fetch_siret(siret, rate_limiter):
+    """
+    Query the search API for a SIRET, within the API quota.
 
-    # In the nominal case, there is only one registration ID because
-    # the organization as been created from it.
+    Return the organization name and metadata, or None when the API failed.
+    """
+    rate_limiter.acquire()
     try:
-        # Retry logic as the API may be rate limited
-        s = requests.Session()
-        retries = Retry(total=5, backoff_factor=0.1, status_forcelist=[429])
-        s.mount("https://", HTTPAdapter(max_retries=retries))
-
-        siret = organization.registration_id_list[0]
-        response = s.get(API_URL.format(siret=siret), timeout=10)
+        response = _get_session().get(API_URL.format(siret=siret), timeout=10)
         response.raise_for_status()
         data = response.json()
     except requests.RequestException as exc:
         logger.exception("%s: Unable to fetch organization name from SIRET", exc)
+        return None
+
+    return _get_organization_name_and_metadata_from_results(data, siret)
+
+
+def resolve_sirets(sirets):
+    """
+    Return the organization name and metadata of each SIRET, as a dictionary.
+
+    Results are read from the cache table when fresh enough, others are fetched
+    from the search API concurrently, within the API quota shared by all
+    processes, and saved in the cache table. SIRETs for which the API failed
+    are left out (the failure is logged).
+    """
+    sirets = set(sirets)
+    resolved = {
+        entry.siret: (entry.name, entry.metadata)
+        for entry in SiretCacheEntry.objects.filter(
+            siret__in=sirets,
+            fetched_at__gte=timezone.now()
+            - timedelta(seconds=settings.LA_SUITE_SIRET_CACHE_TIMEOUT),
+        )
+    }
+    if not (missing := sorted(sirets - resolved.keys())):
+        return resolved
+
+    rate_limiter = RateLimiter(
+        "la-suite-siret-api", settings.LA_SUITE_SIRET_API_RATE_LIMIT
+    )
+    with ThreadPoolExecutor(
+        max_workers=min(settings.LA_SUITE_SIRET_API_CONCURRENCY, len(missing))
+    ) as executor:
+        fetched = {
+            siret: result
+            for siret, result in zip(
+                missing,
+                executor.map(lambda siret: _fetch_siret(siret, rate_limiter), missing),
+                strict=True,
+            )
+            if result is not None
+        }
+
+    fetched_at = timezone.now()
+    SiretCacheEntry.objects.bulk_create(
+        [
+            SiretCacheEntry(
+                siret=siret, name=name, metadata=metadata, fetched_at=fetched_at
+            )
+            for siret, (name, metadata) in fetched.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["siret"],
+        update_fields=["name", "metadata", "fetched_at"],
+    )
+    return resolved | fetched
+
+
+def _is_name_from_siret(organization):
+    """Whether the organization name is still its registration ID."""
+    return bool(organization.registration_id_list) and (
+        # The name has probably already been customized otherwise
+        organization.name in organization.registration_id_list
+    )
+
+
+def _raise_for_failures(sirets, resolved):
+    """Raise SiretApiError if the API failed for some of the SIRETs."""
+    if failed := set(sirets) - resolved.keys():
+        raise SiretApiError(
+            f"Unable to fetch organization name from SIRET: {', '.join(sorted(failed))}"
+        )
+
+
+def _set_name_and_metadata(organization, name, metadata):
+    """Set the name found for the SIRET of an organization, and its metadata."""
+    organization.name = name[: Organization._meta.get_field("name").max_length]  # noqa: SLF001
+    organization.metadata = (organization.metadata or {}) | metadata
+
+
+def get_organization_name_and_metadata_from_siret(organization, raise_on_error=False):
+    """
+    After creating an organization, update the organization name.
+
+    With `raise_on_error`, raise SiretApiError when the API failed, e.g. for the
+    Celery task running the hook to retry later.
+    """
+    if not _is_name_from_siret(organization):
         return
 
-    name, metadata = _get_organization_name_and_metadata_from_results(data, siret)
+    # In the nominal case, there is only one registration ID because
+    # the organization as been created from it.
+    siret = organization.registration_id_list[0]
+    resolved = resolve_sirets([siret])
+    if raise_on_error:
+        _raise_for_failures([siret], resolved)
+    name, metadata = resolved.get(siret, (None, {}))
     if not name:  # don't consider metadata either
         return
 
-    organization.name = name
-    organization.metadata = (organization.metadata or {}) | metadata
+    _set_name_and_metadata(organization, name, metadata)
 
     organization.save(update_fields=["name", "metadata", "updated_at"])
     logger.info("Organization %s name updated to %s", organization, name)
+
+
+def update_organizations_from_siret(organizations, raise_on_error=False):
+    """
+    Batch version of `get_organization_name_and_metadata_from_siret`: resolve
+    the SIRET of all the organizations at once and update them in bulk.
+
+    With `raise_on_error`, raise SiretApiError when the API failed for some
+    organizations, once the others are updated.
+
+    Return the number of updated organizations.
+    """
+    organizations = [
+        organization
+        for organization in organizations
+        if _is_name_from_siret(organization)
+    ]
+    sirets = {organization.registration_id_list[0] for organization in organizations}
+    resolved = resolve_sirets(sirets)
+
+    resolved_organizations = []
+    for organization in organizations:
+        name, metadata = resolved.get(organization.registration_id_list[0], (None, {}))
+        if not name:
+            continue
+
+        _set_name_and_metadata(organization, name, metadata)
+        resolved_organizations.append(organization)
+
+    # Invalid organizations are logged and left untouched
+    updated_organizations = Organization.bulk_update_validated(
+        resolved_organizations,
+        ["name", "metadata"],
+        skip_invalid=True,
+        batch_size=500,
+    )
+    if updated_organizations:
+        clear_active_communes_siret_snapshot()
+    logger.info("%s organizations updated from SIRET", len(updated_organizations))
+
+    if raise_on_error:
+        _raise_for_failures(sirets, resolved)
+    return len(updated_organizations)
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='SiretCacheEntry',
+            fields=[
+                ('siret', models.CharField(max_length=14, primary_key=True, serialize=False, verbose_name='SIRET')),
+                ('name', models.CharField(blank=True, max_length=100, null=True, verbose_name='name')),
+                ('metadata', models.JSONField(blank=True, default=dict, verbose_name='metadata')),
+                ('fetched_at', models.DateTimeField(verbose_name='fetched at')),
+            ],
+            options={
+                'verbose_name': 'SIRET cache entry',
+                'verbose_name_plural': 'SIRET cache entries',
+                'db_table': 'la_suite_siret_cache',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 11:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_tombstone_and_changes_feed_indexes'),
+        ('la_suite', '0001_initial'),
+    ]
+
+    operations = [
+        # Organizations exported by `plugins.la_suite.exports`, in their order
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS la_suite_active_commune_idx "
+                "ON people_organization (created_at DESC, id) "
+                "WHERE is_active AND (metadata -> 'is_commune') = 'true'::jsonb;"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS la_suite_active_commune_idx;",
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_suite', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='siretcacheentry',
+            name='name',
+            field=models.TextField(blank=True, null=True, verbose_name='name'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+"""Models for the La Suite plugin."""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SiretCacheEntry(models.Model):
+    """
+    Organization name and metadata found for a SIRET by the search API, kept
+    for `LA_SUITE_SIRET_CACHE_TIMEOUT`. The name is null when the SIRET was not
+    found.
+    """
+
+    siret = models.CharField(_("SIRET"), max_length=14, primary_key=True)
+    # Names are not truncated here: the API may return names longer than the
+    # organization names, which are truncated when applied
+    name = models.TextField(_("name"), null=True, blank=True)
+    metadata = models.JSONField(_("metadata"), default=dict, blank=True)
+    fetched_at = models.DateTimeField(_("fetched at"))
+
+    class Meta:
+        db_table = "la_suite_siret_cache"
+        verbose_name = _("SIRET cache entry")
+        verbose_name_plural = _("SIRET cache entries")
+
+    def __str__(self):
+        return f"{self.siret} ({self.name})"
@@ -0,0 +1,36 @@
+"""
+Signals module for the La Suite plugin.
+
+Receivers are connected when the plugin is enabled, see `LaSuitePluginConfig`.
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from core.models import Organization
+
+from plugins.la_suite.exports import clear_active_communes_siret_snapshot
+
+ORGANIZATION_SIGNALS = (post_save, post_delete)
+
+
+def clear_organizations_exports(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """The exported SIRET of communes may have changed."""
+    clear_active_communes_siret_snapshot()
+
+
+def connect_signals():
+    """Connect the receivers of the plugin."""
+    for signal in ORGANIZATION_SIGNALS:
+        signal.connect(
+            clear_organizations_exports,
+            sender=Organization,
+            dispatch_uid="la_suite_clear_organizations_exports",
+        )
+
+
+def disconnect_signals():
+    """Disconnect the receivers of the plugin."""
+    for signal in ORGANIZATION_SIGNALS:
+        signal.disconnect(
+            sender=Organization, dispatch_uid="la_suite_clear_organizations_exports"
+        )
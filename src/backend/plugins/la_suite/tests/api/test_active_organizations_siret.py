@@ -1,7 +1,9 @@
 """Test for the La Suite plugin API active organizations siret"""
 
+import json
 from importlib import import_module, reload
 
+from django.core.cache import cache
 from django.test import override_settings
 from django.urls import clear_url_caches, set_urlconf
 
@@ -11,6 +13,8 @@ from rest_framework.test import APIClient
 
 from core import factories
 
+from plugins.la_suite.exports import ACTIVE_COMMUNES_SIRET_CACHE_KEY
+
 pytestmark = pytest.mark.django_db
 
 API_URL = "/la-suite/v1.0/siret/"
@@ -25,6 +29,7 @@ def reload_urlconf(settings):
 
     clear_url_caches()
     set_urlconf(None)
+    cache.delete(ACTIVE_COMMUNES_SIRET_CACHE_KEY)
 
     yield
 
@@ -78,4 +83,110 @@ def test_active_organizations_siret_authorized(plugin_urls):
 
     response = client.get(API_URL)
     assert response.status_code == status.HTTP_200_OK
-    assert response.data == ["11111111111111", "22222222222222"]
+    assert response.json() == ["11111111111111", "22222222222222"]
+
+
+@pytest.fixture(name="account_service_client")
+def account_service_client_fixture():
+    """Return a client authenticated as an account service allowed to list SIRET."""
+    account_service = factories.AccountServiceFactory(
+        scopes=["la-suite-list-organizations-siret"],
+    )
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"ApiKey {account_service.api_key}")
+    return client
+
+
+# pylint: disable=unused-argument
+@override_settings(ACCOUNT_SERVICE_SCOPES=["la-suite-list-organizations-siret"])
+def test_active_organizations_siret_not_modified(
+    plugin_urls, account_service_client, django_assert_num_queries
+):
+    """
+    The export is served from the cache with an ETag, and an unchanged list
+    should not be sent again.
+    """
+    factories.OrganizationFactory(
+        metadata={"is_commune": True},
+        registration_id_list=["11111111111111"],
+        is_active=True,
+    )
+
+    response = account_service_client.get(API_URL)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response["ETag"]
+
+    # Only the account service is fetched
+    with django_assert_num_queries(1):
+        response = account_service_client.get(API_URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+
+
+# pylint: disable=unused-argument
+@override_settings(ACCOUNT_SERVICE_SCOPES=["la-suite-list-organizations-siret"])
+def test_active_organizations_siret_refreshed_on_change(
+    plugin_urls, account_service_client, django_capture_on_commit_callbacks
+):
+    """
+    The cached export should be refreshed once the change of an organization is
+    committed.
+    """
+    organization = factories.OrganizationFactory(
+        metadata={"is_commune": True},
+        registration_id_list=["11111111111111"],
+        is_active=True,
+    )
+
+    response = account_service_client.get(API_URL)
+    assert response.json() == ["11111111111111"]
+    etag = response["ETag"]
+
+    organization.is_active = False
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        organization.save()
+
+        # Not committed yet, the export is still served from the cache
+        assert (
+            account_service_client.get(API_URL, HTTP_IF_NONE_MATCH=etag).status_code
+            == status.HTTP_304_NOT_MODIFIED
+        )
+    assert callbacks
+
+    response = account_service_client.get(API_URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert response["ETag"] != etag
+
+
+# pylint: disable=unused-argument
+@override_settings(
+    ACCOUNT_SERVICE_SCOPES=["la-suite-list-organizations-siret"],
+    LA_SUITE_SIRET_EXPORT_CACHE_TIMEOUT=0,
+)
+def test_active_organizations_siret_streamed_without_cache(
+    plugin_urls, account_service_client
+):
+    """Without cache, the export should be streamed from the database."""
+    factories.OrganizationFactory(
+        metadata={"is_commune": True},
+        registration_id_list=["22222222222222", "11111111111111"],
+        is_active=True,
+    )
+    factories.OrganizationFactory(
+        metadata={"is_commune": True},
+        registration_id_list=["33333333333333"],
+        is_active=True,
+    )
+
+    response = account_service_client.get(API_URL)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response["Content-Type"] == "application/json"
+    # Latest organizations first, SIRET in their original order
+    assert json.loads(b"".join(response.streaming_content)) == [
+        "33333333333333",
+        "22222222222222",
+        "11111111111111",
+    ]
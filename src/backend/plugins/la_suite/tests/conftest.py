@@ -0,0 +1,24 @@
+"""Fixtures for the tests of the La Suite plugin."""
+
+from django.apps import apps
+
+import pytest
+
+from core.plugins.registry import registry
+
+from plugins.la_suite.signals import disconnect_signals
+
+
+@pytest.fixture(autouse=True)
+def la_suite_plugin():
+    """
+    Enable the plugin for its tests: it is only installed for its models in the
+    tests, and other tests run without its hooks and signals.
+    """
+    original_state = dict(vars(registry))
+    apps.get_app_config("la_suite").enable()
+
+    yield
+
+    disconnect_signals()
+    vars(registry).update(original_state)
@@ -5,10 +5,12 @@ from core.plugins.registry import registry
 from plugins.la_suite.apps import LaSuitePluginConfig
 
 
-def test_hooks_loaded():
+def test_hooks_loaded(settings):
     """Test to check all application hooks are loaded."""
+    settings.INSTALLED_PLUGINS = ["plugins.la_suite"]
     _original_hooks = dict(registry._hooks.items())  # pylint: disable=protected-access
     _original_registered_apps = set(registry._registered_apps)  # pylint: disable=protected-access
+    _original_options = dict(registry._options)  # pylint: disable=protected-access
 
     registry.reset()
 
@@ -31,3 +33,19 @@ def test_hooks_loaded():
     # cleanup the hooks
     registry._hooks = _original_hooks  # pylint: disable=protected-access
     registry._registered_apps = _original_registered_apps  # pylint: disable=protected-access
+    registry._options = _original_options  # pylint: disable=protected-access
+
+
+def test_hooks_not_loaded_when_not_enabled(settings):
+    """Plugins installed but not listed in INSTALLED_PLUGINS should not be enabled."""
+    settings.INSTALLED_PLUGINS = []
+    _original_state = dict(vars(registry))
+
+    registry.reset()
+    LaSuitePluginConfig(
+        app_name="plugins.la_suite", app_module=__import__("plugins.la_suite")
+    ).ready()
+
+    assert registry.get_callbacks("organization_created") == []
+
+    vars(registry).update(_original_state)
@@ -0,0 +1,244 @@
+"""Tests for the SIRET resolution of the La Suite plugin."""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.utils import timezone
+
+import pytest
+import responses
+
+from core import factories
+from core.plugins.registry import get_callback_name, registry
+
+from plugins.la_suite.hooks import (
+    get_organization_name_and_metadata_from_siret_hook,
+    update_organizations_from_siret_hook,
+)
+from plugins.la_suite.hooks_utils.all_organizations import (
+    RateLimiter,
+    SiretApiError,
+    resolve_sirets,
+    update_organizations_from_siret,
+)
+from plugins.la_suite.models import SiretCacheEntry
+
+pytestmark = pytest.mark.django_db
+
+
+def _add_api_response(siret, name):
+    """Mock the search API response for a SIRET."""
+    responses.add(
+        responses.GET,
+        f"https://recherche-entreprises.api.gouv.fr/search?q={siret}",
+        json={
+            "results": [
+                {
+                    "matching_etablissements": [
+                        {"liste_enseignes": [name], "siret": siret}
+                    ],
+                    "nature_juridique": "7210",
+                    "siege": {"libelle_commune": name},
+                    "complements": {"est_service_public": True},
+                }
+            ],
+        },
+        status=200,
+    )
+
+
+@responses.activate
+def test_resolve_sirets_cached():
+    """SIRETs should be fetched once, then read from the cache table."""
+    _add_api_response("12345678901234", "MERLAUT")
+    _add_api_response("12345678901235", "PARIS")
+
+    expected = {
+        "12345678901234": ("Merlaut", {"is_commune": True, "is_public_service": True}),
+        "12345678901235": ("Paris", {"is_commune": True, "is_public_service": True}),
+    }
+    assert resolve_sirets(["12345678901234", "12345678901235"]) == expected
+    assert len(responses.calls) == 2
+    assert SiretCacheEntry.objects.count() == 2
+
+    assert resolve_sirets(["12345678901234", "12345678901235"]) == expected
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_resolve_sirets_expired(settings):
+    """Expired entries of the cache table should be fetched again."""
+    settings.LA_SUITE_SIRET_CACHE_TIMEOUT = 60
+    SiretCacheEntry.objects.create(
+        siret="12345678901234",
+        name="Former name",
+        metadata={},
+        fetched_at=timezone.now() - timedelta(seconds=61),
+    )
+    _add_api_response("12345678901234", "MERLAUT")
+
+    assert resolve_sirets(["12345678901234"])["12345678901234"][0] == "Merlaut"
+    assert SiretCacheEntry.objects.get().name == "Merlaut"
+
+
+@responses.activate
+def test_resolve_sirets_api_failure():
+    """SIRETs should be left out, and not cached, when the API fails."""
+    responses.add(
+        responses.GET,
+        "https://recherche-entreprises.api.gouv.fr/search?q=12345678901234",
+        status=500,
+    )
+    _add_api_response("12345678901235", "PARIS")
+
+    assert resolve_sirets(["12345678901234", "12345678901235"]).keys() == {
+        "12345678901235"
+    }
+    assert list(SiretCacheEntry.objects.values_list("siret", flat=True)) == [
+        "12345678901235"
+    ]
+
+
+def test_resolve_sirets_rate_limiter():
+    """Callers should wait for the next second once the quota is used."""
+    clock = [1000.5]
+    limiter = RateLimiter("test", 2)
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    with (
+        mock.patch("time.time", side_effect=lambda: clock[0]),
+        mock.patch("time.sleep", side_effect=sleep) as sleep_mock,
+    ):
+        for _ in range(3):
+            limiter.acquire()
+
+    sleep_mock.assert_called_once_with(0.5)
+    assert clock[0] == 1001
+
+
+def test_resolve_sirets_rate_limiter_key_expired():
+    """The call should be counted again when the key expires before its count."""
+    limiter = RateLimiter("test", 2)
+
+    with (
+        mock.patch("time.time", return_value=1000.5),
+        mock.patch.object(cache, "add", return_value=False),
+        mock.patch.object(cache, "incr", side_effect=[ValueError, 1]) as incr_mock,
+    ):
+        limiter.acquire()
+
+    assert incr_mock.call_count == 2
+
+
+@responses.activate
+def test_update_organizations_from_siret(django_assert_max_num_queries):
+    """Organizations should be updated in bulk, unless their name was customized."""
+    organizations = [
+        factories.OrganizationFactory(
+            name=siret, registration_id_list=[siret], metadata={}
+        )
+        for siret in ["12345678901234", "12345678901235"]
+    ]
+    customized = factories.OrganizationFactory(
+        name="Custom", registration_id_list=["12345678901236"]
+    )
+    _add_api_response("12345678901234", "MERLAUT")
+    _add_api_response("12345678901235", "PARIS")
+
+    # cache table read, cache table write, organizations update
+    with django_assert_max_num_queries(3):
+        assert update_organizations_from_siret([*organizations, customized]) == 2
+
+    for organization, name in zip(organizations, ["Merlaut", "Paris"], strict=True):
+        organization.refresh_from_db()
+        assert organization.name == name
+        assert organization.metadata == {"is_commune": True, "is_public_service": True}
+    customized.refresh_from_db()
+    assert customized.name == "Custom"
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_update_organizations_from_siret_long_name():
+    """
+    Names longer than the organization names should be cached as is, and
+    truncated on the organizations.
+    """
+    organization = factories.OrganizationFactory(
+        name="12345678901234", registration_id_list=["12345678901234"], metadata={}
+    )
+    _add_api_response("12345678901234", "LONG " * 30)
+
+    assert update_organizations_from_siret([organization]) == 1
+
+    assert SiretCacheEntry.objects.get().name == "Long " * 30
+    organization.refresh_from_db()
+    assert organization.name == ("Long " * 30)[:100]
+
+
+@responses.activate
+def test_update_organizations_from_siret_api_failure():
+    """
+    Organizations should be updated when resolved, and the failures raised only
+    with `raise_on_error`.
+    """
+    failed, resolved = [
+        factories.OrganizationFactory(
+            name=siret, registration_id_list=[siret], metadata={}
+        )
+        for siret in ["12345678901234", "12345678901235"]
+    ]
+    responses.add(
+        responses.GET,
+        "https://recherche-entreprises.api.gouv.fr/search?q=12345678901234",
+        status=500,
+    )
+    _add_api_response("12345678901235", "PARIS")
+
+    assert update_organizations_from_siret([failed, resolved]) == 1
+
+    resolved.name = "12345678901235"
+    resolved.save()
+    with pytest.raises(SiretApiError, match="12345678901234"):
+        update_organizations_from_siret([failed, resolved], raise_on_error=True)
+
+    resolved.refresh_from_db()
+    assert resolved.name == "Paris"
+    failed.refresh_from_db()
+    assert failed.name == "12345678901234"
+
+
+@responses.activate
+def test_organization_name_hooks_raise_api_failure():
+    """Hooks run by Celery tasks should raise API failures, for the task to retry."""
+    organization = factories.OrganizationFactory(
+        name="12345678901234", registration_id_list=["12345678901234"]
+    )
+    responses.add(
+        responses.GET,
+        "https://recherche-entreprises.api.gouv.fr/search?q=12345678901234",
+        status=500,
+    )
+
+    with pytest.raises(SiretApiError):
+        get_organization_name_and_metadata_from_siret_hook(organization)
+    with pytest.raises(SiretApiError):
+        update_organizations_from_siret_hook([organization])
+
+    organization.refresh_from_db()
+    assert organization.name == "12345678901234"
+
+
+def test_update_organizations_from_siret_registered():
+    """The batch update should be registered with the organization name hook."""
+    callback = next(
+        callback
+        for callback in registry.get_callbacks("organization_created")
+        if callback.__name__ == "get_organization_name_and_metadata_from_siret_hook"
+    )
+    assert get_callback_name(
+        registry.get_options(callback)["batch_callback"]
+    ) == get_callback_name(update_organizations_from_siret_hook)
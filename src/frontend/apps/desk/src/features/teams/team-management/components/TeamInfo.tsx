@@ -74,7 +74,7 @@ export const TeamInfo = ({ team, currentRole }: TeamInfoProps) => {
           `}
         >
           <Text $size="s" as="p">
-            {t('{{count}} member', { count: team.accesses.length })}
+            {t('{{count}} member', { count: team.members_count })}
           </Text>
           <Text $size="s" $display="inline" as="p">
             {t('Created at')}&nbsp;
@@ -42,7 +42,7 @@ export function TeamsListView({ querySearch }: TeamsListViewProps) {
               id: 'members',
               headerName: t('Member count'),
               enableSorting: false,
-              renderCell: ({ row }) => row.accesses.length,
+              renderCell: ({ row }) => row.members_count,
             },
             {
               id: 'actions',
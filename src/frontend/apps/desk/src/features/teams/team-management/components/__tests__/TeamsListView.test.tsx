@@ -22,12 +22,12 @@ describe('TeamsListView', () => {
     {
       id: '1',
       name: 'Team A',
-      accesses: [{ id: '1' }, { id: '2' }],
+      members_count: 2,
     },
     {
       id: '2',
       name: 'Team B',
-      accesses: [{ id: '3' }],
+      members_count: 1,
     },
   ];
 
@@ -1,5 +1,3 @@
-import { Access } from '@/features/teams/member-management';
-
 export enum Role {
   MEMBER = 'member',
   ADMIN = 'administrator',
@@ -9,7 +7,7 @@ export enum Role {
 export interface Team {
   id: string;
   name: string;
-  accesses: Access[];
+  members_count: number;
   created_at: string;
   updated_at: string;
   abilities: {
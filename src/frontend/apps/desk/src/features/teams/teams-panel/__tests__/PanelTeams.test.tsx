@@ -60,7 +60,7 @@ describe('PanelTeams', () => {
       {
         id: '1',
         name: 'Team 1',
-        accesses: [],
+        members_count: 0,
       },
     ]);
 
@@ -76,12 +76,7 @@ describe('PanelTeams', () => {
       {
         id: '1',
         name: 'Team 1',
-        accesses: [
-          {
-            id: '1',
-            role: 'owner',
-          },
-        ],
+        members_count: 1,
       },
     ]);
 
@@ -97,16 +92,7 @@ describe('PanelTeams', () => {
       {
         id: '1',
         name: 'Team 1',
-        accesses: [
-          {
-            id: '1',
-            role: 'admin',
-          },
-          {
-            id: '2',
-            role: 'member',
-          },
-        ],
+        members_count: 2,
       },
     ]);
 
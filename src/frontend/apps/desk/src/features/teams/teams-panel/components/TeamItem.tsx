@@ -21,7 +21,7 @@ export const TeamItem = ({ team }: TeamProps) => {
   } = useRouter();
 
   // There is at least 1 owner in the team
-  const hasMembers = team.accesses.length > 1;
+  const hasMembers = team.members_count > 1;
   const isActive = team.id === id;
 
   const commonProps = {